@@ -1,57 +1,379 @@
 # app.py
-from flask import Flask, request, jsonify, Response
+from flask import Blueprint, Flask, current_app, request, Response, stream_with_context, g
 from config import Config
-from models import db, PageList, Object, ObjectField, PageListField, PageLayout, PageLayoutField
+from models import db, configure_ids, new_id, PageList, Object, ObjectField, PageListField, PageLayout, PageLayoutField
 from flask_cors import CORS
 from io import StringIO
+import base64
+import codecs
 import csv
+import functools
+import hashlib
+import io
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
 import chardet
-app = Flask(__name__)
-app.config.from_object(Config)
-CORS(app, supports_credentials=True)  # 允许跨域请求
-db.init_app(app)
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import selectinload
+from cache import LRUCache, get_generation, get_table_versions
+from import_jobs import ImportJob, ImportJobManager, QueueFull
+import db_pool
+import instrumentation
+import metrics
+import migrations
+import purge
+import serializers
+from replicas import ReplicaRouter, replica_binds
+from serializers import ENCODERS, MODEL_FIELDS, dumps, json_response, row_encoder
+
+bp = Blueprint('api', __name__)
+
+
+def create_app(config=None):
+    """
+    创建应用：读取 Config（config 中的键覆盖之），注册接口与扩展。
+    不连接数据库，首次查询时才建立连接；表结构由 `flask --app app db upgrade` 创建与升级。
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', db_pool.engine_options(app.config))
+    app.config['SQLALCHEMY_BINDS'] = {
+        **app.config.get('SQLALCHEMY_BINDS', {}),
+        **replica_binds(app.config['REPLICA_DATABASE_URIS']),
+    }
+    CORS(app, supports_credentials=True)  # 允许跨域请求
+    db.init_app(app)
+    serializers.configure(app.config['JSON_BACKEND'])
+    configure_ids(app.config['ID_STRATEGY'])
+    metrics.init_app(app)
+    migrations.init_app(app)
+    purge.init_app(app)
+    # 创建引擎对象并注册事件，不会建立连接
+    with app.app_context():
+        for engine in db.engines.values():
+            db_pool.instrument_engine(engine)
+        instrumentation.init_app(app, db.engines.values())
+    app.register_blueprint(bp)
+    return app
+
+
+_app_state_lock = threading.Lock()
+
+
+def get_app_state(name, factory):
+    """按应用保存的进程内状态（缓存、导入任务管理器等），首次访问时由 factory 创建。"""
+    state = current_app.extensions.setdefault('app_state', {})
+    if name not in state:
+        with _app_state_lock:
+            if name not in state:
+                state[name] = factory()
+    return state[name]
+
+
+# ---------------------------
+# 序列化与分页工具
+# ---------------------------
+def get_requested_fields(model_cls, default=None):
+    """
+    解析 fields 参数，返回要输出的字段列表；未指定时返回 default（默认为全部字段）。
+    含未知字段时抛出 ValueError。
+    """
+    allowed = MODEL_FIELDS[model_cls]
+    raw = request.args.get('fields')
+    if not raw:
+        return list(default or allowed)
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in allowed]
+    if unknown or not fields:
+        raise ValueError('Invalid fields parameter: ' + ', '.join(unknown))
+    return fields
+
+
+def project(query, model_cls, columns):
+    """把 ORM 查询改为只 SELECT 指定列，结果为 Core 行（元组），不构造映射实例。"""
+    return query.with_entities(*[getattr(model_cls, col) for col in columns])
+
+
+def rows_to_dicts(rows, fields):
+    """
+    按 fields 顺序把行转换为字典；行中 fields 之后的多余列（如游标用的 ID）被忽略。
+    rows 为查询时先取回全部行，转换的耗时单独计入序列化耗时。
+    """
+    rows = list(rows)
+    encode = row_encoder(tuple(fields))
+    with instrumentation.timed_serialization():
+        return [encode(row) for row in rows]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(last_id):
+    """把最后一行的排序键编码为不透明的游标字符串。"""
+    raw = json.dumps([last_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """解析 encode_cursor 生成的游标，返回排序键；格式错误时抛出 InvalidCursor。"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+    if not (isinstance(key, list) and len(key) == 1 and isinstance(key[0], str)):
+        raise InvalidCursor(cursor)
+    return key[0]
+
+
+COUNT_STRATEGIES = ('exact', 'cached', 'estimated', 'none')
+
+
+def get_count_cache():
+    return get_app_state('count_cache', lambda: LRUCache(
+        maxsize=current_app.config['COUNT_CACHE_SIZE'], ttl=current_app.config['COUNT_CACHE_TTL']))
+
+
+def get_read_cache():
+    return get_app_state('read_cache', lambda: LRUCache(
+        maxsize=current_app.config['READ_CACHE_SIZE'], ttl=current_app.config['READ_CACHE_TTL']))
+
+
+def read_cache_bypassed():
+    """请求携带 cache=0 或 Cache-Control: no-cache 时跳过读缓存（仍会刷新缓存）。"""
+    if request.args.get('cache') == '0':
+        return True
+    return 'no-cache' in request.headers.get('Cache-Control', '')
+
+
+def get_replica_router():
+    """未配置副本时返回 None。"""
+    if not current_app.config['REPLICA_DATABASE_URIS']:
+        return None
+    return get_app_state('replica_router', lambda: ReplicaRouter(
+        replica_binds(current_app.config['REPLICA_DATABASE_URIS']),
+        retry_interval=current_app.config['REPLICA_RETRY_INTERVAL']))
+
+
+def read_replica(view):
+    """
+    只读接口：整个请求（含 ETag 版本号查询与流式响应）使用轮询选出的同一个副本。
+    副本连接失败时将其标记为不可用，回滚会话后在主库上重试本次请求。
+    流式响应开始输出之后的失败无法重试。
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        router = get_replica_router()
+        replica = router.choose() if router is not None else None
+        if replica is None:
+            return view(*args, **kwargs)
+        g.db_replica = replica
+        try:
+            return view(*args, **kwargs)
+        except (OperationalError, InterfaceError) as e:
+            router.mark_down(replica)
+            current_app.logger.warning('Replica %s failed, retrying on primary: %s', replica, e)
+            db.session.rollback()
+            g.pop('db_replica', None)
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def compute_etag(tables):
+    """由相关表的已提交版本号与请求路径、查询参数生成强 ETag，不执行数据查询。"""
+    versions = get_table_versions(db.session, tables)
+    # Accept 决定响应格式（如 NDJSON），需参与计算
+    raw = json.dumps([request.path, sorted(request.args.items(multi=True)), request.headers.get('Accept'),
+                      tables, versions])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def conditional_view(*models):
+    """
+    读接口的条件请求支持：响应携带 ETag；请求的 If-None-Match 与当前 ETag 相同时
+    直接返回 304，不执行行查询也不做序列化。
+    """
+    tables = tuple(m.__tablename__ for m in models)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = g.etag = compute_etag(tables)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # 同一 URL 按 Accept 返回 JSON 或 NDJSON，ETag 也随之不同，共享缓存需按 Accept 区分
+            response.vary.add('Accept')
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_view(view):
+    """
+    GET 接口的读缓存：以路径、查询参数与外层 conditional_view 计算的 ETag 为键缓存 200 JSON 响应。
+    ETag 含相关表已提交的版本号，任一进程提交写入后键随之改变，旧条目不再命中、由 LRU 与过期时间淘汰；
+    因此每次命中仍需计算 ETag 时的一次 table_versions 主键查询，但省去行查询与序列化。
+    响应头 X-Cache 标明 HIT / MISS / BYPASS。
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config['READ_CACHE_ENABLED']:
+            return view(*args, **kwargs)
+        cache = get_read_cache()
+        key = (request.path, tuple(sorted(request.args.items(multi=True))), request.headers.get('Accept'), g.etag)
+        bypass = read_cache_bypassed()
+        if not bypass:
+            cached = cache.get(key, ())
+            if cached is not None:
+                body, mimetype = cached
+                response = Response(body, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            cache.set(key, (response.get_data(), response.mimetype), ())
+        response.headers['X-Cache'] = 'BYPASS' if bypass else 'MISS'
+        return response
+    return wrapper
 
-# 在应用上下文中创建所有表（仅首次运行时）
-with app.app_context():
-    db.create_all()
+
+def compile_query(query):
+    """
+    编译查询，返回 (SQL 字符串, 参数) ，参数形式与当前数据库驱动的 paramstyle 一致。
+    参数经过列类型的绑定处理（如 MySQL 上 HexID 转为 16 字节），可直接交给驱动执行。
+    """
+    compiled = query.statement.compile(dialect=db.session.get_bind().dialect)
+    processors = compiled._bind_processors
+    params = {name: processors[name](value) if name in processors else value
+              for name, value in compiled.construct_params().items()}
+    if compiled.positional:
+        return compiled.string, tuple(params[name] for name in compiled.positiontup)
+    return compiled.string, params
+
+
+def cached_count(query, model_cls):
+    """按表写入代数缓存的总数，该表发生写入后自动失效。"""
+    tables = (model_cls.__tablename__,)
+    sql, params = compile_query(query)
+    key = (sql, params if isinstance(params, tuple) else tuple(sorted(params.items())))
+    cache = get_count_cache()
+    total = cache.get(key, tables)
+    if total is None:
+        generations = tuple(get_generation(t) for t in tables)
+        total = query.count()
+        cache.set(key, total, tables, generations)
+    return total
+
+
+def estimated_count(query):
+    """
+    基于表统计信息的估算总数：MySQL 下取 EXPLAIN 的 rows * filtered，
+    不扫描数据行；其他数据库没有可用的统计信息时退回精确计数。
+    """
+    if db.session.get_bind().dialect.name != 'mysql':
+        return query.count()
+    sql, params = compile_query(query)
+    row = db.session.connection().exec_driver_sql('EXPLAIN ' + sql, params).mappings().first()
+    if row is None or row.get('rows') is None:
+        return query.count()
+    filtered = row.get('filtered') or 100
+    return int(row['rows'] * filtered / 100)
+
+
+def paginate(query, model_cls):
+    """
+    对列表/搜索查询分页并返回 JSON 响应。
+    默认沿用 page/page_size 偏移分页；请求携带 cursor 参数（首页传空字符串）时
+    改用游标分页：按主键 ID 排序，以 WHERE ID > :last 定位，深页与首页开销相同，
+    响应中的 next_cursor 为 null 表示没有更多数据。
+    总数统计方式由 count 参数选择：
+    exact（精确 COUNT）、cached（按表写入失效的缓存）、estimated（统计信息估算，
+    响应带 total_estimated）、none（不返回 total，改为 has_more）。
+    fields 参数指定返回的字段；查询只 SELECT 这些列，直接返回行而不加载 ORM 实例。
+    """
+    page_size = request.args.get('page_size', 20, type=int)
+    if page_size < 1:
+        return json_response({'message': 'Invalid page_size parameter'}), 400
+    cursor = request.args.get('cursor')
+    count_strategy = request.args.get('count', current_app.config['DEFAULT_COUNT_STRATEGY'])
+    if count_strategy not in COUNT_STRATEGIES:
+        return json_response({'message': 'Invalid count parameter'}), 400
+    try:
+        fields = get_requested_fields(model_cls)
+    except ValueError as e:
+        return json_response({'message': str(e)}), 400
+    # 游标分页需要每行的 ID
+    query = project(query, model_cls, fields if 'ID' in fields else fields + ['ID'])
+
+    # 多取一行用于判断是否还有下一页
+    if cursor is None:
+        page = request.args.get('page', 1, type=int)
+        if page < 1:
+            return json_response({'message': 'Invalid page parameter'}), 400
+        offset = (page - 1) * page_size
+        items = query.offset(offset).limit(page_size + 1).all()
+    else:
+        seek_query = query.order_by(model_cls.ID)
+        if cursor:
+            try:
+                seek_query = seek_query.filter(model_cls.ID > decode_cursor(cursor))
+            except InvalidCursor:
+                return json_response({'message': 'Invalid cursor parameter'}), 400
+        items = seek_query.limit(page_size + 1).all()
+    has_more = len(items) > page_size
+    items = items[:page_size]
+
+    result = {'items': rows_to_dicts(items, fields)}
+    if count_strategy == 'exact':
+        result['total'] = query.count()
+    elif count_strategy == 'cached':
+        result['total'] = cached_count(query, model_cls)
+    elif count_strategy == 'estimated':
+        result['total'] = estimated_count(query)
+        result['total_estimated'] = True
+    else:
+        result['has_more'] = has_more
+    if cursor is not None:
+        result['next_cursor'] = encode_cursor(items[-1].ID) if has_more else None
+    return json_response(result)
 
 
 # ---------------------------
 # PageList API
 # ---------------------------
-@app.route('/page_lists', methods=['GET'])
+@bp.route('/page_lists', methods=['GET'])
+@read_replica
+@conditional_view(PageList)
+@cached_view
 def get_page_lists():
     # pages = PageList.query.filter_by(DELETED='0').all()
     # result = [{'ID': p.ID, 'NAME': p.NAME, 'LABEL': p.LABEL} for p in pages]
     # return jsonify(result)
-    # 获取分页参数（默认第1页，每页10条）
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    # 计算偏移量
-    offset = (page - 1) * page_size
 
     # 基础查询（过滤已删除项）
     query = PageList.query.filter_by(DELETED='0')
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    pages = paginated_query.all()
-
-    # 获取总记录数
-    total = query.count()
-    # 返回分页结果
-    return jsonify({
-        'items': [{'ID': p.ID, 'NAME': p.NAME, 'LABEL': p.LABEL} for p in pages],
-        'total': total
-    })
+    return paginate(query, PageList)
 
 
-@app.route('/page_list/search', methods=['GET'])
+@bp.route('/page_list/search', methods=['GET'])
+@read_replica
+@conditional_view(PageList)
+@cached_view
 def search_page_list():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     page_id = request.args.get('id')
     name = request.args.get('name')
 
@@ -60,18 +382,55 @@ def search_page_list():
     elif name:
         query = PageList.query.filter(PageList.NAME.like(f'%{name}%')).filter(PageList.DELETED == '0')
     else:
-        return jsonify({'message': 'Missing id or name parameter'}), 400
+        return json_response({'message': 'Missing id or name parameter'}), 400
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    pages = paginated_query.all()
+    return paginate(query, PageList)
 
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': p.ID, 'NAME': p.NAME, 'LABEL': p.LABEL} for p in pages],
-        'total': total
-    })
-@app.route('/page_list', methods=['POST'])
+
+@bp.route('/page_list/<id>/definition', methods=['GET'])
+@read_replica
+@conditional_view(PageList, PageListField, PageLayout, PageLayoutField, ObjectField)
+@cached_view
+def get_page_list_definition(id):
+    """
+    返回渲染一个页面所需的完整定义：PageList 及其 PageListField、PageLayout、
+    各 PageLayout 的 PageLayoutField，以及它们引用的 ObjectField（均只含未删除记录）。
+    子记录通过 selectinload 按层批量加载，引用的 ObjectField 以子查询一次取出，共 5 条查询，与页面规模无关。
+    """
+    page = PageList.query.options(
+        selectinload(PageList.page_list_fields.and_(PageListField.DELETED == '0')),
+        selectinload(PageList.page_layouts.and_(PageLayout.DELETED == '0'))
+        .selectinload(PageLayout.page_layout_fields.and_(PageLayoutField.DELETED == '0')),
+    ).filter_by(ID=id, DELETED='0').first()
+    if not page:
+        return json_response({'message': 'PageList not found'}), 404
+
+    # 引用的 ObjectField 以子查询一次取出，与上面加载的列表字段、布局字段条件相同
+    list_field_ids = select(PageListField.OBJECT_FIELD_ID).where(
+        PageListField.PAGE_LIST_ID == page.ID, PageListField.DELETED == '0')
+    layout_field_ids = select(PageLayoutField.OBJECT_FIELD_ID).join(
+        PageLayout, PageLayout.ID == PageLayoutField.PAGE_LAYOUT_ID
+    ).where(PageLayout.PAGE_LIST_ID == page.ID, PageLayout.DELETED == '0', PageLayoutField.DELETED == '0')
+    object_fields = ObjectField.query.filter(
+        or_(ObjectField.ID.in_(list_field_ids), ObjectField.ID.in_(layout_field_ids)),
+        ObjectField.DELETED == '0'
+    ).all()
+
+    encode_layout = ENCODERS[PageLayout]
+    encode_layout_field = ENCODERS[PageLayoutField]
+    with instrumentation.timed_serialization():
+        result = ENCODERS[PageList](page)
+        result['page_list_fields'] = [ENCODERS[PageListField](f) for f in page.page_list_fields]
+        result['page_layouts'] = [
+            dict(encode_layout(layout),
+                 page_layout_fields=[encode_layout_field(f) for f in layout.page_layout_fields])
+            for layout in page.page_layouts
+        ]
+        result['object_fields'] = [ENCODERS[ObjectField](f) for f in object_fields]
+    return json_response(result)
+
+
+@bp.route('/page_list', methods=['POST'])
 def create_page_list():
     data = request.get_json()
     page = PageList(
@@ -80,10 +439,10 @@ def create_page_list():
     )
     db.session.add(page)
     db.session.commit()
-    return jsonify({'message': 'PageList created', 'ID': page.ID}), 201
+    return json_response({'message': 'PageList created', 'ID': page.ID}), 201
 
 
-# @app.route('/page_list/<id>', methods=['GET'])
+# @bp.route('/page_list/<id>', methods=['GET'])
 # def get_page_list(id):
 #     page = PageList.query.filter_by(ID=id, DELETED='0').first()
 #     if page:
@@ -91,81 +450,66 @@ def create_page_list():
 #     return jsonify({'message': 'PageList not found'}), 404
 
 
-@app.route('/page_list/<id>', methods=['PUT'])
+@bp.route('/page_list/<id>', methods=['PUT'])
 def update_page_list(id):
     data = request.get_json()
     page = PageList.query.filter_by(ID=id, DELETED='0').first()
     if not page:
-        return jsonify({'message': 'PageList not found or deleted'}), 404
+        return json_response({'message': 'PageList not found or deleted'}), 404
     page.NAME = data[0].get('NAME', page.NAME)
     page.LABEL = data[0].get('LABEL', page.LABEL)
     db.session.commit()
-    return jsonify({'message': 'PageList updated'})
+    return json_response({'message': 'PageList updated'})
 
 
-@app.route('/page_list/<id>', methods=['DELETE'])
+@bp.route('/page_list/<id>', methods=['DELETE'])
 def soft_delete_page_list(id):
     page = PageList.query.filter_by(ID=id, DELETED='0').first()
     if not page:
-        return jsonify({'message': 'PageList not found or already deleted'}), 404
+        return json_response({'message': 'PageList not found or already deleted'}), 404
     page.cascade_soft_delete()  # 调用集中处理的级联软删除
     db.session.commit()
-    return jsonify({'message': 'PageList and related records soft deleted'})
+    return json_response({'message': 'PageList and related records soft deleted'})
 
 
-@app.route('/page_list/restore/<id>', methods=['PUT'])
+@bp.route('/page_list/restore/<id>', methods=['PUT'])
 def restore_page_list(id):
     page = PageList.query.filter_by(ID=id, DELETED='1').first()
     if not page:
-        return jsonify({'message': 'PageList not found or not deleted'}), 404
+        return json_response({'message': 'PageList not found or not deleted'}), 404
     page.cascade_restore()  # 级联恢复
     db.session.commit()
-    return jsonify({'message': 'PageList and related records restored'})
+    return json_response({'message': 'PageList and related records restored'})
 
 
-@app.route('/page_list/permanent_delete/<id>', methods=['DELETE'])
+@bp.route('/page_list/permanent_delete/<id>', methods=['DELETE'])
 def permanent_delete_page_list(id):
     page = PageList.query.filter_by(ID=id).first()
     if not page:
-        return jsonify({'message': 'PageList not found'}), 404
-    db.session.delete(page)
+        return json_response({'message': 'PageList not found'}), 404
+    counts = page.cascade_permanent_delete()
     db.session.commit()
-    return jsonify({'message': 'PageList permanently deleted'})
+    return json_response({'message': 'PageList permanently deleted', 'deleted': counts})
 
 
 # ---------------------------
 # Object API
 # ---------------------------
-@app.route('/objects', methods=['GET'])
+@bp.route('/objects', methods=['GET'])
+@read_replica
+@conditional_view(Object)
+@cached_view
 def get_objects():
-    # 获取分页参数（默认第1页，每页10条）
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    # 计算偏移量
-    offset = (page - 1) * page_size
-
     # 基础查询（过滤已删除项）
     query = Object.query.filter_by(DELETED='0')
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    pages = paginated_query.all()
-
-    # 获取总记录数
-    total = query.count()
-    # 返回分页结果
-    # objs = Object.query.filter_by(DELETED='0').all()
-    return jsonify({
-        'items': [{'ID': o.ID, 'NAME': o.NAME, 'LABEL': o.LABEL, 'TABLE_NAME': o.TABLE_NAME} for o in pages],
-        'total': total
-    })
+    return paginate(query, Object)
 
-@app.route('/object/search', methods=['GET'])
+@bp.route('/object/search', methods=['GET'])
+@read_replica
+@conditional_view(Object)
+@cached_view
 def search_objects():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     obj_id = request.args.get('id')
     name = request.args.get('name')
 
@@ -175,19 +519,11 @@ def search_objects():
         query = Object.query.filter(Object.NAME.like(f'%{name}%')).filter(Object.DELETED == '0')
 
     else:
-        return jsonify({'message': 'Missing id or name parameter'}), 400
+        return json_response({'message': 'Missing id or name parameter'}), 400
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    objects = paginated_query.all()
+    return paginate(query, Object)
 
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': o.ID, 'NAME': o.NAME, 'LABEL': o.LABEL, 'TABLE_NAME': o.TABLE_NAME} for o in objects],
-        'total': total
-    })
-
-@app.route('/object', methods=['POST'])
+@bp.route('/object', methods=['POST'])
 def create_object():
     data = request.get_json()
     obj = Object(
@@ -197,10 +533,10 @@ def create_object():
     )
     db.session.add(obj)
     db.session.commit()
-    return jsonify({'message': 'Object created', 'ID': obj.ID}), 201
+    return json_response({'message': 'Object created', 'ID': obj.ID}), 201
 
 
-# @app.route('/object/<id>', methods=['GET'])
+# @bp.route('/object/<id>', methods=['GET'])
 # def get_object(id):
 #     obj = Object.query.filter_by(ID=id, DELETED='0').first()
 #     if obj:
@@ -209,84 +545,91 @@ def create_object():
 #
 
 
-@app.route('/object/<id>', methods=['PUT'])
+@bp.route('/object/<id>', methods=['PUT'])
 def update_object(id):
     data = request.get_json()
     obj = Object.query.filter_by(ID=id, DELETED='0').first()
     if not obj:
-        return jsonify({'message': 'Object not found or deleted'}), 404
+        return json_response({'message': 'Object not found or deleted'}), 404
     obj.NAME = data[0].get('NAME', obj.NAME)
     obj.LABEL = data[0].get('LABEL', obj.LABEL)
     obj.TABLE_NAME = data[0].get('TABLE_NAME', obj.TABLE_NAME)
     db.session.commit()
     obj = Object.query.filter_by(ID=id, DELETED='0').first()
-    return jsonify({'message': 'Object updated','ID': obj.ID, 'NAME': obj.NAME, 'LABEL': obj.LABEL, 'TABLE_NAME': obj.TABLE_NAME})
+    return json_response({'message': 'Object updated', **ENCODERS[Object](obj)})
 
 
-@app.route('/object/<id>', methods=['DELETE'])
+@bp.route('/object/<id>', methods=['DELETE'])
 def soft_delete_object(id):
     obj = Object.query.filter_by(ID=id, DELETED='0').first()
     if not obj:
-        return jsonify({'message': 'Object not found or already deleted'}), 404
+        return json_response({'message': 'Object not found or already deleted'}), 404
     obj.cascade_soft_delete()
     db.session.commit()
-    return jsonify({'message': 'Object and its related fields soft deleted'})
+    return json_response({'message': 'Object and its related fields soft deleted'})
 
 
-@app.route('/object/restore/<id>', methods=['PUT'])
+@bp.route('/object/restore/<id>', methods=['PUT'])
 def restore_object(id):
     obj = Object.query.filter_by(ID=id, DELETED='1').first()
     if not obj:
-        return jsonify({'message': 'Object not found or not deleted'}), 404
+        return json_response({'message': 'Object not found or not deleted'}), 404
     obj.cascade_restore()
     db.session.commit()
-    return jsonify({'message': 'Object and its related fields restored'})
+    return json_response({'message': 'Object and its related fields restored'})
 
 
-@app.route('/object/permanent_delete/<id>', methods=['DELETE'])
+@bp.route('/object/permanent_delete/<id>', methods=['DELETE'])
 def permanent_delete_object(id):
     obj = Object.query.filter_by(ID=id).first()
     if not obj:
-        return jsonify({'message': 'Object not found'}), 404
-    db.session.delete(obj)
+        return json_response({'message': 'Object not found'}), 404
+    counts = obj.cascade_permanent_delete()
     db.session.commit()
-    return jsonify({'message': 'Object permanently deleted'})
+    return json_response({'message': 'Object permanently deleted', 'deleted': counts})
 
 
 # ---------------------------
 # ObjectField API
 # ---------------------------
-@app.route('/object_fields', methods=['GET'])
+@bp.route('/object_fields', methods=['GET'])
+@read_replica
+@conditional_view(ObjectField)
+@cached_view
 def get_object_fields():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     query = ObjectField.query.filter_by(DELETED='0')
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    fields = paginated_query.all()
-
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': f.ID, 'OBJECT_ID': f.OBJECT_ID, 'NAME': f.NAME, 'LABEL': f.LABEL, 'TYPE': f.TYPE} for f in fields],
-        'total': total
-    })
+    return paginate(query, ObjectField)
 
-@app.route('/object_fields/all', methods=['GET'])
+@bp.route('/object_fields/all', methods=['GET'])
+@read_replica
+@conditional_view(ObjectField)
+@cached_view
 def get_object_fields_all():
-    fields = ObjectField.query.filter_by(DELETED='0')
-    return jsonify({
-        'items': [{'ID': f.ID, 'OBJECT_ID': f.OBJECT_ID, 'NAME': f.NAME, 'LABEL': f.LABEL, 'TYPE': f.TYPE} for f in fields],
+    """
+    返回全部未删除的 ObjectField，可用 obj_id 过滤、fields 指定返回字段。
+    请求头 Accept: application/x-ndjson 或参数 stream=1 时以 NDJSON 流式返回：
+    服务端游标分批取数，每行一个 JSON 对象，内存占用与表大小无关。
+    """
+    try:
+        fields = get_requested_fields(ObjectField)
+    except ValueError as e:
+        return json_response({'message': str(e)}), 400
+    query = project(ObjectField.query.filter_by(DELETED='0'), ObjectField, fields)
+    obj_id = request.args.get('obj_id')
+    if obj_id:
+        query = query.filter(ObjectField.OBJECT_ID == obj_id)
+    if wants_ndjson():
+        return stream_response(iter_ndjson(query, fields), 'application/x-ndjson')
+    return json_response({
+        'items': rows_to_dicts(query, fields),
     })
 
-@app.route('/object_field/search', methods=['GET'])
+@bp.route('/object_field/search', methods=['GET'])
+@read_replica
+@conditional_view(ObjectField)
+@cached_view
 def search_object_fields():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     object_id = request.args.get('obj_id')
     name = request.args.get('name')
 
@@ -299,44 +642,23 @@ def search_object_fields():
     elif object_id:
         query = ObjectField.query.filter_by(OBJECT_ID=object_id, DELETED='0')
     else:
-        return jsonify({'message': 'Missing id or name parameter'}), 400
+        return json_response({'message': 'Missing id or name parameter'}), 400
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    fields = paginated_query.all()
-
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': f.ID, 'OBJECT_ID': f.OBJECT_ID, 'NAME': f.NAME, 'LABEL': f.LABEL, 'TYPE': f.TYPE} for f in fields],
-        'total': total
-    })
+    return paginate(query, ObjectField)
 
-@app.route('/object_fields/by_objid', methods=['GET'])
+@bp.route('/object_fields/by_objid', methods=['GET'])
+@read_replica
+@conditional_view(ObjectField)
+@cached_view
 def get_object_fields_by_objid():
-
-    # 获取分页参数（默认第1页，每页10条）
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
     obj_id = request.args.get('obj_id')
-    # 计算偏移量
-    offset = (page - 1) * page_size
 
     # 基础查询（过滤已删除项）
     query = ObjectField.query.filter_by(OBJECT_ID=obj_id).filter_by(DELETED='0')
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    pages = paginated_query.all()
-
-    # 获取总记录数
-    total = query.count()
-    # 返回分页结果
-    return jsonify({
-        'items': [{'ID': f.ID, 'OBJECT_ID': f.OBJECT_ID, 'NAME': f.NAME, 'LABEL': f.LABEL, 'TYPE': f.TYPE} for f in pages],
-        'total': total
-    })
+    return paginate(query, ObjectField)
 
-@app.route('/object_field', methods=['POST'])
+@bp.route('/object_field', methods=['POST'])
 def create_object_field():
     data = request.get_json()
     field = ObjectField(
@@ -347,10 +669,10 @@ def create_object_field():
     )
     db.session.add(field)
     db.session.commit()
-    return jsonify({'message': 'ObjectField created', 'ID': field.ID}), 201
+    return json_response({'message': 'ObjectField created', 'ID': field.ID}), 201
 
 
-# @app.route('/object_field/<id>', methods=['GET'])
+# @bp.route('/object_field/<id>', methods=['GET'])
 # def get_object_field(id):
 #     field = ObjectField.query.filter_by(ID=id, DELETED='0').first()
 #     if field:
@@ -358,80 +680,70 @@ def create_object_field():
 #     return jsonify({'message': 'ObjectField not found'}), 404
 
 
-@app.route('/object_field/<id>', methods=['PUT'])
+@bp.route('/object_field/<id>', methods=['PUT'])
 def update_object_field(id):
     data = request.get_json()
     field = ObjectField.query.filter_by(ID=id, DELETED='0').first()
     if not field:
-        return jsonify({'message': 'ObjectField not found or deleted'}), 404
+        return json_response({'message': 'ObjectField not found or deleted'}), 404
     field.NAME = data[0].get('NAME', field.NAME)
     field.LABEL = data[0].get('LABEL', field.LABEL)
     field.TYPE = data[0].get('TYPE', field.TYPE)
     db.session.commit()
     # return jsonify({'message': 'ObjectField updated'})
     obj_field = ObjectField.query.filter_by(ID=id, DELETED='0').first()
-    return jsonify({'message': 'Object_field updated','ID': obj_field.ID, 'OBJECT_ID': obj_field.OBJECT_ID,'NAME': obj_field.NAME, 'LABEL': obj_field.LABEL, 'TYPE': obj_field.TYPE})
+    return json_response({'message': 'Object_field updated', **ENCODERS[ObjectField](obj_field)})
 
 
 
 
-@app.route('/object_field/<id>', methods=['DELETE'])
+@bp.route('/object_field/<id>', methods=['DELETE'])
 def soft_delete_object_field(id):
     field = ObjectField.query.filter_by(ID=id, DELETED='0').first()
     if not field:
-        return jsonify({'message': 'ObjectField not found or already deleted'}), 404
+        return json_response({'message': 'ObjectField not found or already deleted'}), 404
     field.cascade_soft_delete()
     db.session.commit()
-    return jsonify({'message': 'ObjectField soft deleted'})
+    return json_response({'message': 'ObjectField soft deleted'})
 
 
-@app.route('/object_field/restore/<id>', methods=['PUT'])
+@bp.route('/object_field/restore/<id>', methods=['PUT'])
 def restore_object_field(id):
     field = ObjectField.query.filter_by(ID=id, DELETED='1').first()
     if not field:
-        return jsonify({'message': 'ObjectField not found or not deleted'}), 404
+        return json_response({'message': 'ObjectField not found or not deleted'}), 404
     field.cascade_restore()
     db.session.commit()
-    return jsonify({'message': 'ObjectField restored'})
+    return json_response({'message': 'ObjectField restored'})
 
 
-@app.route('/object_field/permanent_delete/<id>', methods=['DELETE'])
+@bp.route('/object_field/permanent_delete/<id>', methods=['DELETE'])
 def permanent_delete_object_field(id):
     field = ObjectField.query.filter_by(ID=id).first()
     if not field:
-        return jsonify({'message': 'ObjectField not found'}), 404
-    db.session.delete(field)
+        return json_response({'message': 'ObjectField not found'}), 404
+    counts = field.cascade_permanent_delete()
     db.session.commit()
-    return jsonify({'message': 'ObjectField permanently deleted'})
+    return json_response({'message': 'ObjectField permanently deleted', 'deleted': counts})
 
 
 # ---------------------------
 # PageListField API
 # ---------------------------
-@app.route('/page_list_fields', methods=['GET'])
+@bp.route('/page_list_fields', methods=['GET'])
+@read_replica
+@conditional_view(PageListField)
+@cached_view
 def get_page_list_fields():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     query = PageListField.query.filter_by(DELETED='0')
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    fields = paginated_query.all()
-
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': f.ID, 'NAME': f.NAME, 'OBJECT_FIELD_ID': f.OBJECT_FIELD_ID, 'PAGE_LIST_ID': f.PAGE_LIST_ID,'HIDDEN': f.HIDDEN,'TYPE': f.TYPE} for f in fields],
-        'total': total
-    })
+    return paginate(query, PageListField)
 
-@app.route('/page_list_field/search', methods=['GET'])
+@bp.route('/page_list_field/search', methods=['GET'])
+@read_replica
+@conditional_view(PageListField)
+@cached_view
 def search_page_list_fields():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     pagelist_id = request.args.get('pagelist_id')
     name = request.args.get('name')
     if name:
@@ -448,21 +760,12 @@ def search_page_list_fields():
     # elif name:
     #     query = PageListField.query.filter(PageListField.NAME.like(f'%{name}%')).filter(PageListField.DELETED == '0')
     else:
-        return jsonify({'message': 'Missing id or name parameter'}), 400
+        return json_response({'message': 'Missing id or name parameter'}), 400
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    fields = paginated_query.all()
-
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': f.ID, 'NAME': f.NAME, 'OBJECT_FIELD_ID': f.OBJECT_FIELD_ID, 'PAGE_LIST_ID': f.PAGE_LIST_ID,
-                   'HIDDEN': f.HIDDEN,'TYPE': f.TYPE} for f in fields],
-        'total': total
-    })
+    return paginate(query, PageListField)
 
 
-@app.route('/page_list_field', methods=['POST'])
+@bp.route('/page_list_field', methods=['POST'])
 def create_page_list_field():
     data = request.get_json()
     field = PageListField(
@@ -474,10 +777,10 @@ def create_page_list_field():
     )
     db.session.add(field)
     db.session.commit()
-    return jsonify({'message': 'PageListField created', 'ID': field.ID}), 201
+    return json_response({'message': 'PageListField created', 'ID': field.ID}), 201
 
 
-# @app.route('/page_list_field/<id>', methods=['GET'])
+# @bp.route('/page_list_field/<id>', methods=['GET'])
 # def get_page_list_field(id):
 #     field = PageListField.query.filter_by(ID=id, DELETED='0').first()
 #     if field:
@@ -485,76 +788,66 @@ def create_page_list_field():
 #     return jsonify({'message': 'PageListField not found'}), 404
 #
 
-@app.route('/page_list_field/<id>', methods=['PUT'])
+@bp.route('/page_list_field/<id>', methods=['PUT'])
 def update_page_list_field(id):
     data = request.get_json()
     field = PageListField.query.filter_by(ID=id, DELETED='0').first()
     if not field:
-        return jsonify({'message': 'PageListField not found or deleted'}), 404
+        return json_response({'message': 'PageListField not found or deleted'}), 404
     field.NAME = data[0].get('NAME', field.NAME)
     field.HIDDEN = data[0].get('HIDDEN', field.HIDDEN)
     field.TYPE = data[0].get('TYPE', field.TYPE)
     db.session.commit()
-    return jsonify({'message': 'PageListField updated'})
+    return json_response({'message': 'PageListField updated'})
 
 
-@app.route('/page_list_field/<id>', methods=['DELETE'])
+@bp.route('/page_list_field/<id>', methods=['DELETE'])
 def soft_delete_page_list_field(id):
     field = PageListField.query.filter_by(ID=id, DELETED='0').first()
     if not field:
-        return jsonify({'message': 'PageListField not found or already deleted'}), 404
+        return json_response({'message': 'PageListField not found or already deleted'}), 404
     field.cascade_soft_delete()
     db.session.commit()
-    return jsonify({'message': 'PageListField soft deleted'})
+    return json_response({'message': 'PageListField soft deleted'})
 
 
-@app.route('/page_list_field/restore/<id>', methods=['PUT'])
+@bp.route('/page_list_field/restore/<id>', methods=['PUT'])
 def restore_page_list_field(id):
     field = PageListField.query.filter_by(ID=id, DELETED='1').first()
     if not field:
-        return jsonify({'message': 'PageListField not found or not deleted'}), 404
+        return json_response({'message': 'PageListField not found or not deleted'}), 404
     field.cascade_restore()
     db.session.commit()
-    return jsonify({'message': 'PageListField restored'})
+    return json_response({'message': 'PageListField restored'})
 
 
-@app.route('/page_list_field/permanent_delete/<id>', methods=['DELETE'])
+@bp.route('/page_list_field/permanent_delete/<id>', methods=['DELETE'])
 def permanent_delete_page_list_field(id):
     field = PageListField.query.filter_by(ID=id).first()
     if not field:
-        return jsonify({'message': 'PageListField not found'}), 404
-    db.session.delete(field)
+        return json_response({'message': 'PageListField not found'}), 404
+    counts = field.cascade_permanent_delete()
     db.session.commit()
-    return jsonify({'message': 'PageListField permanently deleted'})
+    return json_response({'message': 'PageListField permanently deleted', 'deleted': counts})
 
 
 # ---------------------------
 # PageLayout API
 # ---------------------------
-@app.route('/page_layouts', methods=['GET'])
+@bp.route('/page_layouts', methods=['GET'])
+@read_replica
+@conditional_view(PageLayout)
+@cached_view
 def get_page_layouts():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     query = PageLayout.query.filter_by(DELETED='0')
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    layouts = paginated_query.all()
-
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': l.ID, 'NAME': l.NAME, 'PAGE_LIST_ID': l.PAGE_LIST_ID} for l in layouts],
-        'total': total
-    })
+    return paginate(query, PageLayout)
 
-@app.route('/page_layout/search', methods=['GET'])
+@bp.route('/page_layout/search', methods=['GET'])
+@read_replica
+@conditional_view(PageLayout)
+@cached_view
 def search_page_layouts():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     pagelist_id = request.args.get('pagelist_id')
     name = request.args.get('name')
     if name:
@@ -571,19 +864,11 @@ def search_page_layouts():
     # elif name:
     #     query = PageLayout.query.filter(PageLayout.NAME.like(f'%{name}%')).filter(PageLayout.DELETED == '0')
     else:
-        return jsonify({'message': 'Missing id or name parameter'}), 400
+        return json_response({'message': 'Missing id or name parameter'}), 400
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    layouts = paginated_query.all()
+    return paginate(query, PageLayout)
 
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': l.ID, 'NAME': l.NAME, 'PAGE_LIST_ID': l.PAGE_LIST_ID} for l in layouts],
-        'total': total
-    })
-
-@app.route('/page_layout', methods=['POST'])
+@bp.route('/page_layout', methods=['POST'])
 def create_page_layout():
     data = request.get_json()
     layout = PageLayout(
@@ -592,10 +877,10 @@ def create_page_layout():
     )
     db.session.add(layout)
     db.session.commit()
-    return jsonify({'message': 'PageLayout created', 'ID': layout.ID}), 201
+    return json_response({'message': 'PageLayout created', 'ID': layout.ID}), 201
 
 
-# @app.route('/page_layout/<id>', methods=['GET'])
+# @bp.route('/page_layout/<id>', methods=['GET'])
 # def get_page_layout(id):
 #     layout = PageLayout.query.filter_by(ID=id, DELETED='0').first()
 #     if layout:
@@ -603,75 +888,64 @@ def create_page_layout():
 #     return jsonify({'message': 'PageLayout not found'}), 404
 
 
-@app.route('/page_layout/<id>', methods=['PUT'])
+@bp.route('/page_layout/<id>', methods=['PUT'])
 def update_page_layout(id):
     data = request.get_json()
     layout = PageLayout.query.filter_by(ID=id, DELETED='0').first()
     if not layout:
-        return jsonify({'message': 'PageLayout not found or deleted'}), 404
+        return json_response({'message': 'PageLayout not found or deleted'}), 404
     layout.NAME = data[0].get('NAME', layout.NAME)
     db.session.commit()
-    return jsonify({'message': 'PageLayout updated'})
+    return json_response({'message': 'PageLayout updated'})
 
 
-@app.route('/page_layout/<id>', methods=['DELETE'])
+@bp.route('/page_layout/<id>', methods=['DELETE'])
 def soft_delete_page_layout(id):
     layout = PageLayout.query.filter_by(ID=id, DELETED='0').first()
     if not layout:
-        return jsonify({'message': 'PageLayout not found or already deleted'}), 404
+        return json_response({'message': 'PageLayout not found or already deleted'}), 404
     layout.cascade_soft_delete()
     db.session.commit()
-    return jsonify({'message': 'PageLayout and its related records soft deleted'})
+    return json_response({'message': 'PageLayout and its related records soft deleted'})
 
 
-@app.route('/page_layout/restore/<id>', methods=['PUT'])
+@bp.route('/page_layout/restore/<id>', methods=['PUT'])
 def restore_page_layout(id):
     layout = PageLayout.query.filter_by(ID=id, DELETED='1').first()
     if not layout:
-        return jsonify({'message': 'PageLayout not found or not deleted'}), 404
+        return json_response({'message': 'PageLayout not found or not deleted'}), 404
     layout.cascade_restore()
     db.session.commit()
-    return jsonify({'message': 'PageLayout and its related records restored'})
+    return json_response({'message': 'PageLayout and its related records restored'})
 
 
-@app.route('/page_layout/permanent_delete/<id>', methods=['DELETE'])
+@bp.route('/page_layout/permanent_delete/<id>', methods=['DELETE'])
 def permanent_delete_page_layout(id):
     layout = PageLayout.query.filter_by(ID=id).first()
     if not layout:
-        return jsonify({'message': 'PageLayout not found'}), 404
-    db.session.delete(layout)
+        return json_response({'message': 'PageLayout not found'}), 404
+    counts = layout.cascade_permanent_delete()
     db.session.commit()
-    return jsonify({'message': 'PageLayout permanently deleted'})
+    return json_response({'message': 'PageLayout permanently deleted', 'deleted': counts})
 
 
 # ---------------------------
 # PageLayoutField API
 # ---------------------------
-@app.route('/page_layout_fields', methods=['GET'])
+@bp.route('/page_layout_fields', methods=['GET'])
+@read_replica
+@conditional_view(PageLayoutField)
+@cached_view
 def get_page_layout_fields():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     query = PageLayoutField.query.filter_by(DELETED='0')
 
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    fields = paginated_query.all()
-
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': f.ID, 'TYPE': f.TYPE, 'NAME': f.NAME, 'LABEL': f.LABEL, 'PAGE_LAYOUT_ID': f.PAGE_LAYOUT_ID,
-                   'OBJECT_FIELD_ID': f.OBJECT_FIELD_ID} for f in fields],
-        'total': total
-    })
+    return paginate(query, PageLayoutField)
 
-@app.route('/page_layout_field/search', methods=['GET'])
+@bp.route('/page_layout_field/search', methods=['GET'])
+@read_replica
+@conditional_view(PageLayoutField)
+@cached_view
 def search_page_layout_fields():
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    offset = (page - 1) * page_size
-
     pagelayout_id = request.args.get('pagelayout_id')
     name = request.args.get('name')
 
@@ -689,21 +963,13 @@ def search_page_layout_fields():
     # elif name:
     #     query = PageLayoutField.query.filter(PageLayoutField.NAME.like(f'%{name}%')).filter(PageLayoutField.DELETED == '0')
     else:
-        return jsonify({'message': 'Missing id or name parameter'}), 400
-
-    # 分页查询
-    paginated_query = query.offset(offset).limit(page_size)
-    fields = paginated_query.all()
+        return json_response({'message': 'Missing id or name parameter'}), 400
 
-    total = query.count()
-    return jsonify({
-        'items': [{'ID': f.ID, 'TYPE': f.TYPE, 'NAME': f.NAME, 'LABEL': f.LABEL, 'PAGE_LAYOUT_ID': f.PAGE_LAYOUT_ID, 'OBJECT_FIELD_ID': f.OBJECT_FIELD_ID} for f in fields],
-        'total': total
-    })
+    return paginate(query, PageLayoutField)
 
 
 
-@app.route('/page_layout_field', methods=['POST'])
+@bp.route('/page_layout_field', methods=['POST'])
 def create_page_layout_field():
     data = request.get_json()
     field = PageLayoutField(
@@ -715,10 +981,10 @@ def create_page_layout_field():
     )
     db.session.add(field)
     db.session.commit()
-    return jsonify({'message': 'PageLayoutField created', 'ID': field.ID}), 201
+    return json_response({'message': 'PageLayoutField created', 'ID': field.ID}), 201
 
 
-# @app.route('/page_layout_field/<id>', methods=['GET'])
+# @bp.route('/page_layout_field/<id>', methods=['GET'])
 # def get_page_layout_field(id):
 #     field = PageLayoutField.query.filter_by(ID=id, DELETED='0').first()
 #     if field:
@@ -726,449 +992,795 @@ def create_page_layout_field():
 #     return jsonify({'message': 'PageLayoutField not found'}), 404
 #
 
-@app.route('/page_layout_field/<id>', methods=['PUT'])
+@bp.route('/page_layout_field/<id>', methods=['PUT'])
 def update_page_layout_field(id):
     data = request.get_json()
     field = PageLayoutField.query.filter_by(ID=id, DELETED='0').first()
     if not field:
-        return jsonify({'message': 'PageLayoutField not found or deleted'}), 404
+        return json_response({'message': 'PageLayoutField not found or deleted'}), 404
     field.NAME = data[0].get('NAME', field.NAME)
     field.LABEL = data[0].get('LABEL', field.LABEL)
     field.TYPE = data[0].get('TYPE', field.TYPE)
     db.session.commit()
-    return jsonify({'message': 'PageLayoutField updated'})
+    return json_response({'message': 'PageLayoutField updated'})
 
 
-@app.route('/page_layout_field/<id>', methods=['DELETE'])
+@bp.route('/page_layout_field/<id>', methods=['DELETE'])
 def soft_delete_page_layout_field(id):
     field = PageLayoutField.query.filter_by(ID=id, DELETED='0').first()
     if not field:
-        return jsonify({'message': 'PageLayoutField not found or already deleted'}), 404
+        return json_response({'message': 'PageLayoutField not found or already deleted'}), 404
     field.cascade_soft_delete()
     db.session.commit()
-    return jsonify({'message': 'PageLayoutField soft deleted'})
+    return json_response({'message': 'PageLayoutField soft deleted'})
 
 
-@app.route('/page_layout_field/restore/<id>', methods=['PUT'])
+@bp.route('/page_layout_field/restore/<id>', methods=['PUT'])
 def restore_page_layout_field(id):
     field = PageLayoutField.query.filter_by(ID=id, DELETED='1').first()
     if not field:
-        return jsonify({'message': 'PageLayoutField not found or not deleted'}), 404
+        return json_response({'message': 'PageLayoutField not found or not deleted'}), 404
     field.cascade_restore()
     db.session.commit()
-    return jsonify({'message': 'PageLayoutField restored'})
+    return json_response({'message': 'PageLayoutField restored'})
 
 
-@app.route('/page_layout_field/permanent_delete/<id>', methods=['DELETE'])
+@bp.route('/page_layout_field/permanent_delete/<id>', methods=['DELETE'])
 def permanent_delete_page_layout_field(id):
     field = PageLayoutField.query.filter_by(ID=id).first()
     if not field:
-        return jsonify({'message': 'PageLayoutField not found'}), 404
-    db.session.delete(field)
+        return json_response({'message': 'PageLayoutField not found'}), 404
+    counts = field.cascade_permanent_delete()
     db.session.commit()
-    return jsonify({'message': 'PageLayoutField permanently deleted'})
+    return json_response({'message': 'PageLayoutField permanently deleted', 'deleted': counts})
+
+
+# ---------------------------
+# 批量 API
+# ---------------------------
+# URL 中的实体名 -> (模型, 可创建字段, 可更新字段)；外键沿用 CSV_IMPORT_SPECS 的定义
+BATCH_SPECS = {
+    'page_list': (PageList, ['NAME', 'LABEL'], ['NAME', 'LABEL']),
+    'object': (Object, ['NAME', 'LABEL', 'TABLE_NAME'], ['NAME', 'LABEL', 'TABLE_NAME']),
+    'object_field': (ObjectField, ['OBJECT_ID', 'NAME', 'LABEL', 'TYPE'], ['NAME', 'LABEL', 'TYPE']),
+    'page_list_field': (PageListField, ['NAME', 'OBJECT_FIELD_ID', 'PAGE_LIST_ID', 'HIDDEN', 'TYPE'],
+                        ['NAME', 'HIDDEN', 'TYPE']),
+    'page_layout': (PageLayout, ['NAME', 'PAGE_LIST_ID'], ['NAME']),
+    'page_layout_field': (PageLayoutField, ['NAME', 'LABEL', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID', 'TYPE'],
+                          ['NAME', 'LABEL', 'TYPE']),
+}
+
 
-def get_decoded_stream(file):
+def get_batch_items():
+    """读取请求体中的 JSON 数组，返回 (元素列表, 错误响应)。"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        return None, (json_response({'message': 'Request body must be a non-empty JSON array'}), 400)
+    if len(data) > current_app.config['BATCH_MAX_ITEMS']:
+        return None, (json_response({'message': f'Too many items, at most {current_app.config["BATCH_MAX_ITEMS"]} per batch'}), 413)
+    return data, None
+
+
+def fetch_existing_ids_in(model_cls, ids):
+    """fetch_existing_ids 的便捷形式，忽略非字符串 ID；返回的集合中均为小写 ID。"""
+    return fetch_existing_ids(model_cls, {normalize_id(i) for i in ids if isinstance(i, str)})
+
+
+def invalid_fields(item, fields):
+    """元素中值类型不合法的字段：ID、外键与其他列的值只能是字符串或 null。"""
+    return [field for field in fields if not isinstance(item.get(field), (str, type(None)))]
+
+
+def invalid_fields_error(fields):
+    return 'Invalid value (expected string or null): ' + ', '.join(fields)
+
+
+def batch_response(action, results):
     """
-    读取上传的文件，自动检测编码后返回 StringIO 对象。
+    所有元素均有效时返回 200；否则返回 400 且不做任何修改。
+    results 为逐元素结果列表，与请求数组一一对应。
     """
-    raw_data = file.read()
-    detected = chardet.detect(raw_data)
-    encoding = detected.get('encoding')
-    if not encoding:
+    failed = [r for r in results if r['status'] == 'error']
+    if failed:
+        # 有效元素标记为 valid（未执行）；未写入的新建记录不返回 ID
+        for r in results:
+            if r['status'] != 'error':
+                r['status'] = 'valid'
+                if action == 'created':
+                    r.pop('ID', None)
+        return json_response({'message': f'{len(failed)} item(s) invalid, nothing {action}', 'results': results}), 400
+    done = sum(1 for r in results if r['status'] == action)
+    return json_response({'message': f'{done} item(s) {action}', 'results': results})
+
+
+def batch_create(model_cls, create_fields):
+    items, error = get_batch_items()
+    if error:
+        return error
+    foreign_keys = CSV_IMPORT_SPECS[model_cls][1]
+    existing = {
+        col: fetch_existing_ids_in(ref_model, (item.get(col) for item in items if isinstance(item, dict)))
+        for col, ref_model in foreign_keys.items()
+    }
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'index': index, 'status': 'error', 'error': 'Item must be an object'})
+            continue
+        invalid = invalid_fields(item, create_fields)
+        if invalid:
+            results.append({'index': index, 'status': 'error', 'error': invalid_fields_error(invalid)})
+            continue
+        missing = [col for col in foreign_keys if normalize_id(item.get(col)) not in existing[col]]
+        if missing:
+            results.append({'index': index, 'status': 'error', 'error': 'Foreign key not found: ' + ', '.join(missing)})
+            continue
+        row = {field: normalize_id(item.get(field)) if field in foreign_keys else item.get(field)
+               for field in create_fields}
+        row['ID'] = new_id()
+        rows.append(row)
+        results.append({'index': index, 'status': 'created', 'ID': row['ID']})
+    if len(rows) == len(items):
+        # 一条多行 INSERT，一次提交
+        db.session.execute(insert(model_cls), rows)
+        db.session.commit()
+    return batch_response('created', results)
+
+
+def batch_update(model_cls, update_fields):
+    items, error = get_batch_items()
+    if error:
+        return error
+    live_ids = fetch_existing_ids_in(model_cls, (item.get('ID') for item in items if isinstance(item, dict)))
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        invalid = invalid_fields(item, ['ID'] + update_fields) if isinstance(item, dict) else []
+        if invalid:
+            results.append({'index': index, 'status': 'error', 'ID': item.get('ID'),
+                            'error': invalid_fields_error(invalid)})
+            continue
+        if not isinstance(item, dict) or normalize_id(item.get('ID')) not in live_ids:
+            results.append({'index': index, 'status': 'error', 'ID': item.get('ID') if isinstance(item, dict) else None,
+                            'error': f'{model_cls.__name__} not found or deleted'})
+            continue
+        # 与单条更新一致：未提供的字段保持原值；没有可更新字段的元素不写入，标记为 unchanged
+        row = {field: item[field] for field in update_fields if field in item}
+        if not row:
+            results.append({'index': index, 'status': 'unchanged', 'ID': item['ID']})
+            continue
+        row['ID'] = normalize_id(item['ID'])
+        rows.append(row)
+        results.append({'index': index, 'status': 'updated', 'ID': item['ID']})
+    if rows and all(r['status'] != 'error' for r in results):
+        # 按主键批量 UPDATE（字段组合相同的元素合并为一次 executemany），一次提交
+        db.session.execute(update(model_cls), rows)
+        db.session.commit()
+    return batch_response('updated', results)
+
+
+def batch_soft_delete(model_cls):
+    items, error = get_batch_items()
+    if error:
+        return error
+    # 元素可以是 ID 字符串，也可以是包含 ID 的对象
+    ids = [item.get('ID') if isinstance(item, dict) else item for item in items]
+    live_ids = fetch_existing_ids_in(model_cls, ids)
+    results = []
+    for index, item_id in enumerate(ids):
+        if not isinstance(item_id, (str, type(None))):
+            results.append({'index': index, 'status': 'error', 'ID': item_id,
+                            'error': 'Item must be an ID string or an object with a string ID'})
+        elif normalize_id(item_id) in live_ids:
+            results.append({'index': index, 'status': 'deleted', 'ID': item_id})
+        else:
+            results.append({'index': index, 'status': 'error', 'ID': item_id,
+                            'error': f'{model_cls.__name__} not found or already deleted'})
+    if all(r['status'] == 'deleted' for r in results):
+        # 集合式级联软删除，一次提交
+        delete_ids = list(dict.fromkeys(normalize_id(i) for i in ids))
+        for start in range(0, len(delete_ids), FK_LOOKUP_CHUNK_SIZE):
+            model_cls.cascade_soft_delete_ids(delete_ids[start:start + FK_LOOKUP_CHUNK_SIZE])
+        db.session.commit()
+    return batch_response('deleted', results)
+
+
+@bp.route('/page_list/batch', methods=['POST', 'PUT', 'DELETE'], defaults={'entity': 'page_list'})
+@bp.route('/object/batch', methods=['POST', 'PUT', 'DELETE'], defaults={'entity': 'object'})
+@bp.route('/object_field/batch', methods=['POST', 'PUT', 'DELETE'], defaults={'entity': 'object_field'})
+@bp.route('/page_list_field/batch', methods=['POST', 'PUT', 'DELETE'], defaults={'entity': 'page_list_field'})
+@bp.route('/page_layout/batch', methods=['POST', 'PUT', 'DELETE'], defaults={'entity': 'page_layout'})
+@bp.route('/page_layout_field/batch', methods=['POST', 'PUT', 'DELETE'], defaults={'entity': 'page_layout_field'})
+def batch_entities(entity):
+    """
+    批量创建（POST）、更新（PUT，元素需含 ID）、级联软删除（DELETE，元素为 ID 或含 ID 的对象）。
+    整个数组在一个事务内处理：外键与 ID 批量校验，多行 INSERT/UPDATE，一次提交；
+    任一元素无效时返回 400 与逐元素结果，不做任何修改。
+    """
+    model_cls, create_fields, update_fields = BATCH_SPECS[entity]
+    if request.method == 'POST':
+        return batch_create(model_cls, create_fields)
+    if request.method == 'PUT':
+        return batch_update(model_cls, update_fields)
+    return batch_soft_delete(model_cls)
+
+
+# 编码检测只读取文件开头的样本，检测耗时与文件大小无关
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# 按 BOM 判定编码；UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头，需先判断
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# 样本检测结果到实际解码编码的映射：样本之后可能出现样本中没有的字符，
+# 因此改用兼容的超集编码
+ENCODING_SUPERSETS = {
+    'ascii': 'utf-8',
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+}
+
+
+class PrefixedStream(io.RawIOBase):
+    """先返回已读取的样本字节，再继续读取原始流，避免依赖 seek。"""
+
+    def __init__(self, prefix, stream):
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._prefix:
+            n = min(len(b), len(self._prefix))
+            b[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._stream.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def detect_encoding(sample):
+    """根据 BOM 或样本内容判断编码，无法判断时使用 utf-8。"""
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+    encoding = chardet.detect(sample).get('encoding') or 'utf-8'
+    encoding = ENCODING_SUPERSETS.get(encoding.lower(), encoding)
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
         encoding = 'utf-8'
-    decoded_data = raw_data.decode(encoding, errors='replace')
-    return StringIO(decoded_data, newline=None)
+    return encoding
 
 
-def import_csv_common(model_cls, field_list, row):
+def get_decoded_stream(stream, encoding=None):
     """
-    通用的 CSV 行数据转换为模型实例。
-    model_cls: 数据模型类
+    读取上传文件（二进制流）开头的样本检测编码（已知 encoding 时跳过检测），
+    返回按该编码增量解码的文本流。文件内容不会整体读入内存。
+    """
+    sample = stream.read(ENCODING_SAMPLE_SIZE)
+    encoding = encoding or detect_encoding(sample)
+    raw = io.BufferedReader(PrefixedStream(sample, stream))
+    return io.TextIOWrapper(raw, encoding=encoding, errors='replace', newline=None)
+
+
+def import_csv_common(field_list, row):
+    """
+    通用的 CSV 行数据转换为插入参数字典。
     field_list: 字段名列表，对应 CSV 列的顺序
     row: CSV 文件中一行数据（列表）
     """
-    data = { field: row[idx] for idx, field in enumerate(field_list) }
-    return model_cls(**data)
-# ----------------- 1. PageList CSV 导入 -----------------
-@app.route('/import_csv/pagelist', methods=['POST'])
-def import_csv_pagelist():
-    # CSV 列序：NAME, LABEL
-    if 'file' not in request.files:
-        return jsonify({'message': '未找到文件'}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'message': '未选择文件'}), 400
+    return { field: row[idx] for idx, field in enumerate(field_list) }
 
-    try:
-        stream = get_decoded_stream(file)
-        csv_reader = csv.reader(stream)
-        next(csv_reader)  # 跳过标题行
-
-        new_items = []
-        error_rows = []
-        for idx, row in enumerate(csv_reader, start=2):
-            if len(row) < 2:
-                error_rows.append({'row': idx, 'error': '列数不足'})
-                continue
-
-            # 构造实例（无需外键验证）
-            new_item = PageList(
-                NAME=row[0],
-                LABEL=row[1]
-            )
-            new_items.append(new_item)
 
-        if error_rows:
-            # 若存在错误，则返回错误，不做任何插入
-            return jsonify({'message': 'CSV 数据存在错误，未执行导入'+str(error_rows), 'errors': error_rows}), 400
+# CSV 导入规格：模型 -> (CSV 列序, {外键列: 被引用模型})
+# 外键列的顺序即错误信息中缺失外键的列出顺序
+CSV_IMPORT_SPECS = {
+    PageList: (['NAME', 'LABEL'], {}),
+    Object: (['NAME', 'LABEL', 'TABLE_NAME'], {}),
+    ObjectField: (['OBJECT_ID', 'NAME', 'LABEL', 'TYPE'], {'OBJECT_ID': Object}),
+    PageListField: (['NAME', 'OBJECT_FIELD_ID', 'PAGE_LIST_ID', 'HIDDEN', 'TYPE'],
+                    {'OBJECT_FIELD_ID': ObjectField, 'PAGE_LIST_ID': PageList}),
+    PageLayout: (['NAME', 'PAGE_LIST_ID'], {'PAGE_LIST_ID': PageList}),
+    PageLayoutField: (['NAME', 'LABEL', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID', 'TYPE'],
+                      {'PAGE_LAYOUT_ID': PageLayout, 'OBJECT_FIELD_ID': ObjectField}),
+}
 
-        # 数据全部有效，批量添加
-        for item in new_items:
-            db.session.add(item)
-        db.session.commit()
-        return jsonify({'message': f'PageList CSV 导入成功，共导入 {len(new_items)} 条记录'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'message': '导入 PageList CSV 出错'+str(e), 'error': str(e)}), 500
+# 外键校验时每条 IN (...) 查询携带的 ID 数量上限
+FK_LOOKUP_CHUNK_SIZE = 1000
 
-# ----------------- 2. Object CSV 导入 -----------------
-@app.route('/import_csv/object', methods=['POST'])
-def import_csv_object():
-    # CSV 列序：NAME, LABEL, TABLE_NAME
+
+def normalize_id(value):
+    """
+    ID 统一为小写十六进制后再查找与比较：数据库返回的 ID 总是小写，
+    而 MySQL 的不区分大小写排序规则（及 BINARY(16) 的 UNHEX）同样能按大写 ID 找到记录。
+    """
+    return value.lower() if isinstance(value, str) else value
+
+
+def fetch_existing_ids(model_cls, ids, chunk_size=FK_LOOKUP_CHUNK_SIZE):
+    """
+    分批执行 IN (...) 查询，返回 ids 中存在且未软删除的 ID 集合。
+    """
+    ids = list(ids)
+    existing = set()
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        rows = db.session.query(model_cls.ID).filter(
+            model_cls.ID.in_(chunk),
+            model_cls.DELETED == '0'
+        ).all()
+        existing.update(r[0] for r in rows)
+    return existing
+
+
+def iter_csv_rows(stream, start, encoding):
+    """
+    从 start 位置重新读取上传文件，跳过标题行，逐行产出 (行号, 行)。
+    上传文件是可 seek 的临时文件，导入的每一遍都流式读取，不在内存中保留全部行。
+    """
+    stream.seek(start)
+    csv_reader = csv.reader(get_decoded_stream(stream, encoding))
+    next(csv_reader)  # 跳过标题行
+    return enumerate(csv_reader, start=2)
+
+
+def collect_referenced_ids(rows, field_list, foreign_keys, progress):
+    """第一遍：收集整个文件引用的外键 ID，按被引用模型分组。"""
+    referenced = {ref_model: set() for ref_model in foreign_keys.values()}
+    positions = [(field_list.index(col), ref_model) for col, ref_model in foreign_keys.items()]
+    for idx, row in rows:
+        progress['parsed'] = idx - 1
+        if len(row) < len(field_list):
+            continue
+        for pos, ref_model in positions:
+            referenced[ref_model].add(normalize_id(row[pos]))
+    return referenced
+
+
+def validate_csv_rows(rows, field_list, foreign_keys, existing, error_rows, progress):
+    """
+    逐行检查列数，并在内存中比对第一遍查得的外键 ID（existing），避免每行一次数据库往返。
+    逐个产出通过校验的行（外键已规范为小写），错误行追加到 error_rows，格式与逐行校验时一致。
+    progress 中的 validated 随处理进度更新。
+    """
+    fk_columns = [(field_list.index(col), col, ref_model) for col, ref_model in foreign_keys.items()]
+    for idx, row in rows:
+        progress['validated'] = idx - 1
+        if len(row) < len(field_list):
+            error_rows.append({'row': idx, 'error': '列数不足'})
+            continue
+        missing = [col for pos, col, ref_model in fk_columns if normalize_id(row[pos]) not in existing[ref_model]]
+        if missing:
+            if len(fk_columns) == 1:
+                error = f'外键 {missing[0]} 不存在'
+            else:
+                error = '外键不存在: ' + ', '.join(missing)
+            error_rows.append({'row': idx, 'data': row, 'error': error})
+            continue
+        for pos, _, _ in fk_columns:
+            row[pos] = normalize_id(row[pos])
+        yield row
+
+
+IMPORT_COMMIT_MODES = ('atomic', 'chunked')
+
+
+def bulk_insert_rows(model_cls, field_list, rows, batch_size, commit_mode, progress):
+    """
+    以多行 INSERT（executemany）分批写入已校验的 CSV 行，不经过 ORM 工作单元。
+    rows 可以是迭代器，每次只在内存中保留一批。
+    ID、DELETED 等列默认值由列定义在插入时生成。
+    commit_mode 为 atomic 时全部写入后统一提交（任一批失败则整体回滚）；
+    为 chunked 时每批提交一次，适合超大文件，失败时已提交的批次会保留。
+    progress 字典中的 inserted / committed 随每批更新。
+    """
+    rows = iter(rows)
+    while True:
+        batch = [import_csv_common(field_list, row) for row in itertools.islice(rows, batch_size)]
+        if not batch:
+            break
+        db.session.execute(insert(model_cls), batch)
+        progress['inserted'] += len(batch)
+        if commit_mode == 'chunked':
+            db.session.commit()
+            record_imported_rows(model_cls, progress['inserted'] - progress['committed'])
+            progress['committed'] = progress['inserted']
+    db.session.commit()
+    record_imported_rows(model_cls, progress['inserted'] - progress['committed'])
+    progress['committed'] = progress['inserted']
+
+
+def record_imported_rows(model_cls, count):
+    if count:
+        metrics.csv_import_rows_total.inc(count, model=model_cls.__name__, result='imported')
+
+
+def run_csv_import(model_cls, stream, batch_size, commit_mode, progress):
+    """
+    执行一次 CSV 导入，对上传文件（可 seek 的二进制流）流式读取三遍，内存占用与文件大小无关：
+    1. 收集外键 ID 并分批查询；2. 校验列数与外键，只保留错误行；
+    3. 全部有效时再次读取并校验，按 batch_size 分批插入。
+    返回错误行列表，为空表示已全部写入。
+    """
+    field_list, foreign_keys = CSV_IMPORT_SPECS[model_cls]
+    start = stream.tell()
+    encoding = detect_encoding(stream.read(ENCODING_SAMPLE_SIZE))
+
+    referenced = collect_referenced_ids(iter_csv_rows(stream, start, encoding), field_list, foreign_keys, progress)
+    # 同一被引用模型（如 ObjectField）的 ID 合并为一组查询
+    existing = {ref_model: fetch_existing_ids(ref_model, ids) for ref_model, ids in referenced.items()}
+
+    error_rows = []
+    for _ in validate_csv_rows(iter_csv_rows(stream, start, encoding), field_list, foreign_keys, existing,
+                               error_rows, progress):
+        pass
+    if error_rows:
+        # 若存在错误，则不做任何插入
+        metrics.csv_import_rows_total.inc(len(error_rows), model=model_cls.__name__, result='rejected')
+        return error_rows
+
+    # 数据全部有效，批量添加
+    valid_rows = validate_csv_rows(iter_csv_rows(stream, start, encoding), field_list, foreign_keys, existing,
+                                   error_rows, progress)
+    bulk_insert_rows(model_cls, field_list, valid_rows, batch_size, commit_mode, progress)
+    return []
+
+
+def get_import_job_manager():
+    return get_app_state('import_job_manager', lambda: ImportJobManager(
+        max_workers=current_app.config['IMPORT_WORKERS'],
+        max_pending=current_app.config['IMPORT_QUEUE_SIZE'],
+        executor=current_app.config['IMPORT_EXECUTOR']
+    ))
+
+
+def run_import_job(app, job, model_cls, path, batch_size, commit_mode):
+    """在工作线程中执行后台导入任务，结束后删除落盘的上传文件。"""
+    try:
+        with app.app_context(), open(path, 'rb') as f:
+            error_rows = run_csv_import(model_cls, f, batch_size, commit_mode, job.progress)
+        if error_rows:
+            job.state = 'failed'
+            job.errors = error_rows
+            job.message = 'CSV 数据存在错误，未执行导入'
+        else:
+            job.message = f'{model_cls.__name__} CSV 导入成功，共导入 {job.progress["committed"]} 条记录'
+    finally:
+        os.remove(path)
+
+
+def submit_import_job(model_cls, file, batch_size, commit_mode):
+    """把上传文件落盘后提交后台任务，立即返回任务 ID。"""
+    fd, path = tempfile.mkstemp(prefix='csv-import-', suffix='.csv', dir=current_app.config['IMPORT_SPOOL_DIR'])
+    os.close(fd)
+    file.save(path)
+    job = ImportJob(model_cls.__name__, file.filename)
+    app = current_app._get_current_object()
+    try:
+        get_import_job_manager().submit(
+            job, lambda j: run_import_job(app, j, model_cls, path, batch_size, commit_mode))
+    except QueueFull:
+        os.remove(path)
+        return json_response({'message': '导入任务队列已满，请稍后重试'}), 503
+    return json_response({
+        'message': f'{model_cls.__name__} CSV 导入任务已提交',
+        'job_id': job.id,
+        'status_url': f'/import_jobs/{job.id}'
+    }), 202
+
+
+def import_csv_model(model_cls):
+    """
+    通用的 CSV 导入接口处理。
+    请求参数 batch_size 指定每条 INSERT 的行数，commit_mode 指定提交方式（atomic / chunked）；
+    async=1 时上传文件落盘后交由后台任务处理，通过 /import_jobs/<id> 查询进度。
+    """
+    name = model_cls.__name__
     if 'file' not in request.files:
-        return jsonify({'message': '未找到文件'}), 400
+        return json_response({'message': '未找到文件'}), 400
     file = request.files['file']
     if file.filename == '':
-        return jsonify({'message': '未选择文件'}), 400
-
+        return json_response({'message': '未选择文件'}), 400
+    batch_size = request.args.get('batch_size', current_app.config['CSV_IMPORT_BATCH_SIZE'], type=int)
+    commit_mode = request.args.get('commit_mode', current_app.config['CSV_IMPORT_COMMIT_MODE'])
+    if batch_size is None or batch_size < 1:
+        return json_response({'message': 'Invalid batch_size parameter'}), 400
+    if commit_mode not in IMPORT_COMMIT_MODES:
+        return json_response({'message': 'Invalid commit_mode parameter'}), 400
+
+    if request.args.get('async') in ('1', 'true'):
+        return submit_import_job(model_cls, file, batch_size, commit_mode)
+
+    started = time.perf_counter()
+    progress = {'parsed': 0, 'validated': 0, 'inserted': 0, 'committed': 0}
     try:
-        stream = get_decoded_stream(file)
-        csv_reader = csv.reader(stream)
-        next(csv_reader)
-
-        new_items = []
-        error_rows = []
-        for idx, row in enumerate(csv_reader, start=2):
-            if len(row) < 3:
-                error_rows.append({'row': idx, 'error': '列数不足'})
-                continue
-
-            new_item = Object(
-                NAME=row[0],
-                LABEL=row[1],
-                TABLE_NAME=row[2]
-            )
-            new_items.append(new_item)
-
+        error_rows = run_csv_import(model_cls, file.stream, batch_size, commit_mode, progress)
         if error_rows:
-            return jsonify({'message': 'CSV 数据存在错误，未执行导入'+str(error_rows), 'errors': error_rows}), 400
-
-        for item in new_items:
-            db.session.add(item)
-        db.session.commit()
-        return jsonify({'message': f'Object CSV 导入成功，共导入 {len(new_items)} 条记录'})
+            return json_response({'message': 'CSV 数据存在错误，未执行导入'+str(error_rows), 'errors': error_rows}), 400
+
+        inserted = progress['committed']
+        elapsed = time.perf_counter() - started
+        return json_response({
+            'message': f'{name} CSV 导入成功，共导入 {inserted} 条记录',
+            'inserted': inserted,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(inserted / elapsed, 1) if elapsed > 0 else None
+        })
     except Exception as e:
         db.session.rollback()
-        return jsonify({'message': '导入 Object CSV 出错'+str(e), 'error': str(e)}), 500
+        # chunked 模式下失败前已提交的批次不会回滚
+        return json_response({'message': f'导入 {name} CSV 出错'+str(e), 'error': str(e),
+                        'inserted': progress['committed']}), 500
 
-# ----------------- 3. ObjectField CSV 导入 -----------------
-@app.route('/import_csv/object_field', methods=['POST'])
-def import_csv_object_field():
-    # CSV 列序：OBJECT_ID, NAME, LABEL, TYPE
-    if 'file' not in request.files:
-        return jsonify({'message': '未找到文件'}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'message': '未选择文件'}), 400
 
-    try:
-        stream = get_decoded_stream(file)
-        csv_reader = csv.reader(stream)
-        next(csv_reader)
-
-        new_items = []
-        error_rows = []
-        for idx, row in enumerate(csv_reader, start=2):
-            if len(row) < 4:
-                error_rows.append({'row': idx, 'error': '列数不足'})
-                continue
-
-            # 验证外键：OBJECT_ID 必须存在且未软删除
-            obj = Object.query.filter_by(ID=row[0], DELETED='0').first()
-            if not obj:
-                error_rows.append({'row': idx, 'data': row, 'error': '外键 OBJECT_ID 不存在'})
-                continue
-
-            new_item = ObjectField(
-                OBJECT_ID=row[0],
-                NAME=row[1],
-                LABEL=row[2],
-                TYPE=row[3]
-            )
-            new_items.append(new_item)
+@bp.route('/import_jobs/<job_id>', methods=['GET'])
+def get_import_job(job_id):
+    job = get_import_job_manager().get(job_id)
+    if not job:
+        return json_response({'message': 'Import job not found'}), 404
+    return json_response(job.to_dict())
 
 
-        if error_rows:
-            return jsonify({'message': 'CSV 数据存在错误，未执行导入'+str(error_rows), 'errors': error_rows}), 400
+# ----------------- 1. PageList CSV 导入 -----------------
+@bp.route('/import_csv/pagelist', methods=['POST'])
+def import_csv_pagelist():
+    # CSV 列序：NAME, LABEL
+    return import_csv_model(PageList)
 
-        for item in new_items:
-            db.session.add(item)
-        db.session.commit()
-        return jsonify({'message': f'ObjectField CSV 导入成功，共导入 {len(new_items)} 条记录'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'message': '导入 ObjectField CSV 出错'+str(e), 'error': str(e)}), 500
+# ----------------- 2. Object CSV 导入 -----------------
+@bp.route('/import_csv/object', methods=['POST'])
+def import_csv_object():
+    # CSV 列序：NAME, LABEL, TABLE_NAME
+    return import_csv_model(Object)
+
+# ----------------- 3. ObjectField CSV 导入 -----------------
+@bp.route('/import_csv/object_field', methods=['POST'])
+def import_csv_object_field():
+    # CSV 列序：OBJECT_ID, NAME, LABEL, TYPE
+    # 外键：OBJECT_ID 必须存在且未软删除
+    return import_csv_model(ObjectField)
 
 # ----------------- 4. PageListField CSV 导入 -----------------
-@app.route('/import_csv/page_list_field', methods=['POST'])
+@bp.route('/import_csv/page_list_field', methods=['POST'])
 def import_csv_page_list_field():
     # CSV 列序：NAME, OBJECT_FIELD_ID, PAGE_LIST_ID, HIDDEN, TYPE
-    if 'file' not in request.files:
-        return jsonify({'message': '未找到文件'}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'message': '未选择文件'}), 400
-
-    try:
-        stream = get_decoded_stream(file)
-        csv_reader = csv.reader(stream)
-        next(csv_reader)
-
-        new_items = []
-        error_rows = []
-        for idx, row in enumerate(csv_reader, start=2):
-            if len(row) < 5:
-                error_rows.append({'row': idx, 'error': '列数不足'})
-                continue
-
-            # 验证外键：OBJECT_FIELD_ID 与 PAGE_LIST_ID 必须存在且未软删除
-            obj_field = ObjectField.query.filter_by(ID=row[1], DELETED='0').first()
-            page_list = PageList.query.filter_by(ID=row[2], DELETED='0').first()
-            missing = []
-            if not obj_field:
-                missing.append('OBJECT_FIELD_ID')
-            if not page_list:
-                missing.append('PAGE_LIST_ID')
-            if missing:
-                error_rows.append({
-                    'row': idx,
-                    'data': row,
-                    'error': '外键不存在: ' + ', '.join(missing)
-                })
-                continue
-
-            new_item = PageListField(
-                NAME=row[0],
-                OBJECT_FIELD_ID=row[1],
-                PAGE_LIST_ID=row[2],
-                HIDDEN=row[3],
-                TYPE=row[4]
-            )
-            new_items.append(new_item)
-
-        if error_rows:
-            return jsonify({'message': 'CSV 数据存在错误，未执行导入'+str(error_rows), 'errors': error_rows}), 400
-
-        for item in new_items:
-            db.session.add(item)
-        db.session.commit()
-        return jsonify({'message': f'PageListField CSV 导入成功，共导入 {len(new_items)} 条记录'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'message': '导入 PageListField CSV 出错'+str(e), 'error': str(e)}), 500
+    # 外键：OBJECT_FIELD_ID 与 PAGE_LIST_ID 必须存在且未软删除
+    return import_csv_model(PageListField)
 
 # ----------------- 5. PageLayout CSV 导入 -----------------
-@app.route('/import_csv/page_layout', methods=['POST'])
+@bp.route('/import_csv/page_layout', methods=['POST'])
 def import_csv_page_layout():
     # CSV 列序：NAME, PAGE_LIST_ID
-    if 'file' not in request.files:
-        return jsonify({'message': '未找到文件'}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'message': '未选择文件'}), 400
-
-    try:
-        stream = get_decoded_stream(file)
-        csv_reader = csv.reader(stream)
-        next(csv_reader)
-
-        new_items = []
-        error_rows = []
-        for idx, row in enumerate(csv_reader, start=2):
-            if len(row) < 2:
-                error_rows.append({'row': idx, 'error': '列数不足'})
-                continue
-
-            # 验证外键：PAGE_LIST_ID 必须存在且未软删除
-            page_list = PageList.query.filter_by(ID=row[1], DELETED='0').first()
-            if not page_list:
-                error_rows.append({'row': idx, 'data': row, 'error': '外键 PAGE_LIST_ID 不存在'})
-                continue
-
-            new_item = PageLayout(
-                NAME=row[0],
-                PAGE_LIST_ID=row[1]
-            )
-            new_items.append(new_item)
-
-        if error_rows:
-            return jsonify({'message': 'CSV 数据存在错误，未执行导入'+str(error_rows), 'errors': error_rows}), 400
-
-        for item in new_items:
-            db.session.add(item)
-        db.session.commit()
-        return jsonify({'message': f'PageLayout CSV 导入成功，共导入 {len(new_items)} 条记录'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'message': '导入 PageLayout CSV 出错'+str(e), 'error': str(e)}), 500
+    # 外键：PAGE_LIST_ID 必须存在且未软删除
+    return import_csv_model(PageLayout)
 
 # ----------------- 6. PageLayoutField CSV 导入 -----------------
-@app.route('/import_csv/page_layout_field', methods=['POST'])
+@bp.route('/import_csv/page_layout_field', methods=['POST'])
 def import_csv_page_layout_field():
     # CSV 列序：NAME, LABEL, PAGE_LAYOUT_ID, OBJECT_FIELD_ID, TYPE
-    if 'file' not in request.files:
-        return jsonify({'message': '未找到文件'}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'message': '未选择文件'}), 400
+    # 外键：PAGE_LAYOUT_ID 与 OBJECT_FIELD_ID 必须存在且未软删除
+    return import_csv_model(PageLayoutField)
 
+
+# ----------------- 导出通用工具函数 -----------------
+# 各模型导出的列（同时作为 CSV 标题行）
+CSV_EXPORT_COLUMNS = {
+    PageList: ['ID', 'NAME', 'LABEL'],
+    Object: ['ID', 'NAME', 'LABEL', 'TABLE_NAME'],
+    ObjectField: ['ID', 'OBJECT_ID', 'NAME', 'LABEL', 'TYPE'],
+    PageListField: ['ID', 'NAME', 'OBJECT_FIELD_ID', 'PAGE_LIST_ID', 'HIDDEN', 'TYPE'],
+    PageLayout: ['ID', 'NAME', 'PAGE_LIST_ID'],
+    PageLayoutField: ['ID', 'NAME', 'LABEL', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID', 'TYPE'],
+}
+
+# 每批从数据库游标取出的行数
+EXPORT_BATCH_SIZE = 1000
+# 累积到该字节数（近似）后向客户端发送一个数据块
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_csv_export(model_cls, columns, batch_size=EXPORT_BATCH_SIZE, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    逐块生成导出的 CSV 内容（utf-8 字节）。
+    只查询导出列而非完整 ORM 实例，并通过 yield_per 使用服务端游标分批取数，
+    内存占用与表大小无关。
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    query = db.session.query(*[getattr(model_cls, col) for col in columns]) \
+        .filter(model_cls.DELETED == '0') \
+        .execution_options(yield_per=batch_size)
+    exported = 0
     try:
-        stream = get_decoded_stream(file)
-        csv_reader = csv.reader(stream)
-        next(csv_reader)
-
-        new_items = []
-        error_rows = []
-        for idx, row in enumerate(csv_reader, start=2):
-            if len(row) < 5:
-                error_rows.append({'row': idx, 'error': '列数不足'})
-                continue
-
-            # 验证外键：PAGE_LAYOUT_ID 与 OBJECT_FIELD_ID 必须存在且未软删除
-            page_layout = PageLayout.query.filter_by(ID=row[2], DELETED='0').first()
-            obj_field = ObjectField.query.filter_by(ID=row[3], DELETED='0').first()
-            missing = []
-            if not page_layout:
-                missing.append('PAGE_LAYOUT_ID')
-            if not obj_field:
-                missing.append('OBJECT_FIELD_ID')
-            if missing:
-                error_rows.append({
-                    'row': idx,
-                    'data': row,
-                    'error': '外键不存在: ' + ', '.join(missing)
-                })
-                continue
-
-            new_item = PageLayoutField(
-                NAME=row[0],
-                LABEL=row[1],
-                PAGE_LAYOUT_ID=row[2],
-                OBJECT_FIELD_ID=row[3],
-                TYPE=row[4]
-            )
-            new_items.append(new_item)
+        for row in query:
+            writer.writerow(row)
+            exported += 1
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue().encode('utf-8')
+    finally:
+        # 客户端中途断开时只计入已生成的行
+        metrics.csv_export_rows_total.inc(exported, model=model_cls.__name__)
+
+
+def iter_ndjson(query, fields, batch_size=EXPORT_BATCH_SIZE, chunk_size=EXPORT_CHUNK_SIZE):
+    """逐块生成 NDJSON 内容（utf-8 字节），每行一个 JSON 对象，通过 yield_per 分批取数。"""
+    encode = row_encoder(tuple(fields))
+    buffer = []
+    size = 0
+    for row in query.execution_options(yield_per=batch_size):
+        line = dumps(encode(row)) + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    yield b''.join(buffer)
+
+
+def wants_ndjson():
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def stream_response(chunks, mimetype, headers=None):
+    """
+    以生成器流式返回 chunks，边查询边发送，保持应用上下文直至生成器结束。
+    先取出第一块，使查询错误仍能以 500 JSON 返回，而不是中断的下载；
+    副本上的连接错误继续抛出，由 read_replica 在主库上重试。
+    """
+    try:
+        first_chunk = next(chunks)
+    except Exception as e:
+        if isinstance(e, (OperationalError, InterfaceError)) and g.get('db_replica') is not None:
+            raise
+        return json_response({'message': f'导出失败: {str(e)}'}), 500
 
-        if error_rows:
-            return jsonify({'message': 'CSV 数据存在错误，未执行导入'+str(error_rows), 'errors': error_rows}), 400
+    def generate():
+        yield first_chunk
+        yield from chunks
 
-        for item in new_items:
-            db.session.add(item)
-        db.session.commit()
-        return jsonify({'message': f'PageLayoutField CSV 导入成功，共导入 {len(new_items)} 条记录'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'message': '导入 PageLayoutField CSV 出错'+str(e),'error': str(e)}), 500
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers=headers)
 
 
-# ----------------- 导出通用工具函数 -----------------
 def generate_csv_response(model_cls, filename):
+    # fields 参数可选择导出部分列，默认导出全部列
     try:
-        # 查询所有未删除的记录
-        query = model_cls.query.filter_by(DELETED='0')
-        items = query.all()
-
-        # 生成CSV内容
-        output = StringIO()
-        writer = csv.writer(output)
-
-        # 根据模型类获取字段列表
-        if model_cls == PageList:
-            headers = ['ID', 'NAME', 'LABEL']
-            writer.writerow(headers)
-            for item in items:
-                writer.writerow([item.ID, item.NAME, item.LABEL])
-        elif model_cls == Object:
-            headers = ['ID', 'NAME', 'LABEL', 'TABLE_NAME']
-            writer.writerow(headers)
-            for item in items:
-                writer.writerow([item.ID, item.NAME, item.LABEL, item.TABLE_NAME])
-        elif model_cls == ObjectField:
-            headers = ['ID', 'OBJECT_ID', 'NAME', 'LABEL', 'TYPE']
-            writer.writerow(headers)
-            for item in items:
-                writer.writerow([item.ID, item.OBJECT_ID, item.NAME, item.LABEL, item.TYPE])
-        elif model_cls == PageListField:
-            headers = ['ID', 'NAME', 'OBJECT_FIELD_ID', 'PAGE_LIST_ID', 'HIDDEN', 'TYPE']
-            writer.writerow(headers)
-            for item in items:
-                writer.writerow([item.ID, item.NAME, item.OBJECT_FIELD_ID,
-                               item.PAGE_LIST_ID, item.HIDDEN, item.TYPE])
-        elif model_cls == PageLayout:
-            headers = ['ID', 'NAME', 'PAGE_LIST_ID']
-            writer.writerow(headers)
-            for item in items:
-                writer.writerow([item.ID, item.NAME, item.PAGE_LIST_ID])
-        elif model_cls == PageLayoutField:
-            headers = ['ID', 'NAME', 'LABEL', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID', 'TYPE']
-            writer.writerow(headers)
-            for item in items:
-                writer.writerow([item.ID, item.NAME, item.LABEL,
-                               item.PAGE_LAYOUT_ID, item.OBJECT_FIELD_ID, item.TYPE])
-
-        # 创建响应对象
-        response = Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={
-                "Content-disposition": f"attachment; filename={filename}",
-                "Content-type": "text/csv; charset=utf-8"
-            }
-        )
-        return response
-
-    except Exception as e:
-        return jsonify({'message': f'导出失败: {str(e)}'}), 500
+        columns = get_requested_fields(model_cls, CSV_EXPORT_COLUMNS[model_cls])
+    except ValueError as e:
+        return json_response({'message': str(e)}), 400
+    return stream_response(
+        iter_csv_export(model_cls, columns),
+        "text/csv",
+        headers={
+            "Content-disposition": f"attachment; filename={filename}",
+            "Content-type": "text/csv; charset=utf-8"
+        }
+    )
 
 # ----------------- 1. PageList CSV 导出 -----------------
-@app.route('/export_csv/pagelist', methods=['GET'])
+@bp.route('/export_csv/pagelist', methods=['GET'])
+@read_replica
+@conditional_view(PageList)
 def export_csv_pagelist():
     return generate_csv_response(PageList, 'pagelist_export.csv')
 
 # ----------------- 2. Object CSV 导出 -----------------
-@app.route('/export_csv/object', methods=['GET'])
+@bp.route('/export_csv/object', methods=['GET'])
+@read_replica
+@conditional_view(Object)
 def export_csv_object():
     return generate_csv_response(Object, 'object_export.csv')
 
 # ----------------- 3. ObjectField CSV 导出 -----------------
-@app.route('/export_csv/object_field', methods=['GET'])
+@bp.route('/export_csv/object_field', methods=['GET'])
+@read_replica
+@conditional_view(ObjectField)
 def export_csv_object_field():
     return generate_csv_response(ObjectField, 'object_field_export.csv')
 
 # ----------------- 4. PageListField CSV 导出 -----------------
-@app.route('/export_csv/page_list_field', methods=['GET'])
+@bp.route('/export_csv/page_list_field', methods=['GET'])
+@read_replica
+@conditional_view(PageListField)
 def export_csv_page_list_field():
     return generate_csv_response(PageListField, 'page_list_field_export.csv')
 
 # ----------------- 5. PageLayout CSV 导出 -----------------
-@app.route('/export_csv/page_layout', methods=['GET'])
+@bp.route('/export_csv/page_layout', methods=['GET'])
+@read_replica
+@conditional_view(PageLayout)
 def export_csv_page_layout():
     return generate_csv_response(PageLayout, 'page_layout_export.csv')
 
 # ----------------- 6. PageLayoutField CSV 导出 -----------------
-@app.route('/export_csv/page_layout_field', methods=['GET'])
+@bp.route('/export_csv/page_layout_field', methods=['GET'])
+@read_replica
+@conditional_view(PageLayoutField)
 def export_csv_page_layout_field():
     return generate_csv_response(PageLayoutField, 'page_layout_field_export.csv')
+
+
+# ---------------------------
+# 软删除行清理
+# ---------------------------
+@bp.route('/maintenance/purge', methods=['POST'])
+def purge_soft_deleted():
+    """
+    清理超过保留期的软删除行，在请求内同步执行；数据量大时用 max_rows 分多次调用，或使用命令行定时执行。
+    参数 dry_run=1 只返回各表将清理的行数；retention_days、mode、max_rows 默认取自配置。
+    """
+    config = current_app.config
+    retention_days = request.args.get('retention_days', config['PURGE_RETENTION_DAYS'], type=float)
+    mode = request.args.get('mode', config['PURGE_MODE'])
+    max_rows = request.args.get('max_rows', config['PURGE_MAX_ROWS'], type=int)
+    dry_run = request.args.get('dry_run') in ('1', 'true')
+    if retention_days is None or retention_days < 0:
+        return json_response({'message': 'Invalid retention_days parameter'}), 400
+    if mode not in purge.PURGE_MODES:
+        return json_response({'message': 'Invalid mode parameter'}), 400
+    if max_rows is None or max_rows < 0:
+        return json_response({'message': 'Invalid max_rows parameter'}), 400
+    started = time.perf_counter()
+    counts = purge.purge(retention_days, mode=mode, batch_size=config['PURGE_BATCH_SIZE'],
+                         pause=config['PURGE_BATCH_PAUSE'], max_rows=max_rows or None, dry_run=dry_run)
+    return json_response({
+        'dry_run': dry_run,
+        'mode': mode,
+        'retention_days': retention_days,
+        'rows': counts,
+        'total': sum(counts.values()),
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+    })
+
+
+# ---------------------------
+# 运行状态
+# ---------------------------
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@bp.route('/metrics/db_pool', methods=['GET'])
+def get_db_pool_metrics():
+    return json_response(db_pool.pool_status(db.engine))
+
+
+@bp.route('/metrics/replicas', methods=['GET'])
+def get_replica_metrics():
+    router = get_replica_router()
+    if router is None:
+        return json_response({'replicas': {}})
+    replicas = router.status()
+    for key, status in replicas.items():
+        status['pool'] = db_pool.pool_status(db.engines[key])
+    return json_response({'replicas': replicas})
+
+
+@bp.route('/metrics/cache', methods=['GET'])
+def get_cache_metrics():
+    return json_response({
+        'read_cache': get_read_cache().stats(),
+        'count_cache': get_count_cache().stats()
+    })
+
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,2 @@
+# benchmarks
+"""性能基准脚本，使用独立的 SQLite 数据库运行，不依赖 config.py 中的 MySQL 配置。"""
@@ -0,0 +1,257 @@
+# benchmarks/hot_paths.py
+"""
+在仿真数据上对接口热点路径计时：
+- 列表分页（首页与深页偏移、游标分页）与各 LIKE 搜索；
+- 全部 /import_csv/* 与 /export_csv/* 接口；
+- 级联软删除与恢复（Object、PageList）。
+请求经 Flask 测试客户端发往 app.py（不含网络开销），读缓存关闭，导入同步执行。
+结果写为 JSON（含代码版本与环境信息），可用 --compare 与之前的结果对比。
+
+用法：
+  python -m benchmarks.hot_paths [--database-url URL] [--scale medium] [--repeat 5] [--output results.json]
+  python -m benchmarks.hot_paths --compare old.json [--threshold 1.2]
+未指定 --database-url 时使用临时 SQLite 文件；指定的库中已有数据时加 --skip-generate 跳过生成。
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import migrations
+from app import CSV_IMPORT_SPECS, create_app
+from benchmarks import synthetic
+from benchmarks.stats import percentile
+from models import db, Object, ObjectField, PageList, PageListField, PageLayout, PageLayoutField
+
+# 列表接口路径 -> 模型（深页偏移按该表的行数计算）
+LIST_ENDPOINTS = {
+    '/page_lists': PageList,
+    '/objects': Object,
+    '/object_fields': ObjectField,
+    '/page_list_fields': PageListField,
+    '/page_layouts': PageLayout,
+    '/page_layout_fields': PageLayoutField,
+}
+EXPORT_ENDPOINTS = ['pagelist', 'object', 'object_field', 'page_list_field', 'page_layout', 'page_layout_field']
+# 导入接口 -> 模型
+IMPORT_ENDPOINTS = {
+    'pagelist': PageList,
+    'object': Object,
+    'object_field': ObjectField,
+    'page_list_field': PageListField,
+    'page_layout': PageLayout,
+    'page_layout_field': PageLayoutField,
+}
+PAGE_SIZE = 50
+
+
+def summarize(samples, statuses):
+    return {
+        'repeat': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'min_ms': round(min(samples) * 1000, 3),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+        'statuses': sorted(set(statuses)),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Runner:
+    def __init__(self, app, repeat):
+        self.client = app.test_client()
+        self.repeat = repeat
+        self.results = {}
+
+    def time_request(self, name, method, path, make_kwargs=None):
+        """执行 repeat 次请求，读完整个响应体（流式响应同样计入）后记录耗时。"""
+        samples, statuses = [], []
+        for _ in range(self.repeat):
+            kwargs = make_kwargs() if make_kwargs else {}
+            started = time.perf_counter()
+            response = self.client.open(path, method=method, **kwargs)
+            response.get_data()
+            samples.append(time.perf_counter() - started)
+            statuses.append(response.status_code)
+        self.results[name] = summarize(samples, statuses)
+
+    def time_pair(self, name, first, second):
+        """交替执行两个请求（如软删除与恢复），分别计时，使每次执行前的数据状态一致。"""
+        samples = {first[0]: [], second[0]: []}
+        statuses = {first[0]: [], second[0]: []}
+        for _ in range(self.repeat):
+            for label, method, path in (first, second):
+                started = time.perf_counter()
+                response = self.client.open(path, method=method)
+                response.get_data()
+                samples[label].append(time.perf_counter() - started)
+                statuses[label].append(response.status_code)
+        for label in samples:
+            self.results[f'{name}.{label}'] = summarize(samples[label], statuses[label])
+
+
+def sample_ids(app, model_cls, limit=1000):
+    with app.app_context():
+        return [row[0] for row in db.session.query(model_cls.ID).filter(model_cls.DELETED == '0').limit(limit)]
+
+
+def row_count(app, model_cls):
+    with app.app_context():
+        return model_cls.query.filter(model_cls.DELETED == '0').count()
+
+
+def build_import_csv(app, model_cls, rows, rnd):
+    """按 CSV_IMPORT_SPECS 的列序生成导入文件，外键列引用库中已有的 ID。"""
+    field_list, foreign_keys = CSV_IMPORT_SPECS[model_cls]
+    refs = {col: sample_ids(app, ref_model) for col, ref_model in foreign_keys.items()}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(field_list)
+    for i in range(rows):
+        writer.writerow([rnd.choice(refs[col]) if col in refs else ('0' if col == 'HIDDEN' else f'{col.lower()}_{i}')
+                         for col in field_list])
+    return buffer.getvalue().encode('utf-8')
+
+
+def run(app, repeat, import_rows, seed):
+    runner = Runner(app, repeat)
+    rnd = random.Random(seed)
+
+    for path, model_cls in LIST_ENDPOINTS.items():
+        last_page = max(1, row_count(app, model_cls) // PAGE_SIZE)
+        runner.time_request(f'list{path}.shallow', 'GET', f'{path}?page=1&page_size={PAGE_SIZE}')
+        runner.time_request(f'list{path}.deep', 'GET', f'{path}?page={last_page}&page_size={PAGE_SIZE}')
+        runner.time_request(f'list{path}.cursor', 'GET', f'{path}?cursor=&page_size={PAGE_SIZE}&count=none')
+
+    object_id = sample_ids(app, Object, 1)[0]
+    page_list_id = sample_ids(app, PageList, 1)[0]
+    layout_id = sample_ids(app, PageLayout, 1)[0]
+    searches = {
+        'search/page_list': '/page_list/search?name=list_open',
+        'search/object': '/object/search?name=account',
+        'search/object_field': f'/object_field/search?obj_id={object_id}&name=name',
+        'search/page_list_field': f'/page_list_field/search?pagelist_id={page_list_id}&name=column',
+        'search/page_layout': f'/page_layout/search?pagelist_id={page_list_id}&name=layout',
+        'search/page_layout_field': f'/page_layout_field/search?pagelayout_id={layout_id}&name=section',
+    }
+    for name, path in searches.items():
+        runner.time_request(name, 'GET', path)
+
+    for endpoint in EXPORT_ENDPOINTS:
+        runner.time_request(f'export/{endpoint}', 'GET', f'/export_csv/{endpoint}')
+
+    for endpoint, model_cls in IMPORT_ENDPOINTS.items():
+        body = build_import_csv(app, model_cls, import_rows, rnd)
+        runner.time_request(
+            f'import/{endpoint}', 'POST', f'/import_csv/{endpoint}',
+            lambda: {'data': {'file': (io.BytesIO(body), 'bench.csv')}, 'content_type': 'multipart/form-data'})
+
+    runner.time_pair('cascade/object', ('soft_delete', 'DELETE', f'/object/{object_id}'),
+                     ('restore', 'PUT', f'/object/restore/{object_id}'))
+    runner.time_pair('cascade/page_list', ('soft_delete', 'DELETE', f'/page_list/{page_list_id}'),
+                     ('restore', 'PUT', f'/page_list/restore/{page_list_id}'))
+    return runner.results
+
+
+def compare(current, baseline, threshold):
+    """打印各用例中位数的变化，返回慢于 threshold 倍的用例名列表。"""
+    regressions = []
+    for name, result in sorted(current['results'].items()):
+        old = baseline['results'].get(name)
+        if old is None:
+            print(f'{name:<48} {result["median_ms"]:>10.3f} ms  (new)')
+            continue
+        ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] else math.inf
+        flag = '  REGRESSION' if ratio > threshold else ''
+        print(f'{name:<48} {old["median_ms"]:>10.3f} -> {result["median_ms"]:>10.3f} ms  x{ratio:.2f}{flag}')
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='默认使用临时 SQLite 文件')
+    parser.add_argument('--skip-generate', action='store_true', help='使用库中已有的数据，不生成仿真数据')
+    synthetic.add_scale_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--import-rows', type=int, default=1000, help='每个导入用例的 CSV 行数')
+    parser.add_argument('--output', help='结果 JSON 文件路径，默认输出到标准输出')
+    parser.add_argument('--compare', help='与之前的结果 JSON 对比')
+    parser.add_argument('--threshold', type=float, default=1.2, help='中位数慢于基线该倍数即视为回退')
+    args = parser.parse_args()
+    scale = synthetic.scale_from_args(args)
+
+    tmp = None
+    database_url = args.database_url
+    if database_url is None:
+        tmp = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(tmp.name, 'bench.db')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'READ_CACHE_ENABLED': False,
+        'IMPORT_EXECUTOR': 'inline',
+    })
+
+    generated = None
+    with app.app_context():
+        migrations.upgrade(echo=lambda message: None)
+        if not args.skip_generate:
+            started = time.perf_counter()
+            generated = {'rows': synthetic.populate(seed=args.seed, **scale),
+                         'elapsed_seconds': round(time.perf_counter() - started, 3)}
+
+    results = run(app, args.repeat, args.import_rows, args.seed)
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        db.engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': dialect,
+            'scale': None if args.skip_generate else scale,
+            'generated': generated,
+            'repeat': args.repeat,
+            'import_rows': args.import_rows,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
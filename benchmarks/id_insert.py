@@ -0,0 +1,109 @@
+# benchmarks/id_insert.py
+"""
+比较不同主键方案的插入吞吐：
+- uuid4_varchar：uuid4 十六进制存为 VARCHAR(32)（原方案）；
+- uuid4_hexid：uuid4，HexID 列（MySQL 上为 BINARY(16)）；
+- uuid7_hexid：uuid7，HexID 列（当前默认）。
+每种方案建一张独立的表（主键 + 带二级索引的随机父 ID 列），按批多行 INSERT 写入，
+报告总耗时、行/秒以及各区间的吞吐（随机主键在表变大后通常明显下降）。
+
+用法：python -m benchmarks.id_insert [--database-url URL] [--rows 200000] [--batch-size 5000] [--json]
+未指定 --database-url 时使用临时 SQLite 文件；在本地 MySQL 上运行才能体现 InnoDB 聚簇索引的差异。
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import Column, Index, MetaData, String, Table, create_engine, insert
+
+from models import HexID, uuid7_hex
+
+VARIANTS = {
+    'uuid4_varchar': (String(32), lambda: uuid.uuid4().hex),
+    'uuid4_hexid': (HexID(), lambda: uuid.uuid4().hex),
+    'uuid7_hexid': (HexID(), uuid7_hex),
+}
+SEGMENTS = 4
+
+
+def build_table(metadata, name, id_type):
+    table = Table(f'bench_ids_{name}', metadata,
+                  Column('ID', id_type, primary_key=True),
+                  Column('PARENT_ID', id_type, nullable=False),
+                  Column('NAME', String(255)))
+    Index(f'ix_bench_ids_{name}_parent', table.c.PARENT_ID)
+    return table
+
+
+def run_variant(engine, table, make_id, rows, batch_size, seed):
+    """写入 rows 行，返回总耗时与每段（rows / SEGMENTS 行）的行/秒。"""
+    rnd = random.Random(seed)
+    parents = [make_id() for _ in range(1000)]
+    segment_rows = max(1, rows // SEGMENTS)
+    segments, segment_started, segment_done = [], time.perf_counter(), 0
+    started = segment_started
+    written = 0
+    while written < rows:
+        n = min(batch_size, rows - written)
+        batch = [{'ID': make_id(), 'PARENT_ID': rnd.choice(parents), 'NAME': f'row_{written + i}'} for i in range(n)]
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+        written += n
+        segment_done += n
+        if segment_done >= segment_rows or written == rows:
+            now = time.perf_counter()
+            segments.append(round(segment_done / (now - segment_started)))
+            segment_started, segment_done = now, 0
+    elapsed = time.perf_counter() - started
+    return {'elapsed_seconds': round(elapsed, 3), 'rows_per_second': round(rows / elapsed),
+            'segment_rows_per_second': segments}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help='默认使用临时 SQLite 文件')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--variant', action='append', choices=sorted(VARIANTS), help='只运行指定方案，可重复')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args()
+
+    tmp = None
+    database_url = args.database_url
+    if database_url is None:
+        tmp = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(tmp.name, 'ids.db')
+    engine = create_engine(database_url)
+
+    results = {}
+    for name in args.variant or list(VARIANTS):
+        id_type, make_id = VARIANTS[name]
+        metadata = MetaData()
+        table = build_table(metadata, name, id_type)
+        metadata.drop_all(engine, checkfirst=True)
+        metadata.create_all(engine)
+        try:
+            results[name] = run_variant(engine, table, make_id, args.rows, args.batch_size, args.seed)
+        finally:
+            metadata.drop_all(engine)
+    dialect = engine.dialect.name
+    engine.dispose()
+    if tmp is not None:
+        tmp.cleanup()
+
+    if args.json:
+        print(json.dumps({'database': dialect, 'rows': args.rows, 'batch_size': args.batch_size,
+                          'results': results}, indent=2))
+        return
+    for name, r in results.items():
+        print(f"{name:<14} {r['elapsed_seconds']:>8.2f}s  {r['rows_per_second']:>8} rows/s  "
+              f"segments={r['segment_rows_per_second']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,371 @@
+# benchmarks/load.py
+"""
+本地压测：多个虚拟用户并发执行脚本化场景，统计每个接口的延迟分位数、吞吐量与错误率。
+场景：
+- browse：浏览列表与搜索；
+- editor：在 PageLayoutField 上新建、修改、软删除；
+- bulk：CSV 导入与导出。
+可连接已启动的实例（--url），或用 --start 在临时 SQLite / 指定数据库上生成仿真数据并启动 app.py。
+结果可保存为基线（--save-baseline），之后用 --baseline 对比。
+
+用法：
+  python -m benchmarks.load --start [--database-url URL] [--scale small] --users browse=8,editor=2,bulk=1 --duration 30
+  python -m benchmarks.load --url http://127.0.0.1:5000 --users browse=4 --duration 60 --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import migrations
+from app import create_app
+from benchmarks import synthetic
+from benchmarks.stats import percentile
+from models import db
+from benchmarks.hot_paths import git_revision
+
+PAGE_SIZE = 20
+STARTUP_TIMEOUT = 60
+
+
+class Recorder:
+    """线程安全地记录每个接口（方法 + 路由模板）的耗时与结果。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            latencies, errors = self._samples.setdefault(endpoint, ([], [0]))
+            latencies.append(seconds)
+            if not ok:
+                errors[0] += 1
+
+    def report(self, elapsed):
+        endpoints = {}
+        all_latencies, all_errors = [], 0
+        with self._lock:
+            items = sorted(self._samples.items())
+        for endpoint, (latencies, errors) in items:
+            endpoints[endpoint] = self._summary(latencies, errors[0], elapsed)
+            all_latencies.extend(latencies)
+            all_errors += errors[0]
+        return {'total': self._summary(all_latencies, all_errors, elapsed), 'endpoints': endpoints}
+
+    @staticmethod
+    def _summary(latencies, errors, elapsed):
+        if not latencies:
+            return {'requests': 0}
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': round(errors / len(latencies), 4),
+            'throughput_rps': round(len(latencies) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        }
+
+
+class Client:
+    def __init__(self, base_url, recorder):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+
+    def request(self, endpoint, method, path, json_body=None, body=None, content_type=None):
+        """发送请求并读完响应体；endpoint 为统计用的接口名（路由模板），返回 (状态码, 响应体)。"""
+        headers = {}
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            content_type = 'application/json'
+        if content_type:
+            headers['Content-Type'] = content_type
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                status, data = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, data = e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            status, data = None, b''
+        self.recorder.record(f'{method} {endpoint}', time.perf_counter() - started,
+                             status is not None and status < 400)
+        return status, data
+
+    def get_json(self, endpoint, path):
+        status, data = self.request(endpoint, 'GET', path)
+        return json.loads(data) if status == 200 else None
+
+
+def multipart(filename, content):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: text/csv\r\n\r\n').encode('utf-8') + content + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+# ---------------------------
+# 场景
+# ---------------------------
+LIST_PATHS = ['/page_lists', '/objects', '/object_fields', '/page_list_fields', '/page_layouts',
+              '/page_layout_fields']
+EXPORT_NAMES = ['pagelist', 'object', 'object_field', 'page_list_field', 'page_layout', 'page_layout_field']
+
+
+class Fixtures:
+    """场景共用的已有数据 ID，启动时从接口读取一次。"""
+
+    def __init__(self, client):
+        def ids(path):
+            result = client.get_json(path, f'{path}?page_size=200&fields=ID&count=none')
+            return [item['ID'] for item in result['items']] if result else []
+        self.object_ids = ids('/objects')
+        self.object_field_ids = ids('/object_fields')
+        self.page_list_ids = ids('/page_lists')
+        self.layout_ids = ids('/page_layouts')
+        if not (self.object_ids and self.object_field_ids and self.page_list_ids and self.layout_ids):
+            raise SystemExit('目标实例中没有数据，请先生成仿真数据（--start 或 python -m benchmarks.synthetic）')
+
+
+def browse(client, fixtures, rnd):
+    path = rnd.choice(LIST_PATHS)
+    action = rnd.random()
+    if action < 0.4:
+        client.request(path, 'GET', f'{path}?page={rnd.randint(1, 20)}&page_size={PAGE_SIZE}')
+    elif action < 0.55:
+        client.request(path, 'GET', f'{path}?cursor=&page_size={PAGE_SIZE}&count=none')
+    elif action < 0.7:
+        client.request('/page_list/search', 'GET', f'/page_list/search?name=list_{rnd.choice(["open", "mine"])}')
+    elif action < 0.8:
+        client.request('/object/search', 'GET', '/object/search?name=account')
+    elif action < 0.9:
+        client.request('/object_field/search', 'GET',
+                       f'/object_field/search?obj_id={rnd.choice(fixtures.object_ids)}&name=name')
+    else:
+        page_list_id = rnd.choice(fixtures.page_list_ids)
+        client.request('/page_list/<id>/definition', 'GET', f'/page_list/{page_list_id}/definition')
+
+
+def editor(client, fixtures, rnd, state):
+    """编辑一个布局：新建字段，修改若干次，部分字段随后软删除。"""
+    created = state.setdefault('created', [])
+    action = rnd.random()
+    if action < 0.35 or not created:
+        status, data = client.request('/page_layout_field', 'POST', '/page_layout_field', json_body=[{
+            'NAME': f'load_{rnd.randrange(10 ** 6)}', 'LABEL': 'Load test',
+            'PAGE_LAYOUT_ID': rnd.choice(fixtures.layout_ids),
+            'OBJECT_FIELD_ID': rnd.choice(fixtures.object_field_ids), 'TYPE': 'input',
+        }])
+        if status == 201:
+            created.append(json.loads(data)['ID'])
+    elif action < 0.8:
+        field_id = rnd.choice(created)
+        client.request('/page_layout_field/<id>', 'PUT', f'/page_layout_field/{field_id}',
+                       json_body=[{'LABEL': f'Edited {rnd.randrange(1000)}', 'TYPE': rnd.choice(['input', 'readonly'])}])
+    else:
+        field_id = created.pop(rnd.randrange(len(created)))
+        client.request('/page_layout_field/<id>', 'DELETE', f'/page_layout_field/{field_id}')
+
+
+def bulk(client, fixtures, rnd, import_rows):
+    if rnd.random() < 0.5:
+        name = rnd.choice(EXPORT_NAMES)
+        client.request(f'/export_csv/{name}', 'GET', f'/export_csv/{name}')
+        return
+    lines = ['NAME,OBJECT_FIELD_ID,PAGE_LIST_ID,HIDDEN,TYPE']
+    for i in range(import_rows):
+        lines.append(f'bulk_{i},{rnd.choice(fixtures.object_field_ids)},{rnd.choice(fixtures.page_list_ids)},0,column')
+    body, content_type = multipart('load.csv', '\n'.join(lines).encode('utf-8'))
+    client.request('/import_csv/page_list_field', 'POST', '/import_csv/page_list_field',
+                   body=body, content_type=content_type)
+
+
+def make_scenario(name, import_rows):
+    if name == 'browse':
+        return lambda client, fixtures, rnd, state: browse(client, fixtures, rnd)
+    if name == 'editor':
+        return editor
+    if name == 'bulk':
+        return lambda client, fixtures, rnd, state: bulk(client, fixtures, rnd, import_rows)
+    raise SystemExit(f'未知场景: {name}')
+
+
+def parse_users(value):
+    """browse=8,editor=2 -> {'browse': 8, 'editor': 2}"""
+    users = {}
+    for part in value.split(','):
+        name, _, count = part.partition('=')
+        users[name.strip()] = int(count or 1)
+    return users
+
+
+def run_load(base_url, users, duration, import_rows, seed, think_time):
+    recorder = Recorder()
+    fixtures = Fixtures(Client(base_url, Recorder()))
+    deadline = time.monotonic() + duration
+    threads = []
+
+    def user_loop(scenario, user_seed):
+        rnd = random.Random(user_seed)
+        client = Client(base_url, recorder)
+        state = {}
+        while time.monotonic() < deadline:
+            scenario(client, fixtures, rnd, state)
+            if think_time:
+                time.sleep(rnd.uniform(0, 2 * think_time))
+
+    n = 0
+    for name, count in users.items():
+        scenario = make_scenario(name, import_rows)
+        for _ in range(count):
+            n += 1
+            threads.append(threading.Thread(target=user_loop, args=(scenario, seed * 1000 + n), daemon=True))
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.report(time.monotonic() - started)
+
+
+# ---------------------------
+# 本地实例
+# ---------------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_instance(database_url, port):
+    """以多线程开发服务器启动 app.py（关闭调试与自动重载），等待接口可用后返回进程。"""
+    env = dict(os.environ, DATABASE_URL=database_url)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--with-threads',
+         '--no-reload', '--no-debugger'],
+        cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit('app.py 启动失败')
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics/cache', timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('等待 app.py 启动超时')
+
+
+def compare(report, baseline, threshold):
+    """按接口对比 p95 与吞吐量，返回回退（p95 变慢或吞吐量下降超过 threshold 倍）的接口列表。"""
+    regressions = []
+    print(f'{"endpoint":<44} {"p95 ms (base -> now)":>26} {"rps (base -> now)":>24} {"errors":>8}')
+    for endpoint, now in sorted(report['endpoints'].items()):
+        base = baseline['endpoints'].get(endpoint)
+        if not base or not base.get('requests') or not now.get('requests'):
+            continue
+        slower = now['p95_ms'] > base['p95_ms'] * threshold
+        fewer = now['throughput_rps'] * threshold < base['throughput_rps']
+        flag = '  REGRESSION' if slower or fewer else ''
+        print(f'{endpoint:<44} {base["p95_ms"]:>11.2f} -> {now["p95_ms"]:>10.2f}'
+              f' {base["throughput_rps"]:>10.2f} -> {now["throughput_rps"]:>9.2f} {now["error_rate"]:>8.2%}{flag}')
+        if flag:
+            regressions.append(endpoint)
+    return regressions
+
+
+def print_report(report):
+    print(f'{"endpoint":<44} {"requests":>9} {"err%":>7} {"rps":>8} {"p50":>9} {"p95":>9} {"p99":>9}')
+    for endpoint, s in list(report['endpoints'].items()) + [('TOTAL', report['total'])]:
+        if not s.get('requests'):
+            continue
+        print(f'{endpoint:<44} {s["requests"]:>9} {s["error_rate"]:>7.2%} {s["throughput_rps"]:>8.2f} '
+              f'{s["p50_ms"]:>9.2f} {s["p95_ms"]:>9.2f} {s["p99_ms"]:>9.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='已启动实例的地址，如 http://127.0.0.1:5000')
+    parser.add_argument('--start', action='store_true', help='生成仿真数据并在本地启动 app.py')
+    parser.add_argument('--database-url', help='--start 使用的数据库，默认临时 SQLite 文件')
+    parser.add_argument('--skip-generate', action='store_true', help='--start 时使用库中已有的数据')
+    synthetic.add_scale_arguments(parser)
+    parser.set_defaults(scale='small')
+    parser.add_argument('--users', default='browse=8,editor=2,bulk=1', help='各场景的虚拟用户数')
+    parser.add_argument('--duration', type=float, default=30, help='压测时长（秒）')
+    parser.add_argument('--think-time', type=float, default=0, help='每次操作后的平均等待秒数')
+    parser.add_argument('--import-rows', type=int, default=200, help='bulk 场景每次导入的 CSV 行数')
+    parser.add_argument('--output', help='结果 JSON 文件路径')
+    parser.add_argument('--save-baseline', help='把本次结果保存为基线文件')
+    parser.add_argument('--baseline', help='与基线文件对比')
+    parser.add_argument('--threshold', type=float, default=1.2, help='p95 或吞吐量差于基线该倍数即视为回退')
+    args = parser.parse_args()
+    if not args.url and not args.start:
+        parser.error('需要 --url 或 --start')
+
+    process = tmp = None
+    base_url = args.url
+    if args.start:
+        database_url = args.database_url
+        if database_url is None:
+            tmp = tempfile.TemporaryDirectory()
+            database_url = 'sqlite:///' + os.path.join(tmp.name, 'load.db')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+        with app.app_context():
+            migrations.upgrade(echo=lambda message: None)
+            if not args.skip_generate:
+                synthetic.populate(seed=args.seed, **synthetic.scale_from_args(args))
+            db.engine.dispose()
+        port = free_port()
+        process = start_instance(database_url, port)
+        base_url = f'http://127.0.0.1:{port}'
+
+    try:
+        users = parse_users(args.users)
+        result = run_load(base_url, users, args.duration, args.import_rows, args.seed, args.think_time)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'users': users,
+            'duration': args.duration,
+            'think_time': args.think_time,
+            'scale': synthetic.scale_from_args(args) if args.start and not args.skip_generate else None,
+        },
+        **result,
+    }
+    print_report(report)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
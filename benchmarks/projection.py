@@ -0,0 +1,112 @@
+# benchmarks/projection.py
+"""
+对比读接口两种取数方式在大页（默认 10 万行）上的耗时：
+- orm：加载完整 ORM 实例后逐个取属性拼字典（原列表接口的做法）；
+- core：project() 只 SELECT 需要的列，再用 serializers.row_encoder 把行元组转换为字典（paginate 的做法）。
+数据库为临时 SQLite 文件，经 create_app() 与 migrations.upgrade() 建表。
+
+用法：python -m benchmarks.projection [--rows 100000] [--repeat 3] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+
+import migrations
+from app import create_app, project
+from models import db, new_id, Object, ObjectField, PageList, PageLayout, PageLayoutField
+from serializers import row_encoder
+
+FIELDS = {
+    ObjectField: ['ID', 'OBJECT_ID', 'NAME', 'LABEL', 'TYPE'],
+    PageLayoutField: ['ID', 'NAME', 'LABEL', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID', 'TYPE'],
+}
+
+
+def populate(rows, batch_size=10000):
+    object_id = new_id()
+    page_list_id = new_id()
+    layout_id = new_id()
+    db.session.execute(insert(Object), [{'ID': object_id, 'NAME': 'bench'}])
+    db.session.execute(insert(PageList), [{'ID': page_list_id, 'NAME': 'bench'}])
+    db.session.execute(insert(PageLayout), [{'ID': layout_id, 'NAME': 'bench', 'PAGE_LIST_ID': page_list_id}])
+    field_ids = [new_id() for _ in range(rows)]
+    for start in range(0, rows, batch_size):
+        chunk = field_ids[start:start + batch_size]
+        db.session.execute(insert(ObjectField), [
+            {'ID': fid, 'OBJECT_ID': object_id, 'NAME': f'field_{i}', 'LABEL': f'Field {i}', 'TYPE': 'text'}
+            for i, fid in enumerate(chunk, start)
+        ])
+        db.session.execute(insert(PageLayoutField), [
+            {'NAME': f'layout_field_{i}', 'LABEL': f'Layout Field {i}', 'PAGE_LAYOUT_ID': layout_id,
+             'OBJECT_FIELD_ID': fid, 'TYPE': 'text'}
+            for i, fid in enumerate(chunk, start)
+        ])
+    db.session.commit()
+
+
+def load_orm(model_cls, rows):
+    fields = FIELDS[model_cls]
+    items = model_cls.query.filter_by(DELETED='0').limit(rows).all()
+    result = [{f: getattr(item, f) for f in fields} for item in items]
+    # 与请求结束时一致，释放 identity map
+    db.session.remove()
+    return result
+
+
+def load_core(model_cls, rows):
+    fields = FIELDS[model_cls]
+    query = project(model_cls.query.filter_by(DELETED='0'), model_cls, fields).limit(rows)
+    encode = row_encoder(tuple(fields))
+    result = [encode(row) for row in query]
+    db.session.remove()
+    return result
+
+
+def timed(fn, *args, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - started)
+    return {'median': statistics.median(samples), 'min': min(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db')})
+        with app.app_context():
+            migrations.upgrade(echo=lambda message: None)
+            populate(args.rows)
+            results = {}
+            for model_cls in FIELDS:
+                orm = timed(load_orm, model_cls, args.rows, repeat=args.repeat)
+                core = timed(load_core, model_cls, args.rows, repeat=args.repeat)
+                results[model_cls.__name__] = {
+                    'rows': args.rows,
+                    'orm_seconds': round(orm['median'], 4),
+                    'core_seconds': round(core['median'], 4),
+                    'speedup': round(orm['median'] / core['median'], 2),
+                }
+            db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, r in results.items():
+        print(f"{name:<16} rows={r['rows']}  orm={r['orm_seconds']:.3f}s  core={r['core_seconds']:.3f}s  "
+              f"speedup={r['speedup']}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/startup.py
+"""
+测量应用冷启动耗时：每轮在新的 Python 进程中导入 app 模块并调用 create_app()，
+分别记录导入耗时与创建应用耗时。
+默认把数据库地址指向一个不存在的目录，以验证启动过程不访问数据库（能连上与否不影响启动）。
+
+用法：python -m benchmarks.startup [--runs 10] [--database-url URL] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+UNREACHABLE_DATABASE_URL = 'sqlite:////nonexistent-directory/startup-benchmark.db'
+
+PROBE = '''
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': created - imported}))
+'''
+
+
+def measure(runs, database_url):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=database_url)
+    samples = {'import': [], 'create_app': []}
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], cwd=root, env=env, capture_output=True, text=True,
+                                check=True).stdout
+        for name, seconds in json.loads(output.strip().splitlines()[-1]).items():
+            samples[name].append(seconds)
+    return {
+        name: {'median_ms': round(statistics.median(values) * 1000, 2), 'min_ms': round(min(values) * 1000, 2),
+               'max_ms': round(max(values) * 1000, 2)}
+        for name, values in samples.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database-url', default=UNREACHABLE_DATABASE_URL)
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args()
+
+    results = measure(args.runs, args.database_url)
+    if args.json:
+        print(json.dumps({'runs': args.runs, 'results': results}, indent=2))
+        return
+    for name, r in results.items():
+        print(f"{name:<12} median={r['median_ms']:.1f}ms  min={r['min_ms']:.1f}ms  max={r['max_ms']:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+# benchmarks/stats.py
+"""各基准脚本共用的统计函数。"""
+import math
+
+
+def percentile(samples, q):
+    """最近秩法的 q 分位数（0 < q <= 1），样本不需预先排序。"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
@@ -0,0 +1,150 @@
+# benchmarks/synthetic.py
+"""
+生成仿真的元数据：对象及其字段、列表页及其列表字段、页面布局及布局字段。
+列表字段与布局字段引用同一对象下的字段，名称与类型分布接近真实配置。
+数据以多行 INSERT 分批写入，可写入 SQLite 或本地 MySQL。
+
+用法：python -m benchmarks.synthetic --database-url sqlite:////tmp/bench.db [--scale medium] [--seed 0]
+"""
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import insert
+
+import migrations
+from app import create_app
+from models import db, new_id, Object, ObjectField, PageList, PageListField, PageLayout, PageLayoutField
+
+# 规模预设：对象数 × 每对象字段数，列表页数 × 每页列表字段数 / 布局数 / 每布局字段数
+SCALES = {
+    'small': {'objects': 100, 'fields_per_object': 20, 'page_lists': 1000,
+              'list_fields_per_list': 5, 'layouts_per_list': 1, 'fields_per_layout': 10},
+    'medium': {'objects': 1000, 'fields_per_object': 200, 'page_lists': 10000,
+               'list_fields_per_list': 10, 'layouts_per_list': 1, 'fields_per_layout': 20},
+    'large': {'objects': 5000, 'fields_per_object': 200, 'page_lists': 50000,
+              'list_fields_per_list': 10, 'layouts_per_list': 2, 'fields_per_layout': 20},
+}
+
+OBJECT_NOUNS = ['account', 'contact', 'lead', 'opportunity', 'order', 'invoice', 'product', 'contract',
+                'case', 'campaign', 'quote', 'asset', 'shipment', 'supplier', 'employee', 'project']
+FIELD_NOUNS = ['name', 'code', 'status', 'owner', 'amount', 'date', 'email', 'phone', 'address', 'city',
+               'country', 'description', 'priority', 'category', 'source', 'rating', 'score', 'region']
+# 字段类型及其权重
+FIELD_TYPES = [('text', 40), ('number', 15), ('date', 10), ('picklist', 15), ('lookup', 10),
+               ('boolean', 5), ('textarea', 5)]
+LIST_SUFFIXES = ['all', 'mine', 'recent', 'open', 'closed', 'team', 'archived']
+
+
+def _flush(model_cls, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(model_cls), rows[start:start + batch_size])
+    rows.clear()
+
+
+def populate(objects, fields_per_object, page_lists, list_fields_per_list, layouts_per_list, fields_per_layout,
+             seed=0, batch_size=5000):
+    """
+    在当前应用上下文的数据库中写入仿真数据并提交，返回各表写入的行数。
+    每累积 batch_size 行执行一次多行 INSERT，内存占用与总规模无关。
+    """
+    rnd = random.Random(seed)
+    types, weights = zip(*FIELD_TYPES)
+    counts = {model_cls.__tablename__: 0 for model_cls in
+              (Object, ObjectField, PageList, PageListField, PageLayout, PageLayoutField)}
+
+    # 对象与字段：字段 ID 按对象保留，供列表/布局引用
+    object_fields = []
+    object_rows, field_rows = [], []
+    for i in range(objects):
+        noun = OBJECT_NOUNS[i % len(OBJECT_NOUNS)]
+        object_id = new_id()
+        object_rows.append({'ID': object_id, 'NAME': f'{noun}_{i}', 'LABEL': f'{noun.title()} {i}',
+                            'TABLE_NAME': f't_{noun}_{i}'})
+        field_ids = []
+        for j in range(fields_per_object):
+            noun = FIELD_NOUNS[j % len(FIELD_NOUNS)]
+            field_id = new_id()
+            field_ids.append(field_id)
+            field_rows.append({'ID': field_id, 'OBJECT_ID': object_id, 'NAME': f'{noun}_{j}',
+                               'LABEL': f'{noun.title()} {j}', 'TYPE': rnd.choices(types, weights)[0]})
+        object_fields.append(field_ids)
+        counts[Object.__tablename__] += 1
+        counts[ObjectField.__tablename__] += fields_per_object
+        if len(field_rows) >= batch_size:
+            _flush(Object, object_rows, batch_size)
+            _flush(ObjectField, field_rows, batch_size)
+    _flush(Object, object_rows, batch_size)
+    _flush(ObjectField, field_rows, batch_size)
+
+    page_list_rows, list_field_rows, layout_rows, layout_field_rows = [], [], [], []
+    for i in range(page_lists):
+        field_ids = object_fields[rnd.randrange(objects)] if objects else []
+        page_list_id = new_id()
+        suffix = LIST_SUFFIXES[i % len(LIST_SUFFIXES)]
+        page_list_rows.append({'ID': page_list_id, 'NAME': f'list_{suffix}_{i}', 'LABEL': f'List {suffix} {i}'})
+        counts[PageList.__tablename__] += 1
+        if field_ids:
+            for j, field_id in enumerate(rnd.sample(field_ids, min(list_fields_per_list, len(field_ids)))):
+                list_field_rows.append({'NAME': f'column_{j}', 'OBJECT_FIELD_ID': field_id,
+                                        'PAGE_LIST_ID': page_list_id, 'HIDDEN': '1' if rnd.random() < 0.1 else '0',
+                                        'TYPE': 'column'})
+                counts[PageListField.__tablename__] += 1
+        for k in range(layouts_per_list):
+            layout_id = new_id()
+            layout_rows.append({'ID': layout_id, 'NAME': f'layout_{k}_{i}', 'PAGE_LIST_ID': page_list_id})
+            counts[PageLayout.__tablename__] += 1
+            if not field_ids:
+                continue
+            for j, field_id in enumerate(rnd.sample(field_ids, min(fields_per_layout, len(field_ids)))):
+                layout_field_rows.append({'NAME': f'section_{j // 5}_{j}', 'LABEL': f'Field {j}',
+                                          'PAGE_LAYOUT_ID': layout_id, 'OBJECT_FIELD_ID': field_id,
+                                          'TYPE': rnd.choice(['input', 'readonly', 'required'])})
+                counts[PageLayoutField.__tablename__] += 1
+        if len(layout_field_rows) >= batch_size:
+            _flush(PageList, page_list_rows, batch_size)
+            _flush(PageListField, list_field_rows, batch_size)
+            _flush(PageLayout, layout_rows, batch_size)
+            _flush(PageLayoutField, layout_field_rows, batch_size)
+    _flush(PageList, page_list_rows, batch_size)
+    _flush(PageListField, list_field_rows, batch_size)
+    _flush(PageLayout, layout_rows, batch_size)
+    _flush(PageLayoutField, layout_field_rows, batch_size)
+    db.session.commit()
+    return counts
+
+
+def add_scale_arguments(parser):
+    parser.add_argument('--scale', choices=sorted(SCALES), default='medium', help='规模预设')
+    for name in SCALES['medium']:
+        parser.add_argument(f'--{name.replace("_", "-")}', type=int, dest=name, help='覆盖预设中的对应值')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def scale_from_args(args):
+    scale = dict(SCALES[args.scale])
+    for name in scale:
+        if getattr(args, name) is not None:
+            scale[name] = getattr(args, name)
+    return scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', required=True)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    scale = scale_from_args(args)
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_url})
+    with app.app_context():
+        migrations.upgrade(echo=lambda message: None)
+        started = time.perf_counter()
+        counts = populate(seed=args.seed, **scale)
+        elapsed = time.perf_counter() - started
+    print(json.dumps({'scale': scale, 'rows': counts, 'elapsed_seconds': round(elapsed, 3)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# cache.py
+"""
+进程内缓存工具：
+- 按表维护的写入代数（generation），任何写入（ORM flush 或批量 insert/update/delete，
+  包括级联涉及的子表）在提交后使对应表的代数加一；
+- 带容量上限与过期时间的 LRU 缓存，缓存值与写入时的代数绑定，代数变化即失效。
+代数只在当前进程内可见，多进程部署时其他进程的写入只能依靠过期时间淘汰（用于总数缓存）。
+同时在同一事务内递增 table_versions 表中的版本号，供跨进程一致的 ETag 使用；
+读缓存以 ETag 为键，不依赖代数。
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from models import TableVersion
+
+_generation_lock = threading.Lock()
+_generations = {}
+
+
+def get_generation(table_name):
+    return _generations.get(table_name, 0)
+
+
+def bump_generation(*table_names):
+    with _generation_lock:
+        for name in table_names:
+            _generations[name] = _generations.get(name, 0) + 1
+
+
+def _pending_tables(session):
+    return session.info.setdefault('written_tables', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed_tables(session, flush_context):
+    pending = _pending_tables(session)
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(instance, '__table__', None)
+        if table is not None:
+            pending.add(table.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_statement_tables(orm_execute_state):
+    # 批量 insert/update/delete 语句不经过 flush，需要单独记录目标表
+    if orm_execute_state.is_select:
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is not None:
+        _pending_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, 'before_commit')
+def _persist_table_versions(session):
+    # 先 flush，使本次提交的全部写入都已记录到 written_tables
+    session.flush()
+    version_table = TableVersion.__table__
+    tables = sorted(_pending_tables(session) - {version_table.name})
+    if not tables:
+        return
+    # 通过 Connection 执行，不会再次触发 do_orm_execute；按表名顺序加锁避免死锁。
+    # 各业务表的行由迁移 4 预先写入，这里只需 UPDATE；没有行的表（如归档表）不维护版本号
+    session.connection().execute(
+        update(version_table)
+        .where(version_table.c.TABLE_NAME.in_(tables))
+        .values(VERSION=version_table.c.VERSION + 1)
+    )
+
+
+def get_table_versions(session, table_names):
+    """读取各表已提交的版本号，没有记录的表视为 0。"""
+    version_table = TableVersion.__table__
+    rows = session.execute(
+        select(version_table.c.TABLE_NAME, version_table.c.VERSION)
+        .where(version_table.c.TABLE_NAME.in_(table_names))
+    ).all()
+    versions = dict(rows)
+    return tuple(versions.get(name, 0) for name in table_names)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_committed_tables(session):
+    pending = session.info.pop('written_tables', None)
+    if pending:
+        bump_generation(*pending)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back_tables(session):
+    session.info.pop('written_tables', None)
+
+
+class LRUCache:
+    """
+    线程安全的 LRU 缓存。每个条目记录写入时间与所依赖表的代数，
+    读取时过期（ttl 秒）或任一依赖表代数变化均视为未命中。
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, tables):
+        """命中时返回缓存值，未命中返回 None。"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at, generations = entry
+                if time.monotonic() - stored_at <= self.ttl and \
+                        generations == tuple(get_generation(t) for t in tables):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, tables, generations=None):
+        """
+        generations 应在执行查询之前取得，避免查询期间发生的写入被当作已包含在结果中。
+        """
+        if generations is None:
+            generations = tuple(get_generation(t) for t in tables)
+        with self._lock:
+            self._data[key] = (value, time.monotonic(), generations)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            }
@@ -0,0 +1,129 @@
+# db_pool.py
+"""
+数据库连接池配置与运行指标。
+连接池参数来自配置（DB_POOL_*，可由环境变量覆盖）；获取连接的耗时与超时次数由
+InstrumentedQueuePool 记录，检出/归还/新建/失效连接由连接池事件计数。
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_count': self.waits,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_avg': round(self.wait_seconds_total / self.waits, 6) if self.waits else None,
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录每次获取连接耗时（含排队等待与新建连接）与超时次数的 QueuePool。"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.incr('timeouts')
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，保留累计指标
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def engine_options(config):
+    """
+    根据配置生成 SQLALCHEMY_ENGINE_OPTIONS。
+    SQLite 使用 SQLAlchemy 默认的连接池（内存库不支持 pool_size 等参数），只设置 pre-ping。
+    """
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+    if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return options
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    })
+    return options
+
+
+def get_stats(engine):
+    """引擎当前连接池的统计对象；非 InstrumentedQueuePool 的连接池首次访问时补充一个。"""
+    pool = engine.pool
+    if not hasattr(pool, 'stats'):
+        pool.stats = PoolStats()
+    return pool.stats
+
+
+def instrument_engine(engine):
+    """为引擎的连接池注册检出、新建、失效事件计数。"""
+
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        get_stats(engine).incr('checkouts')
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        get_stats(engine).incr('connects')
+
+    @event.listens_for(engine, 'invalidate')
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        get_stats(engine).incr('invalidations')
+
+
+def pool_status(engine):
+    """连接池当前状态与累计指标。"""
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    # QueuePool 才有 size / overflow 等计数
+    for name, attr in (('size', 'size'), ('checked_out', 'checkedout'), ('idle', 'checkedin'),
+                       ('overflow', 'overflow')):
+        method = getattr(pool, attr, None)
+        status[name] = method() if callable(method) else None
+    max_overflow = getattr(pool, '_max_overflow', None)
+    status['max_overflow'] = max_overflow
+    status['timeout'] = pool.timeout() if callable(getattr(pool, 'timeout', None)) else None
+    status.update(get_stats(engine).to_dict())
+    return status
@@ -0,0 +1,106 @@
+# import_jobs.py
+"""
+后台 CSV 导入任务：任务登记表与有界工作线程池。
+任务只保存在当前进程内，查询进度的请求需要落到提交任务的同一进程。
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ImportJob:
+    def __init__(self, model_name, filename):
+        self.id = uuid.uuid4().hex
+        self.model_name = model_name
+        self.filename = filename
+        self.state = 'queued'  # queued / running / succeeded / failed
+        self.message = None
+        self.errors = []
+        # 各阶段计数，由导入流程在执行过程中更新
+        self.progress = {'parsed': 0, 'validated': 0, 'inserted': 0, 'committed': 0}
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0
+        progress = dict(self.progress)
+        return {
+            'job_id': self.id,
+            'model': self.model_name,
+            'filename': self.filename,
+            'state': self.state,
+            'message': self.message,
+            'rows_parsed': progress['parsed'],
+            'rows_validated': progress['validated'],
+            'rows_inserted': progress['committed'],
+            'errors': list(self.errors),
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(progress['inserted'] / elapsed, 1) if elapsed > 0 else None,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class ImportJobManager:
+    """
+    max_workers 个工作线程处理任务，排队与执行中的任务合计超过 max_pending 时拒绝提交。
+    executor 为 inline 时在提交线程中直接执行，便于本地调试与测试。
+    已结束的任务最多保留 max_finished 个供查询。
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, executor='thread', max_finished=200):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._inline = executor == 'inline'
+        self._executor = None if self._inline else ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='csv-import')
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, job, fn):
+        """登记任务并交给线程池执行 fn(job)；队列已满时抛出 QueueFull。"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFull()
+            self._pending += 1
+            self._jobs[job.id] = job
+            self._trim()
+        if self._inline:
+            self._run(job, fn)
+        else:
+            self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn):
+        job.state = 'running'
+        job.started_at = time.time()
+        try:
+            fn(job)
+            if job.state == 'running':
+                job.state = 'succeeded'
+        except Exception as e:
+            job.state = 'failed'
+            job.message = str(e)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._pending -= 1
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,133 @@
+# instrumentation.py
+"""
+按请求的 SQL 统计（可选开启，按比例抽样）：
+- 通过引擎的 before/after_cursor_execute 事件记录语句数、数据库总耗时与最慢的语句；
+- 序列化耗时包括构造响应字典（rows_to_dicts 等，用 timed_serialization 计时）与 serializers.dumps；
+- 请求结束时写入 Server-Timing 响应头，并由 instrumentation 日志器输出一行 JSON
+  （日志器没有处理器时 init_app 为其添加一个输出到标准错误的 INFO 级处理器）。
+后台导入线程与未被抽中的请求不做任何记录。
+"""
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# 日志中最慢语句 SQL 的最大长度
+SLOW_STATEMENT_MAX_LENGTH = 500
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+        self.serialize_seconds = 0.0
+
+    def record_statement(self, statement, seconds):
+        self.statements += 1
+        self.db_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+    def server_timing(self, total_seconds):
+        return ', '.join([
+            f'db;dur={self.db_seconds * 1000:.3f};desc="{self.statements} queries"',
+            f'db-slowest;dur={self.slowest_seconds * 1000:.3f}',
+            f'serialize;dur={self.serialize_seconds * 1000:.3f}',
+            f'total;dur={total_seconds * 1000:.3f}',
+        ])
+
+
+def current_stats():
+    """当前请求被抽中时返回其 RequestStats，否则为 None。"""
+    return g.get('sql_stats') if has_app_context() else None
+
+
+def record_serialization(seconds):
+    stats = current_stats()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+@contextmanager
+def timed_serialization():
+    """代码块的耗时计入当前请求的序列化耗时。"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_serialization(time.perf_counter() - started)
+
+
+def configure_logger():
+    """未配置处理器时按 INFO 级输出到标准错误，每行只有 JSON 本身；已有配置（如部署方的 dictConfig）时不改动。"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def instrument_engine(engine):
+    # 开始时间记在本次执行的 ExecutionContext 上，语句出错时随上下文一起丢弃，不会残留在池化连接上
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and current_stats() is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_stats()
+        started = getattr(context, '_query_started', None)
+        if stats is not None and started is not None:
+            stats.record_statement(statement, time.perf_counter() - started)
+
+
+def init_app(app, engines):
+    """SQL_INSTRUMENTATION_ENABLED 开启时为各引擎注册事件，并按 SQL_INSTRUMENTATION_SAMPLE_RATE 抽样请求。"""
+    if not app.config['SQL_INSTRUMENTATION_ENABLED']:
+        return
+    configure_logger()
+    for engine in engines:
+        instrument_engine(engine)
+    sample_rate = app.config['SQL_INSTRUMENTATION_SAMPLE_RATE']
+
+    @app.before_request
+    def _start_request_stats():
+        if random.random() < sample_rate:
+            g.sql_stats = RequestStats()
+
+    @app.after_request
+    def _finish_request_stats(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+        # 流式响应在此之后才执行的查询与序列化不计入
+        total_seconds = time.perf_counter() - stats.started
+        response.headers.add('Server-Timing', stats.server_timing(total_seconds))
+        slowest = stats.slowest_statement
+        logger.info(json.dumps({
+            'event': 'request_sql',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'statements': stats.statements,
+            'db_ms': round(stats.db_seconds * 1000, 3),
+            'slowest_ms': round(stats.slowest_seconds * 1000, 3),
+            'slowest_sql': ' '.join(slowest.split())[:SLOW_STATEMENT_MAX_LENGTH] if slowest else None,
+            'serialize_ms': round(stats.serialize_seconds * 1000, 3),
+            'total_ms': round(total_seconds * 1000, 3),
+            'streamed': response.is_streamed,
+        }, ensure_ascii=False))
+        return response
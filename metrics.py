@@ -0,0 +1,244 @@
+# metrics.py
+"""
+进程内指标收集与 Prometheus 文本格式输出。
+- Counter / Histogram 按标签值分组累计，每个指标一把锁，只在更新字典时持有；
+- 多进程部署（多个 worker）时设置 METRICS_MULTIPROC_DIR：各进程定期把自己的累计值
+  写成 <目录>/metrics-<pid>.json，/metrics 汇总目录下所有进程的快照后输出。
+  已退出进程的快照保留在目录中，计数不会因 worker 重启而倒退；部署前应清空该目录。
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from flask import g, request
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 默认的耗时分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(samples):
+        merged = {}
+        for key, value in samples:
+            merged[tuple(key)] = merged.get(tuple(key), 0) + value
+        return merged
+
+    def render(self, samples, lines):
+        for key, value in sorted(self.merge(samples).items()):
+            lines.append(f'{self.name}{_labels(self.labelnames, key)} {_number(value)}')
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        # 非累计的分桶计数，输出时再累加；最后一格对应 +Inf
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(counts), total, count] for key, (counts, total, count) in self._values.items()]
+
+    def merge(self, samples):
+        merged = {}
+        for key, counts, total, count in samples:
+            entry = merged.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0, 0])
+            entry[0] = [a + b for a, b in zip(entry[0], counts)]
+            entry[1] += total
+            entry[2] += count
+        return merged
+
+    def render(self, samples, lines):
+        for key, (counts, total, count) in sorted(self.merge(samples).items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == math.inf else _number(bound)
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames + ("le",), key + (le,))} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Registry:
+    def __init__(self):
+        self._collectors = []
+        self.multiproc_dir = None
+        self.flush_interval = 5
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def register(self, collector):
+        self._collectors.append(collector)
+        return collector
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def configure(self, multiproc_dir=None, flush_interval=5):
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        if multiproc_dir:
+            os.makedirs(multiproc_dir, exist_ok=True)
+
+    def snapshot(self):
+        return {collector.name: collector.snapshot() for collector in self._collectors}
+
+    def flush(self, force=False):
+        """多进程模式下把本进程的累计值写入快照文件；距上次写入不足 flush_interval 秒时跳过（force 除外）。"""
+        if not self.multiproc_dir:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = now
+            path = os.path.join(self.multiproc_dir, f'metrics-{os.getpid()}.json')
+            fd, tmp_path = tempfile.mkstemp(dir=self.multiproc_dir, prefix='.metrics-', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        """返回 {指标名: 全部样本}；多进程模式下汇总目录中所有进程的快照。"""
+        if not self.multiproc_dir:
+            return self.snapshot()
+        self.flush(force=True)
+        samples = {collector.name: [] for collector in self._collectors}
+        for filename in os.listdir(self.multiproc_dir):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, filename)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, values in snapshot.items():
+                if name in samples:
+                    samples[name].extend(values)
+        return samples
+
+    def render(self):
+        samples = self.collect()
+        lines = []
+        for collector in self._collectors:
+            lines.append(f'# HELP {collector.name} {collector.documentation}')
+            lines.append(f'# TYPE {collector.name} {collector.type}')
+            collector.render(samples.get(collector.name, []), lines)
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# HTTP 请求
+http_requests_total = registry.counter(
+    'http_requests_total', 'HTTP requests by route, method and status.', ('method', 'route', 'status'))
+http_request_errors_total = registry.counter(
+    'http_request_errors_total', 'HTTP requests answered with a 4xx or 5xx status.', ('method', 'route', 'status'))
+http_request_duration_seconds = registry.histogram(
+    'http_request_duration_seconds', 'Time to produce the response (streamed bodies excluded).', ('method', 'route'))
+http_response_size_bytes = registry.histogram(
+    'http_response_size_bytes', 'Response body size of non-streamed responses.', ('method', 'route'),
+    buckets=(100, 1000, 10000, 100000, 1000000, 10000000))
+
+# 业务计数
+csv_import_rows_total = registry.counter(
+    'csv_import_rows_total', 'CSV rows imported (committed) or rejected by validation.', ('model', 'result'))
+csv_export_rows_total = registry.counter(
+    'csv_export_rows_total', 'Rows written to CSV exports.', ('model',))
+cascade_rows_total = registry.counter(
+    'cascade_rows_total', 'Rows updated or deleted by cascading soft delete / restore / permanent delete.', ('operation', 'table'))
+purge_rows_total = registry.counter(
+    'purge_rows_total', 'Soft-deleted rows removed by the purge job.', ('mode', 'table'))
+
+
+def init_app(app):
+    """注册请求计时与计数钩子；METRICS_MULTIPROC_DIR 非空时启用多进程汇总。"""
+    registry.configure(app.config['METRICS_MULTIPROC_DIR'], app.config['METRICS_FLUSH_INTERVAL'])
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        method = request.method
+        status = response.status_code
+        http_requests_total.inc(method=method, route=route, status=status)
+        if status >= 400:
+            http_request_errors_total.inc(method=method, route=route, status=status)
+        http_request_duration_seconds.observe(time.perf_counter() - started, method=method, route=route)
+        if not response.is_streamed:
+            http_response_size_bytes.observe(response.calculate_content_length() or 0, method=method, route=route)
+        registry.flush()
+        return response
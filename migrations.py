@@ -0,0 +1,263 @@
+# migrations.py
+"""
+版本化的数据库结构迁移。
+schema_migrations 表记录已执行的版本，upgrade 按版本号依次执行尚未执行的迁移，每个迁移一个事务。
+迁移中的表结构按编写时的样子定义，不引用当前模型，任何历史版本的数据库都能逐步升级到最新。
+
+命令行：
+  flask --app app db upgrade [--to N]   执行迁移
+  flask --app app db current            显示当前版本与待执行的迁移
+"""
+import time
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import (BigInteger, Column, Double, ForeignKey, Index, Integer, MetaData, String, Table, inspect, select,
+                        text)
+from sqlalchemy.dialects import mysql
+
+from models import db
+
+MIGRATIONS = []
+
+migration_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', migration_metadata,
+    Column('VERSION', Integer, primary_key=True, autoincrement=False),
+    Column('DESCRIPTION', String(255)),
+    Column('APPLIED_AT', Double),
+)
+
+
+def migration(version, description):
+    """登记一个迁移：被装饰的函数接收 Connection，在迁移事务内执行。"""
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return decorator
+
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def applied_versions(conn):
+    if not inspect(conn).has_table(schema_migrations.name):
+        return set()
+    return set(conn.execute(select(schema_migrations.c.VERSION)).scalars())
+
+
+def pending_migrations(conn, target=None):
+    applied = applied_versions(conn)
+    return [m for m in MIGRATIONS if m[0] not in applied and (target is None or m[0] <= target)]
+
+
+def upgrade(engine=None, target=None, echo=print):
+    """执行尚未执行的迁移（可指定目标版本），返回执行的版本号列表。"""
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        migration_metadata.create_all(conn, checkfirst=True)
+        pending = pending_migrations(conn, target)
+    done = []
+    for version, description, fn in pending:
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(schema_migrations.insert().values(
+                VERSION=version, DESCRIPTION=description, APPLIED_AT=time.time()))
+        echo(f'{version:>4}  {description}  ({time.perf_counter() - started:.2f}s)')
+        done.append(version)
+    return done
+
+
+# ---------------------------
+# 迁移
+# ---------------------------
+@migration(1, 'initial schema')
+def _initial_schema(conn):
+    # 之前由 db.create_all() 建表的数据库已有这些表，checkfirst 时跳过
+    metadata = MetaData()
+    Table('page_lists', metadata,
+          Column('ID', String(32), primary_key=True),
+          Column('NAME', String(255)),
+          Column('LABEL', String(255)),
+          Column('DELETED', String(1)))
+    Table('objects', metadata,
+          Column('ID', String(32), primary_key=True),
+          Column('NAME', String(255)),
+          Column('LABEL', String(255)),
+          Column('TABLE_NAME', String(255)),
+          Column('DELETED', String(1)))
+    Table('object_fields', metadata,
+          Column('ID', String(32), primary_key=True),
+          Column('OBJECT_ID', String(32), ForeignKey('objects.ID'), nullable=False),
+          Column('NAME', String(255)),
+          Column('LABEL', String(255)),
+          Column('TYPE', String(255)),
+          Column('DELETED', String(1)))
+    Table('page_list_fields', metadata,
+          Column('ID', String(32), primary_key=True),
+          Column('NAME', String(255)),
+          Column('OBJECT_FIELD_ID', String(32), ForeignKey('object_fields.ID'), nullable=False),
+          Column('PAGE_LIST_ID', String(32), ForeignKey('page_lists.ID'), nullable=False),
+          Column('HIDDEN', String(1)),
+          Column('TYPE', String(255)),
+          Column('DELETED', String(1)))
+    Table('page_layouts', metadata,
+          Column('ID', String(32), primary_key=True),
+          Column('NAME', String(255)),
+          Column('PAGE_LIST_ID', String(32), ForeignKey('page_lists.ID'), nullable=False),
+          Column('DELETED', String(1)))
+    Table('page_layout_fields', metadata,
+          Column('ID', String(32), primary_key=True),
+          Column('NAME', String(255)),
+          Column('LABEL', String(255)),
+          Column('PAGE_LAYOUT_ID', String(32), ForeignKey('page_layouts.ID'), nullable=False),
+          Column('OBJECT_FIELD_ID', String(32), ForeignKey('object_fields.ID'), nullable=False),
+          Column('TYPE', String(255)),
+          Column('DELETED', String(1)))
+    Table('table_versions', metadata,
+          Column('TABLE_NAME', String(64), primary_key=True),
+          Column('VERSION', BigInteger, nullable=False))
+    metadata.create_all(conn, checkfirst=True)
+
+
+# 迁移 2 时各表的 ID 列（主键与外键）
+_ID_COLUMNS_V2 = {
+    'page_lists': ['ID'],
+    'objects': ['ID'],
+    'object_fields': ['ID', 'OBJECT_ID'],
+    'page_list_fields': ['ID', 'OBJECT_FIELD_ID', 'PAGE_LIST_ID'],
+    'page_layouts': ['ID', 'PAGE_LIST_ID'],
+    'page_layout_fields': ['ID', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID'],
+}
+
+
+@migration(2, 'store ID columns as BINARY(16) on MySQL')
+def _binary_ids(conn):
+    """
+    MySQL：主键与外键列由 VARCHAR(32) 十六进制改为 BINARY(16)（UNHEX），其他数据库不变。
+    先删除外键约束，逐表 VARCHAR -> VARBINARY -> UNHEX -> BINARY(16)，最后按原定义重建外键。
+    MySQL 的 DDL 会隐式提交，中途失败时需要从备份恢复，执行前请先备份。
+    """
+    if conn.dialect.name != 'mysql':
+        return
+    inspector = inspect(conn)
+    for table, columns in _ID_COLUMNS_V2.items():
+        for column in columns:
+            invalid = conn.execute(text(
+                f"SELECT COUNT(*) FROM `{table}` WHERE `{column}` NOT REGEXP '^[0-9a-fA-F]{{32}}$'")).scalar()
+            if invalid:
+                raise RuntimeError(f'{table}.{column} has {invalid} values that are not 32-digit hex IDs')
+    foreign_keys = {table: inspector.get_foreign_keys(table) for table in _ID_COLUMNS_V2}
+    for table, fks in foreign_keys.items():
+        for fk in fks:
+            conn.execute(text(f"ALTER TABLE `{table}` DROP FOREIGN KEY `{fk['name']}`"))
+    for table, columns in _ID_COLUMNS_V2.items():
+        conn.execute(text(f"ALTER TABLE `{table}` " + ', '.join(
+            f'MODIFY `{column}` VARBINARY(32) NOT NULL' for column in columns)))
+        conn.execute(text(f"UPDATE `{table}` SET " + ', '.join(
+            f'`{column}` = UNHEX(`{column}`)' for column in columns)))
+        conn.execute(text(f"ALTER TABLE `{table}` " + ', '.join(
+            f'MODIFY `{column}` BINARY(16) NOT NULL' for column in columns)))
+    for table, fks in foreign_keys.items():
+        for fk in fks:
+            conn.execute(text(
+                f"ALTER TABLE `{table}` ADD CONSTRAINT `{fk['name']}` FOREIGN KEY "
+                f"({', '.join(f'`{c}`' for c in fk['constrained_columns'])}) "
+                f"REFERENCES `{fk['referred_table']}` ({', '.join(f'`{c}`' for c in fk['referred_columns'])})"))
+
+
+# 迁移 3 时各表的列（归档表按此复制，另加 ARCHIVED_AT）
+_COLUMNS_V3 = {
+    'page_lists': ['ID', 'NAME', 'LABEL', 'DELETED', 'DELETED_AT'],
+    'objects': ['ID', 'NAME', 'LABEL', 'TABLE_NAME', 'DELETED', 'DELETED_AT'],
+    'object_fields': ['ID', 'OBJECT_ID', 'NAME', 'LABEL', 'TYPE', 'DELETED', 'DELETED_AT'],
+    'page_list_fields': ['ID', 'NAME', 'OBJECT_FIELD_ID', 'PAGE_LIST_ID', 'HIDDEN', 'TYPE', 'DELETED', 'DELETED_AT'],
+    'page_layouts': ['ID', 'NAME', 'PAGE_LIST_ID', 'DELETED', 'DELETED_AT'],
+    'page_layout_fields': ['ID', 'NAME', 'LABEL', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID', 'TYPE', 'DELETED',
+                           'DELETED_AT'],
+}
+
+
+@migration(3, 'soft-delete timestamps and archive tables')
+def _soft_delete_archive(conn):
+    """
+    各表增加 DELETED_AT 列与 (DELETED, DELETED_AT) 索引，已软删除的行以迁移时间作为删除时间；
+    创建 <表名>_archive 归档表（无外键，父记录可能先于子记录被清理）。
+    """
+    quote = conn.dialect.identifier_preparer.quote
+    id_type = mysql.BINARY(16) if conn.dialect.name == 'mysql' else String(32)
+    now = time.time()
+    metadata = MetaData()
+    for table, columns in _COLUMNS_V3.items():
+        # 时间为 epoch 秒，需用双精度：单精度 FLOAT 在当前时间量级上只能精确到约 128 秒
+        conn.execute(text(f'ALTER TABLE {quote(table)} ADD COLUMN {quote("DELETED_AT")} DOUBLE PRECISION'))
+        conn.execute(text(f"UPDATE {quote(table)} SET {quote('DELETED_AT')} = :now WHERE {quote('DELETED')} = '1'"),
+                     {'now': now})
+        live = Table(table, metadata, Column('DELETED', String(1)), Column('DELETED_AT', Double))
+        Index(f'ix_{table}_deleted_at', live.c.DELETED, live.c.DELETED_AT).create(conn)
+        archive_columns = []
+        for name in columns:
+            if name == 'ID':
+                archive_columns.append(Column(name, id_type, primary_key=True))
+            elif name.endswith('_ID'):
+                archive_columns.append(Column(name, id_type, nullable=False))
+            elif name == 'DELETED_AT':
+                archive_columns.append(Column(name, Double))
+            else:
+                archive_columns.append(Column(name, String(1) if name in ('DELETED', 'HIDDEN') else String(255)))
+        Table(f'{table}_archive', metadata, *archive_columns, Column('ARCHIVED_AT', Double))
+    metadata.create_all(conn, tables=[t for name, t in metadata.tables.items() if name.endswith('_archive')])
+
+
+# 需要维护 ETag 版本号的业务表
+_VERSIONED_TABLES_V4 = ['page_lists', 'objects', 'object_fields', 'page_list_fields', 'page_layouts',
+                        'page_layout_fields']
+
+
+@migration(4, 'seed table_versions rows')
+def _seed_table_versions(conn):
+    """
+    每张业务表预先写入 VERSION=0 的一行，提交时只需 UPDATE VERSION+1，
+    避免首次写入时并发的 INSERT 因主键冲突或死锁导致业务写入回滚。
+    """
+    versions = Table('table_versions', MetaData(),
+                     Column('TABLE_NAME', String(64), primary_key=True),
+                     Column('VERSION', BigInteger, nullable=False))
+    existing = set(conn.execute(select(versions.c.TABLE_NAME)).scalars())
+    missing = [name for name in _VERSIONED_TABLES_V4 if name not in existing]
+    if missing:
+        conn.execute(versions.insert(), [{'TABLE_NAME': name, 'VERSION': 0} for name in missing])
+
+
+# ---------------------------
+# 命令行
+# ---------------------------
+db_cli = AppGroup('db', help='数据库结构迁移。')
+
+
+@db_cli.command('upgrade')
+@click.option('--to', 'target', type=int, default=None, help='升级到指定版本（默认最新）')
+def upgrade_command(target):
+    """执行尚未执行的迁移。"""
+    click.echo(f'Database: {db.engine.url.render_as_string(hide_password=True)}')
+    done = upgrade(target=target, echo=click.echo)
+    if not done:
+        click.echo('Already up to date.')
+
+
+@db_cli.command('current')
+def current_command():
+    """显示已执行的最新版本与待执行的迁移。"""
+    with db.engine.connect() as conn:
+        applied = applied_versions(conn)
+        pending = pending_migrations(conn)
+    click.echo(f'Current version: {max(applied) if applied else 0} (latest {latest_version()})')
+    for version, description, _ in pending:
+        click.echo(f'Pending: {version:>4}  {description}')
+
+
+def init_app(app):
+    app.cli.add_command(db_cli)
@@ -1,144 +1,321 @@
 # models.py
+import os
+import time
 import uuid
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import String, delete, or_, select, update
+from sqlalchemy.dialects import mysql
+from sqlalchemy.types import TypeDecorator
 
-db = SQLAlchemy()
+import metrics
+from replicas import RoutingSession
 
-class PageList(db.Model):
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+ID_STRATEGIES = ('uuid7', 'uuid4')
+_id_strategy = 'uuid7'
+
+
+def configure_ids(strategy):
+    """选择新记录主键的生成方式：uuid7（按时间递增）或 uuid4（完全随机）。"""
+    global _id_strategy
+    if strategy not in ID_STRATEGIES:
+        raise ValueError(f'Unknown ID strategy: {strategy}')
+    _id_strategy = strategy
+
+
+def uuid7_hex():
+    """
+    UUID v7（RFC 9562）：高 48 位为毫秒时间戳，其余为版本号、变体与随机位。
+    新生成的 ID 大致按时间递增，插入集中在聚簇索引末端，减少 InnoDB 页分裂。
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76                       # 版本号
+    value |= (rand >> 68) << 64              # rand_a：12 位
+    value |= 0b10 << 62                      # 变体
+    value |= rand & ((1 << 62) - 1)          # rand_b：62 位
+    return f'{value:032x}'
+
+
+def new_id():
+    """生成新记录的主键（32 位十六进制字符串）。"""
+    if _id_strategy == 'uuid7':
+        return uuid7_hex()
+    return uuid.uuid4().hex
+
+
+class HexID(TypeDecorator):
+    """
+    主键与外键列：对外始终是 32 位十六进制字符串。
+    MySQL 上存为 BINARY(16)（主键与每个外键、二级索引只占 16 字节），其他数据库仍为 VARCHAR(32)。
+    不是合法十六进制的输入按 NULL 绑定，查询结果为空而不是报错。
+    """
+    impl = String(32)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'mysql':
+            return dialect.type_descriptor(mysql.BINARY(16))
+        return dialect.type_descriptor(String(32))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != 'mysql':
+            return value
+        try:
+            raw = bytes.fromhex(value)
+        except (TypeError, ValueError):
+            return None
+        return raw if len(raw) == 16 else None
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, (bytes, bytearray)):
+            return bytes(value).hex()
+        return value
+
+
+def _set_deleted(model_cls, state, *criteria):
+    """
+    以一条 UPDATE 把满足条件且 DELETED 不等于 state 的行置为 state，返回更新行数。
+    与逐个对象比较 `DELETED != state` 一致，NULL 也会被更新。
+    软删除时记录 DELETED_AT（清理任务据此判断保留期），恢复时清空。
+    """
+    result = db.session.execute(
+        update(model_cls)
+        .where(*criteria, or_(model_cls.DELETED != state, model_cls.DELETED.is_(None)))
+        .values(DELETED=state, DELETED_AT=time.time() if state == '1' else None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _delete_rows(model_cls, *criteria):
+    """以一条 DELETE 删除满足条件的行，返回删除行数。"""
+    result = db.session.execute(
+        delete(model_cls).where(*criteria).execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+def _pending_children(model_cls, parent_column, ids, state):
+    """子查询：ids 下尚未处于 state 状态、需要继续向下级联的子记录 ID。"""
+    return select(model_cls.ID).where(
+        parent_column.in_(ids),
+        or_(model_cls.DELETED != state, model_cls.DELETED.is_(None))
+    )
+
+
+def _record_cascade(operation, counts):
+    for table, count in counts.items():
+        metrics.cascade_rows_total.inc(count, operation=operation, table=table)
+    return counts
+
+
+class CascadeMixin:
+    """
+    级联软删除/恢复：每一层一条 UPDATE ... WHERE ... IN (子查询)，
+    先更新下层再更新本层，使子查询仍能看到上层更新前的状态，结果与逐个对象遍历一致。
+    级联永久删除同样每张表一条 DELETE ... WHERE ... IN (子查询)，按外键依赖先删子表，
+    语句数与子树大小无关，也不把子记录加载进会话。
+    各方法返回 {表名: 更新/删除行数}。
+    """
+
+    @classmethod
+    def cascade_soft_delete_ids(cls, ids):
+        return _record_cascade('soft_delete', cls._cascade_set_deleted(list(ids), '1'))
+
+    @classmethod
+    def cascade_restore_ids(cls, ids):
+        return _record_cascade('restore', cls._cascade_set_deleted(list(ids), '0'))
+
+    @classmethod
+    def cascade_permanent_delete_ids(cls, ids):
+        return _record_cascade('permanent_delete', cls._cascade_delete(list(ids)))
+
+    @classmethod
+    def _cascade_set_deleted(cls, ids, state):
+        return {cls.__tablename__: _set_deleted(cls, state, cls.ID.in_(ids))}
+
+    @classmethod
+    def _cascade_delete(cls, ids):
+        return {cls.__tablename__: _delete_rows(cls, cls.ID.in_(ids))}
+
+    def cascade_soft_delete(self):
+        counts = self.cascade_soft_delete_ids([self.ID])
+        db.session.expire(self, ['DELETED'])
+        return counts
+
+    def cascade_restore(self):
+        counts = self.cascade_restore_ids([self.ID])
+        db.session.expire(self, ['DELETED'])
+        return counts
+
+    def cascade_permanent_delete(self):
+        counts = self.cascade_permanent_delete_ids([self.ID])
+        db.session.expunge(self)
+        return counts
+
+
+class PageList(CascadeMixin, db.Model):
     __tablename__ = 'page_lists'
-    ID = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    __table_args__ = (db.Index('ix_page_lists_deleted_at', 'DELETED', 'DELETED_AT'),)
+    ID = db.Column(HexID, primary_key=True, default=new_id)
     NAME = db.Column(db.String(255))
     LABEL = db.Column(db.String(255))
     DELETED = db.Column(db.String(1), default='0')
+    DELETED_AT = db.Column(db.Double)
 
     # 关系
     page_list_fields = db.relationship('PageListField', backref='page_list', lazy=True)
     page_layouts = db.relationship('PageLayout', backref='page_list', lazy=True)
 
-    def cascade_soft_delete(self):
-        self.DELETED = '1'
-        for plf in self.page_list_fields:
-            if plf.DELETED != '1':
-                plf.cascade_soft_delete()
-        for layout in self.page_layouts:
-            if layout.DELETED != '1':
-                layout.cascade_soft_delete()
+    @classmethod
+    def _cascade_set_deleted(cls, ids, state):
+        counts = {}
+        layouts = _pending_children(PageLayout, PageLayout.PAGE_LIST_ID, ids, state)
+        counts[PageLayoutField.__tablename__] = _set_deleted(
+            PageLayoutField, state, PageLayoutField.PAGE_LAYOUT_ID.in_(layouts))
+        counts[PageLayout.__tablename__] = _set_deleted(PageLayout, state, PageLayout.PAGE_LIST_ID.in_(ids))
+        counts[PageListField.__tablename__] = _set_deleted(PageListField, state, PageListField.PAGE_LIST_ID.in_(ids))
+        counts[cls.__tablename__] = _set_deleted(cls, state, cls.ID.in_(ids))
+        return counts
 
-    def cascade_restore(self):
-        self.DELETED = '0'
-        for plf in self.page_list_fields:
-            if plf.DELETED != '0':
-                plf.cascade_restore()
-        for layout in self.page_layouts:
-            if layout.DELETED != '0':
-                layout.cascade_restore()
+    @classmethod
+    def _cascade_delete(cls, ids):
+        counts = {}
+        layouts = select(PageLayout.ID).where(PageLayout.PAGE_LIST_ID.in_(ids))
+        counts[PageLayoutField.__tablename__] = _delete_rows(
+            PageLayoutField, PageLayoutField.PAGE_LAYOUT_ID.in_(layouts))
+        counts[PageLayout.__tablename__] = _delete_rows(PageLayout, PageLayout.PAGE_LIST_ID.in_(ids))
+        counts[PageListField.__tablename__] = _delete_rows(PageListField, PageListField.PAGE_LIST_ID.in_(ids))
+        counts[cls.__tablename__] = _delete_rows(cls, cls.ID.in_(ids))
+        return counts
 
 
-class Object(db.Model):
+class Object(CascadeMixin, db.Model):
     __tablename__ = 'objects'
-    ID = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    __table_args__ = (db.Index('ix_objects_deleted_at', 'DELETED', 'DELETED_AT'),)
+    ID = db.Column(HexID, primary_key=True, default=new_id)
     NAME = db.Column(db.String(255))
     LABEL = db.Column(db.String(255))
     TABLE_NAME = db.Column(db.String(255))
     DELETED = db.Column(db.String(1), default='0')
+    DELETED_AT = db.Column(db.Double)
 
     object_fields = db.relationship('ObjectField', backref='object', lazy=True)
 
-    def cascade_soft_delete(self):
-        self.DELETED = '1'
-        for field in self.object_fields:
-            if field.DELETED != '1':
-                field.cascade_soft_delete()
+    @classmethod
+    def _cascade_set_deleted(cls, ids, state):
+        counts = {}
+        fields = _pending_children(ObjectField, ObjectField.OBJECT_ID, ids, state)
+        counts[PageListField.__tablename__] = _set_deleted(
+            PageListField, state, PageListField.OBJECT_FIELD_ID.in_(fields))
+        counts[PageLayoutField.__tablename__] = _set_deleted(
+            PageLayoutField, state, PageLayoutField.OBJECT_FIELD_ID.in_(fields))
+        counts[ObjectField.__tablename__] = _set_deleted(ObjectField, state, ObjectField.OBJECT_ID.in_(ids))
+        counts[cls.__tablename__] = _set_deleted(cls, state, cls.ID.in_(ids))
+        return counts
 
-    def cascade_restore(self):
-        self.DELETED = '0'
-        for field in self.object_fields:
-            if field.DELETED != '0':
-                field.cascade_restore()
+    @classmethod
+    def _cascade_delete(cls, ids):
+        counts = {}
+        fields = select(ObjectField.ID).where(ObjectField.OBJECT_ID.in_(ids))
+        counts[PageListField.__tablename__] = _delete_rows(PageListField, PageListField.OBJECT_FIELD_ID.in_(fields))
+        counts[PageLayoutField.__tablename__] = _delete_rows(
+            PageLayoutField, PageLayoutField.OBJECT_FIELD_ID.in_(fields))
+        counts[ObjectField.__tablename__] = _delete_rows(ObjectField, ObjectField.OBJECT_ID.in_(ids))
+        counts[cls.__tablename__] = _delete_rows(cls, cls.ID.in_(ids))
+        return counts
 
 
-class ObjectField(db.Model):
+class ObjectField(CascadeMixin, db.Model):
     __tablename__ = 'object_fields'
-    ID = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
-    OBJECT_ID = db.Column(db.String(32), db.ForeignKey('objects.ID'), nullable=False)
+    __table_args__ = (db.Index('ix_object_fields_deleted_at', 'DELETED', 'DELETED_AT'),)
+    ID = db.Column(HexID, primary_key=True, default=new_id)
+    OBJECT_ID = db.Column(HexID, db.ForeignKey('objects.ID'), nullable=False)
     NAME = db.Column(db.String(255))
     LABEL = db.Column(db.String(255))
     TYPE = db.Column(db.String(255))
     DELETED = db.Column(db.String(1), default='0')
+    DELETED_AT = db.Column(db.Double)
 
     page_list_fields = db.relationship('PageListField', backref='object_field', lazy=True)
     page_layout_fields = db.relationship('PageLayoutField', backref='object_field', lazy=True)
 
-    def cascade_soft_delete(self):
-        self.DELETED = '1'
-        for plf in self.page_list_fields:
-            if plf.DELETED != '1':
-                plf.cascade_soft_delete()
-        for plf in self.page_layout_fields:
-            if plf.DELETED != '1':
-                plf.cascade_soft_delete()
+    @classmethod
+    def _cascade_set_deleted(cls, ids, state):
+        counts = {}
+        counts[PageListField.__tablename__] = _set_deleted(PageListField, state, PageListField.OBJECT_FIELD_ID.in_(ids))
+        counts[PageLayoutField.__tablename__] = _set_deleted(
+            PageLayoutField, state, PageLayoutField.OBJECT_FIELD_ID.in_(ids))
+        counts[cls.__tablename__] = _set_deleted(cls, state, cls.ID.in_(ids))
+        return counts
 
-    def cascade_restore(self):
-        self.DELETED = '0'
-        for plf in self.page_list_fields:
-            if plf.DELETED != '0':
-                plf.cascade_restore()
-        for plf in self.page_layout_fields:
-            if plf.DELETED != '0':
-                plf.cascade_restore()
+    @classmethod
+    def _cascade_delete(cls, ids):
+        counts = {}
+        counts[PageListField.__tablename__] = _delete_rows(PageListField, PageListField.OBJECT_FIELD_ID.in_(ids))
+        counts[PageLayoutField.__tablename__] = _delete_rows(PageLayoutField, PageLayoutField.OBJECT_FIELD_ID.in_(ids))
+        counts[cls.__tablename__] = _delete_rows(cls, cls.ID.in_(ids))
+        return counts
 
 
-class PageListField(db.Model):
+class PageListField(CascadeMixin, db.Model):
     __tablename__ = 'page_list_fields'
-    ID = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    __table_args__ = (db.Index('ix_page_list_fields_deleted_at', 'DELETED', 'DELETED_AT'),)
+    ID = db.Column(HexID, primary_key=True, default=new_id)
     NAME = db.Column(db.String(255))
-    OBJECT_FIELD_ID = db.Column(db.String(32), db.ForeignKey('object_fields.ID'), nullable=False)
-    PAGE_LIST_ID = db.Column(db.String(32), db.ForeignKey('page_lists.ID'), nullable=False)
+    OBJECT_FIELD_ID = db.Column(HexID, db.ForeignKey('object_fields.ID'), nullable=False)
+    PAGE_LIST_ID = db.Column(HexID, db.ForeignKey('page_lists.ID'), nullable=False)
     HIDDEN = db.Column(db.String(1))
     TYPE = db.Column(db.String(255))
     DELETED = db.Column(db.String(1), default='0')
-
-    def cascade_soft_delete(self):
-        self.DELETED = '1'
-
-    def cascade_restore(self):
-        self.DELETED = '0'
+    DELETED_AT = db.Column(db.Double)
 
 
-class PageLayout(db.Model):
+class PageLayout(CascadeMixin, db.Model):
     __tablename__ = 'page_layouts'
-    ID = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    __table_args__ = (db.Index('ix_page_layouts_deleted_at', 'DELETED', 'DELETED_AT'),)
+    ID = db.Column(HexID, primary_key=True, default=new_id)
     NAME = db.Column(db.String(255))
-    PAGE_LIST_ID = db.Column(db.String(32), db.ForeignKey('page_lists.ID'), nullable=False)
+    PAGE_LIST_ID = db.Column(HexID, db.ForeignKey('page_lists.ID'), nullable=False)
     DELETED = db.Column(db.String(1), default='0')
+    DELETED_AT = db.Column(db.Double)
 
     page_layout_fields = db.relationship('PageLayoutField', backref='page_layout', lazy=True)
 
-    def cascade_soft_delete(self):
-        self.DELETED = '1'
-        for field in self.page_layout_fields:
-            if field.DELETED != '1':
-                field.cascade_soft_delete()
+    @classmethod
+    def _cascade_set_deleted(cls, ids, state):
+        counts = {}
+        counts[PageLayoutField.__tablename__] = _set_deleted(
+            PageLayoutField, state, PageLayoutField.PAGE_LAYOUT_ID.in_(ids))
+        counts[cls.__tablename__] = _set_deleted(cls, state, cls.ID.in_(ids))
+        return counts
 
-    def cascade_restore(self):
-        self.DELETED = '0'
-        for field in self.page_layout_fields:
-            if field.DELETED != '0':
-                field.cascade_restore()
+    @classmethod
+    def _cascade_delete(cls, ids):
+        counts = {}
+        counts[PageLayoutField.__tablename__] = _delete_rows(PageLayoutField, PageLayoutField.PAGE_LAYOUT_ID.in_(ids))
+        counts[cls.__tablename__] = _delete_rows(cls, cls.ID.in_(ids))
+        return counts
 
 
-class PageLayoutField(db.Model):
+class PageLayoutField(CascadeMixin, db.Model):
     __tablename__ = 'page_layout_fields'
-    ID = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    __table_args__ = (db.Index('ix_page_layout_fields_deleted_at', 'DELETED', 'DELETED_AT'),)
+    ID = db.Column(HexID, primary_key=True, default=new_id)
     NAME = db.Column(db.String(255))
     LABEL = db.Column(db.String(255))
-    PAGE_LAYOUT_ID = db.Column(db.String(32), db.ForeignKey('page_layouts.ID'), nullable=False)
-    OBJECT_FIELD_ID = db.Column(db.String(32), db.ForeignKey('object_fields.ID'), nullable=False)
+    PAGE_LAYOUT_ID = db.Column(HexID, db.ForeignKey('page_layouts.ID'), nullable=False)
+    OBJECT_FIELD_ID = db.Column(HexID, db.ForeignKey('object_fields.ID'), nullable=False)
     TYPE = db.Column(db.String(255))
     DELETED = db.Column(db.String(1), default='0')
+    DELETED_AT = db.Column(db.Double)
 
-    def cascade_soft_delete(self):
-        self.DELETED = '1'
 
-    def cascade_restore(self):
-        self.DELETED = '0'
+class TableVersion(db.Model):
+    """各业务表的写入版本号：每次提交包含对该表的写入时加一，用于生成 ETag。"""
+    __tablename__ = 'table_versions'
+    TABLE_NAME = db.Column(db.String(64), primary_key=True)
+    VERSION = db.Column(db.BigInteger, nullable=False, default=0)
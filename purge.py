@@ -0,0 +1,149 @@
+# purge.py
+"""
+清理软删除的行：DELETED='1' 且 DELETED_AT 早于保留期的行移入 <表名>_archive 归档表（archive），
+或直接删除（delete）。
+按子表到父表的顺序处理，仍被任何子记录引用的父记录跳过（等子记录被清理后的下一轮再处理）。
+每批 batch_size 行一个短事务：锁定本批 ID，归档，删除，提交，批间暂停 pause 秒，避免长时间持有锁。
+"""
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import Column, Double, Table, delete, exists, func, insert, literal, or_, select
+
+import metrics
+from models import db, Object, ObjectField, PageList, PageListField, PageLayout, PageLayoutField
+
+PURGE_MODES = ('archive', 'delete')
+
+# 处理顺序：子表在前
+PURGE_ORDER = [PageLayoutField, PageListField, PageLayout, ObjectField, PageList, Object]
+
+# 模型 -> [(子模型, 子模型中引用该模型的外键列)]
+CHILDREN = {
+    PageLayout: [(PageLayoutField, PageLayoutField.PAGE_LAYOUT_ID)],
+    ObjectField: [(PageListField, PageListField.OBJECT_FIELD_ID), (PageLayoutField, PageLayoutField.OBJECT_FIELD_ID)],
+    PageList: [(PageListField, PageListField.PAGE_LIST_ID), (PageLayout, PageLayout.PAGE_LIST_ID)],
+    Object: [(ObjectField, ObjectField.OBJECT_ID)],
+}
+
+
+def _archive_table(model_cls):
+    # 与业务表列相同、没有外键约束，另记归档时间；由迁移 3 创建
+    columns = [Column(c.name, c.type, primary_key=c.primary_key) for c in model_cls.__table__.columns]
+    return Table(f'{model_cls.__tablename__}_archive', db.metadata, *columns, Column('ARCHIVED_AT', Double))
+
+
+ARCHIVE_TABLES = {model_cls: _archive_table(model_cls) for model_cls in PURGE_ORDER}
+
+
+def _expired(model_cls, cutoff):
+    return [model_cls.DELETED == '1', model_cls.DELETED_AT < cutoff]
+
+
+def _not_expired(model_cls, cutoff):
+    """不会在本轮被清理的行：未删除、删除未满保留期，或仍有不会被清理的子记录。"""
+    criteria = [model_cls.DELETED.is_(None), model_cls.DELETED != '1',
+                model_cls.DELETED_AT.is_(None), model_cls.DELETED_AT >= cutoff]
+    for child_cls, parent_column in CHILDREN.get(model_cls, ()):
+        criteria.append(exists().where(parent_column == model_cls.ID, _not_expired(child_cls, cutoff)))
+    return or_(*criteria)
+
+
+def purgeable(model_cls, cutoff, assume_children_purged=False):
+    """
+    可清理行的条件。实际清理时子表已先处理，仍存在的任何子记录都会阻止父记录被删除；
+    dry-run 不做修改，assume_children_purged 为真时把本轮会被清理的子记录视为已删除。
+    """
+    criteria = _expired(model_cls, cutoff)
+    for child_cls, parent_column in CHILDREN.get(model_cls, ()):
+        blocking = exists().where(parent_column == model_cls.ID)
+        if assume_children_purged:
+            blocking = blocking.where(_not_expired(child_cls, cutoff))
+        criteria.append(~blocking)
+    return criteria
+
+
+def _purge_batch(model_cls, cutoff, limit, mode, now):
+    ids = db.session.execute(
+        select(model_cls.ID).where(*purgeable(model_cls, cutoff)).limit(limit).with_for_update()
+    ).scalars().all()
+    if not ids:
+        db.session.rollback()
+        return 0
+    if mode == 'archive':
+        table = model_cls.__table__
+        db.session.execute(insert(ARCHIVE_TABLES[model_cls]).from_select(
+            [c.name for c in table.columns] + ['ARCHIVED_AT'],
+            select(*table.columns, literal(now, Double)).where(table.c.ID.in_(ids))))
+    result = db.session.execute(
+        delete(model_cls).where(model_cls.ID.in_(ids)).execution_options(synchronize_session=False))
+    db.session.commit()
+    return result.rowcount
+
+
+def purge(retention_days, mode='archive', batch_size=500, pause=0.0, max_rows=None, dry_run=False, now=None):
+    """
+    清理删除时间早于 retention_days 天的软删除行，返回 {表名: 行数}（dry_run 时为将清理的行数，不做修改）。
+    max_rows 限制单次运行清理的总行数，未处理完的留到下次运行。
+    """
+    if mode not in PURGE_MODES:
+        raise ValueError(f'Unknown purge mode: {mode}')
+    now = time.time() if now is None else now
+    cutoff = now - retention_days * 86400
+    counts = {}
+    if dry_run:
+        for model_cls in PURGE_ORDER:
+            counts[model_cls.__tablename__] = db.session.execute(
+                select(func.count()).select_from(model_cls)
+                .where(*purgeable(model_cls, cutoff, assume_children_purged=True))
+            ).scalar()
+        db.session.rollback()
+        return counts
+    remaining = max_rows
+    for model_cls in PURGE_ORDER:
+        total = 0
+        while remaining is None or remaining > 0:
+            limit = batch_size if remaining is None else min(batch_size, remaining)
+            purged = _purge_batch(model_cls, cutoff, limit, mode, now)
+            total += purged
+            if remaining is not None:
+                remaining -= purged
+            if purged < limit:
+                break
+            if pause:
+                time.sleep(pause)
+        counts[model_cls.__tablename__] = total
+        metrics.purge_rows_total.inc(total, mode=mode, table=model_cls.__tablename__)
+    return counts
+
+
+# ---------------------------
+# 命令行
+# ---------------------------
+@click.command('purge')
+@click.option('--retention-days', type=float, default=None, help='保留天数（默认 PURGE_RETENTION_DAYS）')
+@click.option('--mode', type=click.Choice(PURGE_MODES), default=None, help='archive 移入归档表 / delete 直接删除')
+@click.option('--batch-size', type=int, default=None)
+@click.option('--pause', type=float, default=None, help='批间暂停秒数')
+@click.option('--max-rows', type=int, default=None, help='本次最多清理的行数')
+@click.option('--dry-run', is_flag=True, help='只统计将清理的行数，不做修改')
+@with_appcontext
+def purge_command(retention_days, mode, batch_size, pause, max_rows, dry_run):
+    """清理超过保留期的软删除行。"""
+    config = current_app.config
+    counts = purge(
+        config['PURGE_RETENTION_DAYS'] if retention_days is None else retention_days,
+        mode=mode or config['PURGE_MODE'],
+        batch_size=batch_size or config['PURGE_BATCH_SIZE'],
+        pause=config['PURGE_BATCH_PAUSE'] if pause is None else pause,
+        max_rows=max_rows or config['PURGE_MAX_ROWS'] or None,
+        dry_run=dry_run,
+    )
+    for table, count in counts.items():
+        click.echo(f'{table:<20} {count:>10}{"  (dry run)" if dry_run else ""}')
+
+
+def init_app(app):
+    app.cli.add_command(purge_command)
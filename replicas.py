@@ -0,0 +1,78 @@
+# replicas.py
+"""
+只读副本路由：
+- 副本登记为 SQLALCHEMY_BINDS 中的 replica_<n> 绑定（由 REPLICA_DATABASE_URIS 生成）；
+- 请求被标记使用某个副本后，会话内的查询都发往该副本；flush 与 INSERT/UPDATE/DELETE 始终走主库；
+- 副本按轮询选取，连接失败的副本暂停使用 REPLICA_RETRY_INTERVAL 秒后再重新参与轮询。
+"""
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND_PREFIX = 'replica_'
+
+
+def replica_binds(uris):
+    """副本地址列表 -> SQLALCHEMY_BINDS 条目。"""
+    return {f'{REPLICA_BIND_PREFIX}{i}': uri for i, uri in enumerate(uris)}
+
+
+def current_replica():
+    """当前请求选定的副本绑定名；未使用副本（或不在应用上下文中，如后台导入线程）时为 None。"""
+    return g.get('db_replica') if has_app_context() else None
+
+
+class RoutingSession(Session):
+    """当前请求选定了副本时，把只读查询发往副本，其余语句仍按绑定规则发往主库。"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = current_replica()
+        if bind is None and replica is not None and not self._flushing and not isinstance(clause, UpdateBase):
+            return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """在可用副本间轮询；mark_down 后的副本在 retry_interval 秒内不参与选取。"""
+
+    def __init__(self, bind_keys, retry_interval=30):
+        self.bind_keys = list(bind_keys)
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = {}
+        self.failures = {key: 0 for key in self.bind_keys}
+        self.selected = {key: 0 for key in self.bind_keys}
+
+    def choose(self):
+        """返回下一个可用副本的绑定名，全部不可用时返回 None（改用主库）。"""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.bind_keys)):
+                key = self.bind_keys[self._next]
+                self._next = (self._next + 1) % len(self.bind_keys)
+                if self._down_until.get(key, 0) <= now:
+                    self.selected[key] += 1
+                    return key
+        return None
+
+    def mark_down(self, key):
+        with self._lock:
+            self._down_until[key] = time.monotonic() + self.retry_interval
+            self.failures[key] += 1
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: {
+                    'healthy': self._down_until.get(key, 0) <= now,
+                    'retry_in_seconds': round(max(0.0, self._down_until.get(key, 0) - now), 3),
+                    'selected': self.selected[key],
+                    'failures': self.failures[key],
+                }
+                for key in self.bind_keys
+            }
@@ -0,0 +1,96 @@
+# serializers.py
+"""
+JSON 序列化层：
+- 每个模型一个预编译的行编码器（生成的函数直接按字段取值拼字典，无逐字段循环），
+  同时适用于 ORM 实例与 Core 行；
+- JSON 后端可插拔：安装了 orjson 时默认使用，否则回退到标准库 json。
+"""
+import functools
+import json
+
+from flask import Response
+
+import instrumentation
+from models import PageList, Object, ObjectField, PageListField, PageLayout, PageLayoutField
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+# 各模型对外暴露的字段，即读接口 fields 参数（逗号分隔）的可选值
+MODEL_FIELDS = {
+    PageList: ['ID', 'NAME', 'LABEL'],
+    Object: ['ID', 'NAME', 'LABEL', 'TABLE_NAME'],
+    ObjectField: ['ID', 'OBJECT_ID', 'NAME', 'LABEL', 'TYPE'],
+    PageListField: ['ID', 'NAME', 'OBJECT_FIELD_ID', 'PAGE_LIST_ID', 'HIDDEN', 'TYPE'],
+    PageLayout: ['ID', 'NAME', 'PAGE_LIST_ID'],
+    PageLayoutField: ['ID', 'NAME', 'LABEL', 'PAGE_LAYOUT_ID', 'OBJECT_FIELD_ID', 'TYPE'],
+}
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj)
+
+
+_dumps = _orjson_dumps if orjson is not None else _stdlib_dumps
+
+
+def configure(backend='auto'):
+    """
+    选择 JSON 后端：auto（有 orjson 则用）、orjson、stdlib。
+    指定 orjson 但未安装时抛出 RuntimeError。
+    """
+    global _dumps
+    if backend == 'stdlib' or (backend == 'auto' and orjson is None):
+        _dumps = _stdlib_dumps
+    elif orjson is None:
+        raise RuntimeError('JSON_BACKEND=orjson but orjson is not installed')
+    elif backend in ('auto', 'orjson'):
+        _dumps = _orjson_dumps
+    else:
+        raise ValueError(f'Unknown JSON backend: {backend}')
+
+
+def backend_name():
+    return 'orjson' if _dumps is _orjson_dumps else 'stdlib'
+
+
+def dumps(obj):
+    """序列化为 UTF-8 编码的 JSON 字节串。"""
+    with instrumentation.timed_serialization():
+        return _dumps(obj)
+
+
+def _compile(fields, source_expr):
+    # 生成形如 {'ID': obj.ID, ...} 的函数体；字段名需为合法标识符（来自 MODEL_FIELDS 白名单）
+    if not all(field.isidentifier() for field in fields):
+        raise ValueError(f'Invalid field names: {fields}')
+    body = ', '.join(f'{field!r}: {source_expr(i, field)}' for i, field in enumerate(fields))
+    namespace = {}
+    exec(f'def encode(obj):\n    return {{{body}}}\n', namespace)
+    return namespace['encode']
+
+
+@functools.lru_cache(maxsize=256)
+def attribute_encoder(fields):
+    """按属性取值的编码器，适用于 ORM 实例与带属性访问的行。fields 为元组。"""
+    return _compile(fields, lambda i, field: f'obj.{field}')
+
+
+@functools.lru_cache(maxsize=256)
+def row_encoder(fields):
+    """按位置取值的编码器，适用于 SELECT 列顺序与 fields 一致的行元组。fields 为元组。"""
+    return _compile(fields, lambda i, field: f'obj[{i}]')
+
+
+# 每个模型预编译的完整字段编码器
+ENCODERS = {model_cls: attribute_encoder(tuple(fields)) for model_cls, fields in MODEL_FIELDS.items()}
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
@@ -0,0 +1,56 @@
+# tests/conftest.py
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrations  # noqa: E402
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+
+
+def make_app(tmp_path, **config):
+    """在临时 SQLite 文件上创建应用并执行迁移。"""
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'primary.db'),
+        'READ_CACHE_ENABLED': False,
+        **config,
+    })
+    with app.app_context():
+        migrations.upgrade(echo=lambda message: None)
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path)
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def create(client, entity, **values):
+    """通过批量接口创建一条记录，返回其 ID。"""
+    response = client.post(f'/{entity}/batch', json=[values])
+    assert response.status_code == 200
+    return response.get_json()['results'][0]['ID']
+
+
+def post_csv(client, endpoint, text, query=''):
+    return client.post(f'/import_csv/{endpoint}?{query}',
+                       data={'file': (io.BytesIO(text.encode('utf-8')), f'{endpoint}.csv')},
+                       content_type='multipart/form-data')
+
+
+@pytest.fixture
+def object_id(client):
+    return create(client, 'object', NAME='account')
@@ -0,0 +1,52 @@
+# tests/test_batch.py
+"""批量接口：形状不对的元素逐个报错并返回 400，不做任何修改；没有可更新字段的元素不写入。"""
+import pytest
+
+from cache import get_table_versions
+from models import db
+
+
+@pytest.mark.parametrize('method, items', [
+    ('POST', [{'OBJECT_ID': {'x': 1}, 'NAME': 'name'}]),
+    ('POST', [{'OBJECT_ID': [1], 'NAME': 'name'}]),
+    ('PUT', [{'ID': [1]}]),
+    ('PUT', [{'ID': {'x': 1}, 'NAME': 'name'}]),
+    ('DELETE', [{'ID': [1]}]),
+    ('DELETE', [[1]]),
+    ('DELETE', [1]),
+])
+def test_malformed_ids_are_reported_per_item(client, object_id, method, items):
+    response = client.open('/object_field/batch', method=method, json=items)
+    assert response.status_code == 400
+    assert [r['status'] for r in response.get_json()['results']] == ['error']
+
+
+def test_non_scalar_values_are_reported_per_item(client, object_id):
+    response = client.post('/object_field/batch', json=[
+        {'OBJECT_ID': object_id, 'NAME': 'name'},
+        {'OBJECT_ID': object_id, 'NAME': {'x': 1}},
+    ])
+    assert response.status_code == 400
+    assert [r['status'] for r in response.get_json()['results']] == ['valid', 'error']
+    assert client.get('/object_fields').get_json()['total'] == 0
+
+
+def test_non_scalar_update_value_is_rejected(client, object_id):
+    response = client.put('/object/batch', json=[{'ID': object_id, 'NAME': ['x']}])
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['status'] == 'error'
+
+
+def test_update_without_fields_is_reported_unchanged(app, client, object_id):
+    with app.app_context():
+        version = get_table_versions(db.session, ('objects',))
+    response = client.put('/object/batch', json=[{'ID': object_id}])
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'index': 0, 'status': 'unchanged', 'ID': object_id}]
+    assert response.get_json()['message'] == '0 item(s) updated'
+    with app.app_context():
+        assert get_table_versions(db.session, ('objects',)) == version
+
+    response = client.put('/object/batch', json=[{'ID': object_id}, {'ID': object_id, 'NAME': 'renamed'}])
+    assert [r['status'] for r in response.get_json()['results']] == ['unchanged', 'updated']
+    assert client.get('/objects').get_json()['items'][0]['NAME'] == 'renamed'
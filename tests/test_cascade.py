@@ -0,0 +1,96 @@
+# tests/test_cascade.py
+"""级联软删除/恢复：集合式 UPDATE 的结果与原先逐个对象遍历的结果一致。"""
+import itertools
+import time
+
+import pytest
+
+from models import db, Object, ObjectField, PageList, PageListField, PageLayout, PageLayoutField
+
+MODELS = [PageList, Object, ObjectField, PageListField, PageLayout, PageLayoutField]
+
+# 原逐个对象遍历时各模型向下级联的关系
+CHILD_RELATIONS = {
+    PageList: ['page_list_fields', 'page_layouts'],
+    Object: ['object_fields'],
+    ObjectField: ['page_list_fields', 'page_layout_fields'],
+    PageLayout: ['page_layout_fields'],
+}
+
+OLD_DELETED_AT = 1000.0
+
+
+def build_tree():
+    """每张表的 DELETED 依次取 NULL、'0'、'1'，已删除的行带有旧的 DELETED_AT。"""
+    states = {model_cls: itertools.cycle([None, '0', '1']) for model_cls in MODELS}
+
+    def add(model_cls, **values):
+        deleted = next(states[model_cls])
+        row = model_cls(DELETED=deleted, DELETED_AT=OLD_DELETED_AT if deleted == '1' else None, **values)
+        db.session.add(row)
+        db.session.flush()
+        return row
+
+    fields = []
+    for i in range(3):
+        obj = add(Object, NAME=f'object_{i}')
+        fields += [add(ObjectField, OBJECT_ID=obj.ID, NAME=f'field_{i}_{j}') for j in range(3)]
+    for i in range(3):
+        page_list = add(PageList, NAME=f'list_{i}')
+        for j in range(3):
+            add(PageListField, PAGE_LIST_ID=page_list.ID, OBJECT_FIELD_ID=fields[i * 3 + j].ID, NAME=f'plf_{i}_{j}')
+            layout = add(PageLayout, PAGE_LIST_ID=page_list.ID, NAME=f'layout_{i}_{j}')
+            for k in range(3):
+                add(PageLayoutField, PAGE_LAYOUT_ID=layout.ID, OBJECT_FIELD_ID=fields[(j + k) % 9].ID,
+                    NAME=f'lf_{i}_{j}_{k}')
+    db.session.commit()
+
+
+def snapshot():
+    return {(model_cls.__tablename__, row.ID): (row.DELETED, row.DELETED_AT)
+            for model_cls in MODELS for row in db.session.query(model_cls)}
+
+
+def old_walk(obj, state, visited):
+    """原 cascade_soft_delete / cascade_restore：置本对象状态，再递归处理状态不同的子对象。"""
+    visited[(obj.__tablename__, obj.ID)] = state
+    for relation in CHILD_RELATIONS.get(type(obj), []):
+        for child in getattr(obj, relation):
+            if visited.get((child.__tablename__, child.ID), child.DELETED) != state:
+                old_walk(child, state, visited)
+
+
+@pytest.mark.parametrize('state', ['1', '0'], ids=['soft_delete', 'restore'])
+@pytest.mark.parametrize('model_cls', [Object, ObjectField, PageList, PageLayout], ids=lambda m: m.__name__)
+def test_set_based_cascade_matches_object_walk(app, model_cls, state):
+    with app.app_context():
+        build_tree()
+        before = snapshot()
+        roots = db.session.query(model_cls).all()
+        visited = {}
+        for root in roots:
+            old_walk(root, state, visited)
+        expected = {}
+        for key, (deleted, deleted_at) in before.items():
+            if key in visited and deleted != state:
+                expected[key] = (state, 'now' if state == '1' else None)
+            else:
+                expected[key] = (deleted, deleted_at)
+        db.session.rollback()
+
+        started = time.time()
+        method = model_cls.cascade_soft_delete_ids if state == '1' else model_cls.cascade_restore_ids
+        counts = method([root.ID for root in roots])
+        db.session.commit()
+        db.session.expire_all()
+        after = snapshot()
+
+        for key, (deleted, deleted_at) in expected.items():
+            assert after[key][0] == deleted, key
+            if deleted_at == 'now':
+                assert after[key][1] >= started, key
+            else:
+                assert after[key][1] == deleted_at, key
+        changed = [key for key in expected if expected[key] != before[key]]
+        assert sum(counts.values()) == len(changed)
+        assert 0 < len(changed) < len(before)
@@ -0,0 +1,66 @@
+# tests/test_conditional.py
+"""条件请求：ETag 由表版本号与请求参数决定，匹配的 If-None-Match 返回 304。"""
+import json
+
+import pytest
+
+from conftest import create
+
+
+@pytest.fixture
+def etag(client, object_id):
+    create(client, 'object_field', OBJECT_ID=object_id, NAME='name')
+    response = client.get('/object_fields/all')
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def test_matching_if_none_match_returns_304(client, etag):
+    response = client.get('/object_fields/all', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_etag_changes_after_write(client, object_id, etag):
+    create(client, 'object_field', OBJECT_ID=object_id, NAME='code')
+    response = client.get('/object_fields/all', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(response.get_json()['items']) == 2
+
+
+def test_write_to_unrelated_table_keeps_etag(client, etag):
+    create(client, 'page_list', NAME='list')
+    assert client.get('/object_fields/all', headers={'If-None-Match': etag}).status_code == 304
+
+
+@pytest.mark.parametrize('query, headers', [
+    ('?fields=ID,NAME', {}),
+    ('', {'Accept': 'application/x-ndjson'}),
+])
+def test_etag_differs_by_fields_and_accept(client, etag, query, headers):
+    response = client.get('/object_fields/all' + query, headers={'If-None-Match': etag, **headers})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_ndjson_body_has_one_object_per_line(client, object_id):
+    names = [f'field_{i}' for i in range(50)]
+    client.post('/object_field/batch', json=[{'OBJECT_ID': object_id, 'NAME': name} for name in names])
+    response = client.get('/object_fields/all?fields=ID,NAME', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'Accept' in response.headers['Vary']
+
+    body = response.get_data(as_text=True)
+    assert body.endswith('\n')
+    items = [json.loads(line) for line in body.splitlines()]
+    assert sorted(item['NAME'] for item in items) == sorted(names)
+    assert all(list(item) == ['ID', 'NAME'] for item in items)
+    assert client.get('/object_fields/all?stream=1&fields=ID,NAME').get_data(as_text=True) == body
+
+
+def test_json_and_304_responses_vary_on_accept(client, etag):
+    assert 'Accept' in client.get('/object_fields/all').headers['Vary']
+    assert 'Accept' in client.get('/object_fields/all', headers={'If-None-Match': etag}).headers['Vary']
@@ -0,0 +1,57 @@
+# tests/test_csv_import.py
+import tracemalloc
+
+from app import run_csv_import
+from conftest import post_csv
+from models import ObjectField
+
+
+def test_upper_case_foreign_key_is_accepted(client, object_id):
+    response = post_csv(client, 'object_field', f'OBJECT_ID,NAME,LABEL,TYPE\n{object_id.upper()},name,Name,text\n')
+    assert response.status_code == 200
+    items = client.get(f'/object_fields/by_objid?obj_id={object_id}').get_json()['items']
+    assert [item['OBJECT_ID'] for item in items] == [object_id]
+
+
+def test_missing_foreign_key_error_rows(client, object_id):
+    missing_id = 'F' * 32
+    response = post_csv(client, 'object_field',
+                        f'OBJECT_ID,NAME,LABEL,TYPE\n{object_id},name,Name,text\n{missing_id},code,Code,text\nshort\n')
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == [
+        {'row': 3, 'data': [missing_id, 'code', 'Code', 'text'], 'error': '外键 OBJECT_ID 不存在'},
+        {'row': 4, 'error': '列数不足'},
+    ]
+
+
+def test_batch_accepts_upper_case_ids(client, object_id):
+    created = client.post('/object_field/batch', json=[{'OBJECT_ID': object_id.upper(), 'NAME': 'name'}])
+    assert created.status_code == 200
+    field_id = created.get_json()['results'][0]['ID']
+
+    assert client.put('/object_field/batch', json=[{'ID': field_id.upper(), 'NAME': 'renamed'}]).status_code == 200
+    assert client.delete('/object_field/batch', json=[field_id.upper()]).status_code == 200
+    assert client.get('/object_fields').get_json()['total'] == 0
+
+
+def peak_import_memory(app, tmp_path, object_id, rows):
+    path = tmp_path / f'{rows}.csv'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('OBJECT_ID,NAME,LABEL,TYPE\n')
+        for i in range(rows):
+            f.write(f'{object_id},field_{i},Field {i},text\n')
+    progress = {'parsed': 0, 'validated': 0, 'inserted': 0, 'committed': 0}
+    with app.app_context(), open(path, 'rb') as f:
+        tracemalloc.start()
+        try:
+            assert run_csv_import(ObjectField, f, 500, 'atomic', progress) == []
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def test_import_memory_does_not_grow_with_row_count(app, tmp_path, object_id):
+    peak_import_memory(app, tmp_path, object_id, 500)  # 预热语句缓存
+    small = peak_import_memory(app, tmp_path, object_id, 2000)
+    large = peak_import_memory(app, tmp_path, object_id, 20000)
+    assert large < small * 1.5
@@ -0,0 +1,50 @@
+# tests/test_import_jobs.py
+"""后台 CSV 导入任务：IMPORT_EXECUTOR=inline 时在请求线程内执行，提交后即可查询到最终状态。"""
+import pytest
+
+from conftest import make_app, post_csv
+
+
+@pytest.fixture
+def app(tmp_path):
+    return make_app(tmp_path, IMPORT_EXECUTOR='inline')
+
+
+def submit(client, text):
+    return post_csv(client, 'object_field', text, 'async=1')
+
+
+def test_async_import_succeeds(client, object_id):
+    response = submit(client, f'OBJECT_ID,NAME,LABEL,TYPE\n{object_id},name,Name,text\n{object_id},code,Code,text\n')
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    job = client.get(f'/import_jobs/{job_id}').get_json()
+    assert job['state'] == 'succeeded'
+    assert job['rows_parsed'] == 2
+    assert job['rows_validated'] == 2
+    assert job['rows_inserted'] == 2
+    assert job['errors'] == []
+    assert client.get(f'/object_fields/by_objid?obj_id={object_id}').get_json()['total'] == 2
+
+
+def test_async_import_reports_missing_foreign_key(client, object_id):
+    missing_id = '0' * 32
+    response = submit(client, f'OBJECT_ID,NAME,LABEL,TYPE\n{object_id},name,Name,text\n{missing_id},code,Code,text\n')
+    job = client.get(f'/import_jobs/{response.get_json()["job_id"]}').get_json()
+
+    assert job['state'] == 'failed'
+    assert job['rows_parsed'] == 2
+    assert job['rows_validated'] == 2
+    assert job['rows_inserted'] == 0
+    assert job['errors'] == [{'row': 3, 'data': [missing_id, 'code', 'Code', 'text'], 'error': '外键 OBJECT_ID 不存在'}]
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get('/import_jobs/missing').status_code == 404
+
+
+def test_full_queue_returns_503(tmp_path):
+    app = make_app(tmp_path, IMPORT_EXECUTOR='inline', IMPORT_QUEUE_SIZE=0)
+    response = submit(app.test_client(), 'OBJECT_ID,NAME,LABEL,TYPE\n')
+    assert response.status_code == 503
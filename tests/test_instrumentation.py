@@ -0,0 +1,56 @@
+# tests/test_instrumentation.py
+import json
+import logging
+
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import instrumentation
+from conftest import make_app
+from models import db
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def app(tmp_path):
+    return make_app(tmp_path, SQL_INSTRUMENTATION_ENABLED=True, SQL_INSTRUMENTATION_SAMPLE_RATE=1.0)
+
+
+@pytest.fixture
+def log_messages():
+    handler = ListHandler()
+    instrumentation.logger.addHandler(handler)
+    yield handler.messages
+    instrumentation.logger.removeHandler(handler)
+
+
+def test_sampled_request_writes_server_timing_and_log_line(client, log_messages):
+    response = client.get('/objects')
+    timing = response.headers['Server-Timing']
+    assert 'db;dur=' in timing and 'serialize;dur=' in timing
+
+    record = json.loads(log_messages[-1])
+    assert record['event'] == 'request_sql'
+    assert record['path'] == '/objects'
+    assert record['statements'] >= 1
+
+
+def test_failed_statement_leaves_no_state_on_connection(app):
+    with app.test_request_context():
+        stats = g.sql_stats = instrumentation.RequestStats()
+        with db.engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text('SELECT * FROM missing_table'))
+            conn.execute(text('SELECT 1'))
+            assert not [key for key in conn.info if 'started' in key]
+        assert stats.statements == 1
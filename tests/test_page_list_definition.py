@@ -0,0 +1,32 @@
+# tests/test_page_list_definition.py
+from sqlalchemy import event
+
+from conftest import create
+from models import db
+
+
+def test_definition_query_count_does_not_grow_with_page_size(app, client):
+    object_id = create(client, 'object', NAME='account')
+    page_list_id = create(client, 'page_list', NAME='list')
+    layout_id = create(client, 'page_layout', NAME='layout', PAGE_LIST_ID=page_list_id)
+    field_ids = [create(client, 'object_field', OBJECT_ID=object_id, NAME=f'f{i}') for i in range(30)]
+    for field_id in field_ids[:20]:
+        create(client, 'page_list_field', NAME='column', OBJECT_FIELD_ID=field_id, PAGE_LIST_ID=page_list_id)
+    for field_id in field_ids[10:]:
+        create(client, 'page_layout_field', NAME='input', PAGE_LAYOUT_ID=layout_id, OBJECT_FIELD_ID=field_id)
+
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        body = client.get(f'/page_list/{page_list_id}/definition').get_json()
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+
+    assert sorted(f['ID'] for f in body['object_fields']) == sorted(field_ids)
+    assert len(body['page_list_fields']) == 20
+    assert len(body['page_layouts'][0]['page_layout_fields']) == 20
+    # 页面本身、列表字段、布局、布局字段、ObjectField 各一条（不含 ETag 版本号查询）
+    assert len([s for s in statements if 'table_versions' not in s]) == 5
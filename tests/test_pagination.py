@@ -0,0 +1,23 @@
+# tests/test_pagination.py
+import pytest
+
+
+@pytest.mark.parametrize('query', [
+    'page_size=0&cursor=',
+    'page_size=-1&cursor=',
+    'page_size=0',
+    'page=0',
+])
+def test_invalid_page_parameters_return_400(client, query):
+    response = client.get(f'/object_fields?{query}')
+    assert response.status_code == 400
+
+
+def test_cursor_pagination_walks_all_rows(client):
+    client.post('/page_list/batch', json=[{'NAME': f'list_{i}'} for i in range(5)])
+    names, cursor = [], ''
+    while cursor is not None:
+        body = client.get(f'/page_lists?page_size=2&count=none&cursor={cursor}').get_json()
+        names.extend(item['NAME'] for item in body['items'])
+        cursor = body['next_cursor']
+    assert sorted(names) == [f'list_{i}' for i in range(5)]
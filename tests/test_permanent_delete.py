@@ -0,0 +1,76 @@
+# tests/test_permanent_delete.py
+"""级联永久删除：各接口返回每张表的删除行数，删除整个子树，其他行不受影响。"""
+import pytest
+from sqlalchemy import select
+
+from models import db, Object, ObjectField, PageList, PageListField, PageLayout, PageLayoutField
+
+MODELS = [PageList, Object, ObjectField, PageListField, PageLayout, PageLayoutField]
+
+
+def build(suffix, shared_field=None):
+    """一棵完整的树：对象、两个字段、页面列表及其列表字段、布局及布局字段。"""
+    rows = {}
+
+    def add(name, model_cls, **values):
+        rows[name] = model_cls(NAME=f'{name}_{suffix}', **values)
+        db.session.add(rows[name])
+        db.session.flush()
+        return rows[name].ID
+
+    object_id = add('object', Object)
+    fields = [add('field_1', ObjectField, OBJECT_ID=object_id), add('field_2', ObjectField, OBJECT_ID=object_id)]
+    page_list_id = add('page_list', PageList)
+    add('list_field_1', PageListField, PAGE_LIST_ID=page_list_id, OBJECT_FIELD_ID=fields[0])
+    add('list_field_2', PageListField, PAGE_LIST_ID=page_list_id, OBJECT_FIELD_ID=fields[1])
+    layout_id = add('layout', PageLayout, PAGE_LIST_ID=page_list_id)
+    add('layout_field_1', PageLayoutField, PAGE_LAYOUT_ID=layout_id, OBJECT_FIELD_ID=fields[0])
+    add('layout_field_2', PageLayoutField, PAGE_LAYOUT_ID=layout_id, OBJECT_FIELD_ID=shared_field or fields[1])
+    return {name: (type(row), row.ID) for name, row in rows.items()}
+
+
+@pytest.fixture
+def trees(app):
+    with app.app_context():
+        a = build('a')
+        # b 的一个布局字段引用 a 的字段：删除 a 的对象/字段时一并删除，删除 a 的页面列表时保留
+        b = build('b', shared_field=a['field_2'][1])
+        db.session.commit()
+        return a, b
+
+
+def all_rows():
+    return {(model_cls, row_id) for model_cls in MODELS
+            for row_id in db.session.execute(select(model_cls.ID)).scalars()}
+
+
+@pytest.mark.parametrize('endpoint, root, deleted, counts', [
+    ('object', 'object',
+     {'object', 'field_1', 'field_2', 'list_field_1', 'list_field_2', 'layout_field_1', 'layout_field_2',
+      'b:layout_field_2'},
+     {'page_list_fields': 2, 'page_layout_fields': 3, 'object_fields': 2, 'objects': 1}),
+    ('object_field', 'field_2', {'field_2', 'list_field_2', 'layout_field_2', 'b:layout_field_2'},
+     {'page_list_fields': 1, 'page_layout_fields': 2, 'object_fields': 1}),
+    ('page_list', 'page_list',
+     {'page_list', 'list_field_1', 'list_field_2', 'layout', 'layout_field_1', 'layout_field_2'},
+     {'page_layout_fields': 2, 'page_layouts': 1, 'page_list_fields': 2, 'page_lists': 1}),
+    ('page_layout', 'layout', {'layout', 'layout_field_1', 'layout_field_2'},
+     {'page_layout_fields': 2, 'page_layouts': 1}),
+    ('page_list_field', 'list_field_1', {'list_field_1'}, {'page_list_fields': 1}),
+    ('page_layout_field', 'layout_field_1', {'layout_field_1'}, {'page_layout_fields': 1}),
+])
+def test_permanent_delete_removes_subtree_only(app, client, trees, endpoint, root, deleted, counts):
+    a, b = trees
+    with app.app_context():
+        before = all_rows()
+    response = client.delete(f'/{endpoint}/permanent_delete/{a[root][1]}')
+    assert response.status_code == 200
+    assert response.get_json()['deleted'] == counts
+
+    expected_deleted = {b[name[2:]] if name.startswith('b:') else a[name] for name in deleted}
+    with app.app_context():
+        assert all_rows() == before - expected_deleted
+
+
+def test_permanent_delete_unknown_id_returns_404(client):
+    assert client.delete('/object/permanent_delete/' + 'f' * 32).status_code == 404
@@ -0,0 +1,119 @@
+# tests/test_purge.py
+"""清理软删除行：保留期、仍被引用的父记录、归档内容、dry-run 与命令行/接口入口。"""
+import time
+
+import pytest
+from sqlalchemy import select
+
+import purge
+from models import db, Object, ObjectField, PageList, PageListField
+
+DAY = 86400
+
+
+@pytest.fixture
+def rows(app):
+    """
+    expired：删除超过 30 天、没有存活子记录的行，应被清理；
+    其余为删除未满保留期、未删除、或仍有存活子记录的父记录，应保留。
+    """
+    now = time.time()
+    old, recent = now - 40 * DAY, now - DAY
+    with app.app_context():
+        expired_object = Object(NAME='expired', DELETED='1', DELETED_AT=old)
+        blocked_object = Object(NAME='blocked', DELETED='1', DELETED_AT=old)
+        recent_object = Object(NAME='recent', DELETED='1', DELETED_AT=recent)
+        live_object = Object(NAME='live', DELETED='0')
+        page_list = PageList(NAME='list', DELETED='1', DELETED_AT=old)
+        db.session.add_all([expired_object, blocked_object, recent_object, live_object, page_list])
+        db.session.flush()
+        expired_field = ObjectField(OBJECT_ID=expired_object.ID, NAME='expired', DELETED='1', DELETED_AT=old)
+        live_field = ObjectField(OBJECT_ID=blocked_object.ID, NAME='live', DELETED='0')
+        db.session.add_all([expired_field, live_field])
+        db.session.flush()
+        # 父记录 expired_field 要等这条子记录先被清理
+        list_field = PageListField(OBJECT_FIELD_ID=expired_field.ID, PAGE_LIST_ID=page_list.ID, NAME='expired',
+                                   DELETED='1', DELETED_AT=old)
+        db.session.add(list_field)
+        db.session.commit()
+        return {
+            'expired': {(Object, expired_object.ID), (ObjectField, expired_field.ID), (PageList, page_list.ID),
+                        (PageListField, list_field.ID)},
+            'kept': {(Object, blocked_object.ID), (Object, recent_object.ID), (Object, live_object.ID),
+                     (ObjectField, live_field.ID)},
+        }
+
+
+EXPECTED_COUNTS = {'page_layout_fields': 0, 'page_list_fields': 1, 'page_layouts': 0, 'object_fields': 1,
+                   'page_lists': 1, 'objects': 1}
+
+
+def remaining():
+    return {(model_cls, row_id) for model_cls in purge.PURGE_ORDER
+            for row_id in db.session.execute(select(model_cls.ID)).scalars()}
+
+
+def row_dicts(table, *criteria):
+    return {row['ID']: {k: v for k, v in row.items() if k != 'ARCHIVED_AT'}
+            for row in db.session.execute(select(table).where(*criteria)).mappings()}
+
+
+def test_purge_keeps_recent_rows_and_parents_of_live_children(app, rows):
+    with app.app_context():
+        counts = purge.purge(30, mode='delete', batch_size=1)
+        assert counts == EXPECTED_COUNTS
+        assert remaining() == rows['kept']
+        assert all(db.session.execute(select(table)).first() is None for table in purge.ARCHIVE_TABLES.values())
+
+
+def test_archive_mode_copies_identical_rows_before_deleting(app, rows):
+    with app.app_context():
+        expired_ids = [row_id for _, row_id in rows['expired']]
+        before = {model_cls: row_dicts(model_cls.__table__, model_cls.ID.in_(expired_ids))
+                  for model_cls in purge.PURGE_ORDER}
+        started = time.time()
+        purge.purge(30, mode='archive')
+        assert remaining() == rows['kept']
+        for model_cls, table in purge.ARCHIVE_TABLES.items():
+            assert row_dicts(table) == before[model_cls]
+            archived_at = db.session.execute(select(table.c.ARCHIVED_AT)).scalars().all()
+            assert all(value >= started for value in archived_at)
+
+
+def test_dry_run_counts_match_real_run_and_change_nothing(app, rows):
+    with app.app_context():
+        planned = purge.purge(30, dry_run=True)
+        assert remaining() == rows['expired'] | rows['kept']
+        assert purge.purge(30) == planned == EXPECTED_COUNTS
+
+
+def test_max_rows_limits_one_run(app, rows):
+    with app.app_context():
+        assert sum(purge.purge(30, max_rows=1).values()) == 1
+        assert len(remaining()) == len(rows['expired']) + len(rows['kept']) - 1
+
+
+def test_purge_command(app, rows):
+    runner = app.test_cli_runner()
+    dry_run = runner.invoke(args=['purge', '--retention-days', '30', '--dry-run'])
+    assert dry_run.exit_code == 0
+    assert 'page_list_fields' in dry_run.output and '(dry run)' in dry_run.output
+
+    result = runner.invoke(args=['purge', '--retention-days', '30', '--mode', 'delete'])
+    assert result.exit_code == 0
+    assert {line.split()[0]: int(line.split()[1]) for line in result.output.splitlines()} == EXPECTED_COUNTS
+    with app.app_context():
+        assert remaining() == rows['kept']
+
+
+def test_purge_endpoint(app, client, rows):
+    dry_run = client.post('/maintenance/purge?retention_days=30&dry_run=1').get_json()
+    assert dry_run['rows'] == EXPECTED_COUNTS and dry_run['dry_run'] is True
+
+    response = client.post('/maintenance/purge?retention_days=30&mode=archive')
+    assert response.status_code == 200
+    assert response.get_json()['total'] == sum(EXPECTED_COUNTS.values())
+    with app.app_context():
+        assert remaining() == rows['kept']
+
+    assert client.post('/maintenance/purge?mode=truncate').status_code == 400
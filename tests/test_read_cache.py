@@ -0,0 +1,54 @@
+# tests/test_read_cache.py
+"""读缓存：重复请求命中，相关表（含级联涉及的子表）提交写入后失效。"""
+import pytest
+
+from conftest import create, make_app, post_csv
+
+
+@pytest.fixture
+def app(tmp_path):
+    return make_app(tmp_path, READ_CACHE_ENABLED=True)
+
+
+def get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers['X-Cache'], response.get_json()
+
+
+def field_names(client):
+    cache, body = get(client, '/object_fields')
+    return cache, sorted(item['NAME'] for item in body['items'])
+
+
+@pytest.fixture
+def field_id(client, object_id):
+    field_id = create(client, 'object_field', OBJECT_ID=object_id, NAME='name')
+    assert field_names(client) == ('MISS', ['name'])
+    assert field_names(client) == ('HIT', ['name'])
+    return field_id
+
+
+def test_repeated_request_hits_and_bypass_skips_cache(client, field_id):
+    assert client.get('/object_fields?cache=0').headers['X-Cache'] == 'BYPASS'
+    assert client.get('/object_fields', headers={'Cache-Control': 'no-cache'}).headers['X-Cache'] == 'BYPASS'
+    assert field_names(client) == ('HIT', ['name'])
+
+
+def test_cascade_soft_delete_and_restore_invalidate_child_lists(client, object_id, field_id):
+    assert client.delete(f'/object/{object_id}').status_code == 200
+    assert field_names(client) == ('MISS', [])
+    assert field_names(client) == ('HIT', [])
+
+    assert client.put(f'/object/restore/{object_id}').status_code == 200
+    assert field_names(client) == ('MISS', ['name'])
+
+
+def test_batch_update_invalidates(client, field_id):
+    assert client.put('/object_field/batch', json=[{'ID': field_id, 'NAME': 'renamed'}]).status_code == 200
+    assert field_names(client) == ('MISS', ['renamed'])
+
+
+def test_csv_import_invalidates(client, object_id, field_id):
+    assert post_csv(client, 'object_field', f'OBJECT_ID,NAME,LABEL,TYPE\n{object_id},code,Code,text\n').status_code == 200
+    assert field_names(client) == ('MISS', ['code', 'name'])
@@ -0,0 +1,67 @@
+# tests/test_replicas.py
+"""读写分离：主库与副本各用一个临时 SQLite 文件，两边写入内容不同的同一行，从响应判断读的是哪个库。"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import migrations
+from conftest import make_app
+from models import db, Object
+
+OBJECT_ID = '0' * 31 + '1'
+
+
+def add_object(session, label):
+    session.add(Object(ID=OBJECT_ID, NAME='account', LABEL=label, TABLE_NAME='t_account'))
+    session.commit()
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path, REPLICA_DATABASE_URIS=['sqlite:///' + str(tmp_path / 'replica.db')])
+    with app.app_context():
+        replica_engine = db.engines['replica_0']
+        migrations.upgrade(replica_engine, echo=lambda message: None)
+        add_object(db.session, 'primary')
+        with Session(replica_engine) as session:
+            add_object(session, 'replica')
+    return app
+
+
+def test_read_replica_endpoint_reads_from_replica(client):
+    items = client.get('/objects').get_json()['items']
+    assert [item['LABEL'] for item in items] == ['replica']
+
+
+def test_update_reads_back_from_primary(client):
+    response = client.put(f'/object/{OBJECT_ID}', json=[{'NAME': 'renamed'}])
+    assert response.status_code == 200
+    assert response.get_json()['NAME'] == 'renamed'
+    assert response.get_json()['LABEL'] == 'primary'
+
+
+def test_unreachable_replica_falls_back_to_primary(tmp_path):
+    app = make_app(tmp_path, REPLICA_DATABASE_URIS=['sqlite:////nonexistent-directory/replica.db'])
+    with app.app_context():
+        add_object(db.session, 'primary')
+    client = app.test_client()
+
+    response = client.get('/objects')
+    assert response.status_code == 200
+    assert [item['LABEL'] for item in response.get_json()['items']] == ['primary']
+
+    status = client.get('/metrics/replicas').get_json()['replicas']['replica_0']
+    assert status['healthy'] is False
+    assert status['failures'] == 1
+
+
+def test_export_falls_back_to_primary_when_replica_query_fails(app, client):
+    # 副本上版本号查询成功、导出查询失败：错误应交给 read_replica 在主库上重试
+    with app.app_context():
+        with db.engines['replica_0'].begin() as conn:
+            conn.execute(text('DROP TABLE objects'))
+
+    response = client.get('/export_csv/object')
+    assert response.status_code == 200
+    assert 'primary' in response.get_data(as_text=True)
+    assert client.get('/metrics/replicas').get_json()['replicas']['replica_0']['healthy'] is False
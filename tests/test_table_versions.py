@@ -0,0 +1,27 @@
+"""table_versions：迁移预先写入各业务表的行，提交只做 UPDATE。"""
+from sqlalchemy import select
+
+from cache import get_table_versions
+from models import TableVersion, db
+
+BUSINESS_TABLES = ('page_lists', 'objects', 'object_fields', 'page_list_fields', 'page_layouts',
+                   'page_layout_fields')
+
+
+def versions(app):
+    with app.app_context():
+        return dict(db.session.execute(select(TableVersion.TABLE_NAME, TableVersion.VERSION)).all())
+
+
+def test_migration_seeds_every_business_table(app):
+    assert versions(app) == {name: 0 for name in BUSINESS_TABLES}
+
+
+def test_commit_increments_written_tables_only(app, client):
+    client.post('/object/batch', json=[{'NAME': 'account'}])
+    client.post('/object/batch', json=[{'NAME': 'contact'}])
+    current = versions(app)
+    assert current['objects'] == 2
+    assert all(current[name] == 0 for name in BUSINESS_TABLES if name != 'objects')
+    with app.app_context():
+        assert get_table_versions(db.session, ('objects', 'page_lists')) == (2, 0)